@@ -2,14 +2,52 @@
 """
 Sales Reply Coach Backend API Test Suite
 Tests user signup, login, and YouTube transcript functionality
+
+Usage:
+    python backend_test.py                         # functional tests
+    python backend_test.py --mode load --users 50  # concurrent load test
+    python backend_test.py --mode load --arrival poisson --rate 200  # open-loop
+    python backend_test.py --mode load --processes 8 --users 400     # worker pool
+    python backend_test.py --mode batch-compare                      # batching cost
+    python backend_test.py --mode load --scenarios default           # journey mix
+    python backend_test.py --mode load --profile spike --users 20    # 10x spike + recovery
+    python backend_test.py --mode prompt-scaling --forge-standin --llm-prefill-ms-per-1k 40
+    python backend_test.py --mode llm-faults --forge-standin --llm-faults html=0.05,5xx=0.05,timeout=0.01
+    python backend_test.py --mode transcript-bench --forge-standin --shim-audio-seconds 3600
+    python backend_test.py --mode load --forge-standin --preauth-users 2000 --users 2000  # logged in
+    python backend_test.py --mode signup-bench --forge-standin --users 1000  # parallel signups
+    python backend_test.py --mode load --forge-standin --preauth-users 50 --scenarios uploads \
+        --storage-upload-mbps 20 --server-pid $(pgrep -f "server/_core/index")  # storage cost
+    python backend_test.py --mode load --forge-standin --preauth-users 50 --scenarios scrape \
+        --site-page-bytes lognormal:200000,0.8 --site-faults 404=0.05,timeout=0.02  # offline scraping
+    python backend_test.py --mode load --forge-standin --llm-record llm.jsonl \
+        --scenarios default  # record real LLM replies; later runs: --llm-replay llm.jsonl
+    python backend_test.py --mode chunk-scaling --forge-standin --chunk-counts 10000,100000,1000000
+    python backend_test.py --mode history-scaling --forge-standin --server-pid $(pgrep -f "server/_core/index")
+    python backend_test.py --mode analytics-scaling --forge-standin --prospect-counts 100,10000,1000000
+    python backend_test.py --mode noisy-neighbour --forge-standin --tenants 2000 --whales 3 --rate 20
+    python backend_test.py --mode noisy-neighbour --forge-standin --dataset tenants-2k  # cloned data
+    python backend_test.py --mode load --baseline baseline.json      # regression gate
+    python backend_test.py --mode compare --baseline baseline.json   # diff last report
 """
 
+import argparse
+import os
 import requests
 import json
 import sys
 import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from perf import forge, phases as request_phases
+from perf.results import LoadResults
+
+# Per-call timings attached to a single test result are capped at this many
+MAX_CALLS_PER_RESULT = 50
+# Only the most recent results stay in memory; the full log is in the JSONL sink
+MAX_RESULTS_IN_MEMORY = 1000
 
 class SalesReplyCoachTester:
     def __init__(self, base_url: str = "http://localhost:3000"):
@@ -19,6 +57,9 @@ class SalesReplyCoachTester:
             'Content-Type': 'application/json',
             'User-Agent': 'SalesReplyCoach-Tester/1.0'
         })
+        # Record connect/TLS/write/TTFB/download timings for every request
+        self.session.mount('http://', request_phases.TimedHTTPAdapter())
+        self.session.mount('https://', request_phases.TimedHTTPAdapter())
         
         # Test credentials from review request
         self.test_email = f"testuser_{int(time.time())}@example.com"  # Unique email for each test run
@@ -29,13 +70,33 @@ class SalesReplyCoachTester:
         # Test results tracking
         self.tests_run = 0
         self.tests_passed = 0
-        self.test_results = []
+        self.test_results = deque(maxlen=MAX_RESULTS_IN_MEMORY)
+        # Running per-test aggregates, so the summary never needs the full result list
+        self.test_totals: Dict[str, Dict[str, Any]] = {}
+        self.sink = None
         
         # Auth tokens
         self.supabase_token = None
         self.verification_code = None
         self.session_cookie = None
 
+        # Latency of every tRPC call, per procedure, plus the calls made
+        # since the last log_test so they can be attached to that result
+        self.latency = LoadResults()
+        self.pending_calls = []
+
+        # Supabase auth stand-in (perf.supabase) that can mint real access tokens
+        self.auth_url = None
+        # Resend stand-in (perf.mailbox) holding every verification email the server sent
+        self.mail_url = None
+        # Fixture pages (perf.sites) that "$site_url" in scenario inputs points at
+        self.site_url = None
+        # Manifest of the perf.snapshots dataset the server's database was cloned from
+        self.dataset = None
+
+        # Environment for yt-dlp/ffmpeg subprocesses; perf.media.shim_env() swaps in the offline shims
+        self.media_env = None
+
     def log_test(self, test_name: str, success: bool, message: str = "", details: Dict = None):
         """Log test result"""
         self.tests_run += 1
@@ -49,15 +110,61 @@ class SalesReplyCoachTester:
             "details": details or {},
             "timestamp": datetime.now().isoformat()
         }
+        if self.pending_calls:
+            result["duration_ms"] = sum(call["latency_ms"] for call in self.pending_calls)
+            result["details"] = dict(result["details"], trpc_calls=self.pending_calls[:MAX_CALLS_PER_RESULT])
+            self.pending_calls = []
         self.test_results.append(result)
+        self.update_totals(result)
+        if self.sink is not None:
+            self.sink.write(result)
         
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{status} - {test_name}: {message}")
         if details:
             print(f"    Details: {json.dumps(details, indent=2)}")
 
+    def update_totals(self, result: Dict[str, Any]):
+        """Fold one result into the per-test running aggregates"""
+        totals = self.test_totals.setdefault(result["test"], {
+            "runs": 0, "passed": 0, "failed": 0, "duration_ms": 0.0, "last_message": ""})
+        totals["runs"] += 1
+        totals["passed" if result["success"] else "failed"] += 1
+        totals["duration_ms"] += result.get("duration_ms", 0.0)
+        if not result["success"] or not totals["failed"]:
+            totals["last_message"] = result["message"]
+
+    def record_call(self, procedure: str, latency: float, status_code: int, body: Any,
+                    phases: Dict[str, float] = None):
+        """Add one timed tRPC call to the latency histograms"""
+        if isinstance(body, list):
+            success = 0 < status_code < 400 and not any("error" in item for item in body if isinstance(item, dict))
+        else:
+            success = 0 < status_code < 400 and "error" not in body
+        self.latency.record(procedure, latency, success, status_code, phases=phases)
+        call = {
+            "procedure": procedure,
+            "latency_ms": latency * 1000,
+            "status_code": status_code,
+        }
+        if phases:
+            call["phases_ms"] = {phase: seconds * 1000 for phase, seconds in phases.items()}
+        self.pending_calls.append(call)
+
+    def send_timed(self, method: str, url: str, **kwargs):
+        """Send a request and read its body, returning (response, phases)"""
+        request_phases.begin()
+        try:
+            response = self.session.request(method, url, stream=True, **kwargs)
+            with request_phases.measure("download"):
+                response.content
+        finally:
+            phases = request_phases.end()
+        return response, phases
+
     def make_trpc_request(self, procedure: str, input_data: Dict = None, method: str = "POST") -> Dict[str, Any]:
         """Make a tRPC request"""
+        start = time.perf_counter()
         if method == "GET":
             # For queries, use GET with input as query parameter
             url = f"{self.base_url}/api/trpc/{procedure}"
@@ -65,18 +172,255 @@ class SalesReplyCoachTester:
                 import urllib.parse
                 query_param = urllib.parse.quote(json.dumps({"json": input_data}))
                 url += f"?input={query_param}"
-            response = self.session.get(url)
+            response, phases = self.send_timed("GET", url)
         else:
             # For mutations, use POST with proper tRPC format
             url = f"{self.base_url}/api/trpc/{procedure}"
             # tRPC expects the input to be wrapped in a "json" object
             payload = {"json": input_data} if input_data is not None else {}
-            response = self.session.post(url, json=payload)
+            response, phases = self.send_timed("POST", url, json=payload)
+        latency = time.perf_counter() - start
         
         try:
-            return response.json()
+            body = response.json()
         except:
-            return {"error": f"Invalid JSON response: {response.text[:200]}", "status_code": response.status_code}
+            body = {"error": f"Invalid JSON response: {response.text[:200]}", "status_code": response.status_code}
+        self.record_call(procedure, latency, response.status_code, body, phases)
+        return body
+
+    def make_trpc_batch_request(self, calls: List[Tuple[str, Dict]], method: str = "GET") -> List[Dict[str, Any]]:
+        """Make a batched tRPC request (httpBatchLink format), one result dict per call"""
+        from perf.trpc import batch_url, batch_payload, decode_batch
+
+        url = batch_url(self.base_url, calls, method)
+        start = time.perf_counter()
+        if method == "GET":
+            response, phases = self.send_timed("GET", url)
+        else:
+            response, phases = self.send_timed("POST", url, json=batch_payload(calls))
+        latency = time.perf_counter() - start
+        
+        try:
+            body = response.json()
+        except:
+            body = {"error": f"Invalid JSON response: {response.text[:200]}", "status_code": response.status_code}
+        label = "batch[" + ",".join(procedure for procedure, _ in calls) + "]"
+        self.record_call(label, latency, response.status_code, body, phases)
+        return decode_batch(body, len(calls), response.status_code)
+
+    def compare_batching(self, procedures: List[str], iterations: int = 20, method: str = "GET") -> Dict[str, Any]:
+        """Time the same procedure set sent one-by-one versus as a single batch"""
+        from perf.trpc import is_error
+
+        print(f"\n🔍 Comparing batched vs unbatched latency for {', '.join(procedures)} ({iterations} rounds)...")
+        calls = [(procedure, {}) for procedure in procedures]
+        results = LoadResults()
+        results.started_at = time.perf_counter()
+        for _ in range(iterations):
+            round_start = time.perf_counter()
+            round_ok = True
+            for procedure, input_data in calls:
+                start = time.perf_counter()
+                response = self.make_trpc_request(procedure, input_data, method)
+                results.record(procedure, time.perf_counter() - start, not is_error(response), 200)
+                round_ok = round_ok and not is_error(response)
+            results.record("unbatched round", time.perf_counter() - round_start, round_ok, 200)
+
+            start = time.perf_counter()
+            responses = self.make_trpc_batch_request(calls, method)
+            results.record("batched round", time.perf_counter() - start,
+                           not any(is_error(r) for r in responses), 200)
+        results.finished_at = time.perf_counter()
+        summary = results.summary()["procedures"]
+
+        print(f"\n{'':<22}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+        for label in procedures + ["unbatched round", "batched round"]:
+            lat = summary[label]["latency_ms"]
+            print(f"{label:<22}{lat['p50']:>10.1f}{lat['p90']:>10.1f}{lat['p99']:>10.1f}{lat['max']:>10.1f}")
+
+        unbatched = summary["unbatched round"]["latency_ms"]["p50"]
+        batched = summary["batched round"]["latency_ms"]["p50"]
+        speedup = unbatched / batched if batched else 0.0
+        self.log_test("Batch Comparison", True,
+                      f"p50 unbatched {unbatched:.1f}ms vs batched {batched:.1f}ms ({speedup:.2f}x)")
+        return {
+            "procedures": procedures,
+            "method": method,
+            "iterations": iterations,
+            "latency": summary,
+            "p50_speedup": speedup,
+        }
+
+    def measure_prompt_scaling(self, forge_url: str, iterations: int = 20) -> Dict[str, Any]:
+        """Send chat.sendInbound repeatedly to one prospect and relate latency to prompt size
+
+        Every message grows the prospect's conversation context, so each call's
+        chat_analysis prompt is larger than the last. Prompt tokens come from
+        the forge stand-in's request log. The calls run as a stand-in user
+        on a fresh prospect of their own.
+        """
+        from perf.scaling import bucket_points, linear_fit, llm_requests_since, print_scaling
+
+        if self.login_bench_user("promptuser") is None:
+            self.log_test("Prompt Size Scaling", False, "Could not log in a benchmark user")
+            return {}
+        prospect_id = self.create_bench_prospect("Prompt Scaling")
+        if prospect_id is None:
+            self.log_test("Prompt Size Scaling", False, "Could not create a prospect for chat.sendInbound")
+            return {}
+
+        print(f"\n🔍 Measuring chat.sendInbound latency vs prompt size ({iterations} messages)...")
+        points = []
+        failures = 0
+        since = llm_requests_since(forge_url, 0)["last_seq"]
+        for i in range(iterations):
+            response = self.make_trpc_request("chat.sendInbound", {
+                "prospectId": prospect_id,
+                "content": f"Message {i + 1}: that sounds interesting, how does it work for someone like me?"
+            })
+            latency_ms = self.pending_calls[-1]["latency_ms"]
+            log = llm_requests_since(forge_url, since)
+            since = log["last_seq"]
+            prompts = [r["prompt_tokens"] for r in log["requests"] if r["schema"] == "chat_analysis"]
+            if "error" in response or not prompts:
+                failures += 1
+                continue
+            points.append((max(prompts), latency_ms))
+
+        report = {
+            "prospect_id": prospect_id,
+            "iterations": iterations,
+            "failures": failures,
+            "points": [{"prompt_tokens": x, "latency_ms": y} for x, y in points],
+            "buckets": bucket_points(points),
+            "fit": linear_fit(points),
+        }
+        if not points:
+            self.log_test("Prompt Size Scaling", False,
+                          f"No chat_analysis prompts reached the forge stand-in in {iterations} calls "
+                          f"({failures} failed); is the server's BUILT_IN_FORGE_API_URL pointed at it?")
+            return report
+        print_scaling(report)
+        self.log_test("Prompt Size Scaling", len(points) >= 2,
+                      f"{len(points)} calls measured, {failures} failed, "
+                      f"{report['fit']['ms_per_1k_tokens']:.1f}ms per 1k prompt tokens")
+        return report
+
+    def measure_llm_faults(self, forge_url: str, spec: str, procedures: List[str],
+                           iterations: int = 20) -> Dict[str, Any]:
+        """Run the same procedure calls with LLM faults off, then on, and compare LLM requests and tails
+
+        Faults are switched on the running forge stand-in through /__llm/faults,
+        so the server must reach both invokeLLM and the OpenAI fallback through it.
+        The calls run as a stand-in user on a fresh prospect of their own.
+        """
+        from perf.faults import set_faults
+        from perf.load import default_calls
+        from perf.retries import amplification, call_record, print_amplification
+        from perf.scaling import llm_requests_since
+
+        if self.login_bench_user("faultuser") is None:
+            self.log_test("LLM Fault Amplification", False, "Could not log in a benchmark user")
+            return {}
+        prospect_id = self.create_bench_prospect("LLM Faults")
+        if prospect_id is None:
+            self.log_test("LLM Fault Amplification", False, "Could not create a prospect for the calls")
+            return {}
+        calls = [c for c in default_calls(prospect_id) if c[0] in procedures]
+        if not calls:
+            self.log_test("LLM Fault Amplification", False, f"No known procedures in {', '.join(procedures)}")
+            return {}
+        print(f"\n🔍 Measuring retry amplification under LLM faults '{spec}' "
+              f"({iterations} rounds of {len(calls)} procedures)...")
+        records = {"clean": {}, "faulted": {}}
+        try:
+            for phase, phase_spec in (("clean", ""), ("faulted", spec)):
+                set_faults(forge_url, phase_spec)
+                since = llm_requests_since(forge_url, 0)["last_seq"]
+                for _ in range(iterations):
+                    for procedure, method, input_data in calls:
+                        response = self.make_trpc_request(procedure, input_data, method)
+                        latency_ms = self.pending_calls[-1]["latency_ms"]
+                        log = llm_requests_since(forge_url, since)
+                        since = log["last_seq"]
+                        records[phase].setdefault(procedure, []).append(
+                            call_record(latency_ms, "error" not in response, log["requests"]))
+        finally:
+            set_faults(forge_url, spec)
+
+        report = {
+            "spec": spec,
+            "iterations": iterations,
+            "procedures": {procedure: amplification(records["clean"].get(procedure, []),
+                                                    records["faulted"].get(procedure, []))
+                           for procedure, _, _ in calls},
+        }
+        print_amplification(report)
+        # Without LLM traffic in the clean phase there is nothing to amplify
+        unmeasured = [procedure for procedure, row in report["procedures"].items()
+                      if row["clean"]["llm_requests_per_call"] == 0 or row["clean"]["failure_rate"] > 0.5]
+        if unmeasured:
+            self.log_test("LLM Fault Amplification", False,
+                          f"{', '.join(unmeasured)} made no LLM requests or mostly failed without faults; "
+                          f"is the server's BUILT_IN_FORGE_API_URL pointed at the stand-in?")
+            return report
+        worst = max(report["procedures"].values(), key=lambda row: row["retry_amplification"])
+        self.log_test("LLM Fault Amplification", True,
+                      f"up to {worst['retry_amplification']:.2f}x LLM requests per call, "
+                      f"{worst['faulted']['fallback_rate'] * 100:.1f}% fell back, "
+                      f"p99 {worst['p99_inflation']:.1f}x clean")
+        return report
+
+    def measure_transcripts(self, urls: List[str], iterations: int = 5) -> Dict[str, Any]:
+        """Time getYouTubeTranscript/getInstagramTranscript/getTikTokTranscript end to end
+
+        Runs perf/transcript_bench.ts under self.media_env, so with the shims
+        the yt-dlp, ffmpeg and Whisper steps are offline and deterministic.
+        """
+        import subprocess
+
+        print(f"\n🔍 Benchmarking transcript pipeline ({iterations} rounds of {len(urls)} URLs)...")
+        timings = LoadResults()
+        calls = []
+        root = os.path.dirname(os.path.abspath(__file__))
+        try:
+            result = subprocess.run(
+                ['npx', 'tsx', 'perf/transcript_bench.ts', str(iterations)] + urls,
+                cwd=root, env=self.media_env, capture_output=True, text=True,
+                timeout=max(600, 120 * iterations * len(urls))
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.log_test("Transcript Pipeline Benchmark", False, f"Benchmark did not run: {str(e)}")
+            return {"error": str(e)}
+
+        for line in result.stdout.splitlines():
+            if not line.startswith('{"bench"'):
+                continue
+            call = json.loads(line)
+            call.pop("bench")
+            calls.append(call)
+            # One histogram per platform and strategy, e.g. youtube[captions]
+            timings.record(f"{call['platform']}[{call['method']}]", call["ms"] / 1000,
+                           call["method"] != "failed", 200 if call["method"] != "failed" else 0)
+
+        report = {
+            "iterations": iterations,
+            "urls": urls,
+            "calls": calls[-MAX_CALLS_PER_RESULT:],
+            "timings": timings.summary()["procedures"] if calls else {},
+        }
+        for name, stats in report["timings"].items():
+            latency = stats["latency_ms"]
+            print(f"   {name:<24} n={stats['requests']:<4} p50={latency['p50']:.0f}ms "
+                  f"p95={latency['p95']:.0f}ms max={latency['max']:.0f}ms")
+        failed = sum(1 for call in calls if call["method"] == "failed")
+        if result.returncode != 0 or not calls:
+            self.log_test("Transcript Pipeline Benchmark", False,
+                          f"Benchmark failed: {(result.stderr or result.stdout)[-200:]}")
+        else:
+            self.log_test("Transcript Pipeline Benchmark", failed == 0,
+                          f"{len(calls)} transcripts, {failed} failed")
+        return report
 
     def test_server_health(self):
         """Test if server is running and responding"""
@@ -113,6 +457,19 @@ class SalesReplyCoachTester:
             self.log_test("Send Verification Code", False, f"Signup failed: {error_msg}")
             return False
 
+    def get_verification_code(self, email: str) -> Optional[str]:
+        """Verification code for `email`, from the mailbox stand-in when there is one"""
+        if self.mail_url:
+            try:
+                response = requests.get(f"{self.mail_url}/__mail/messages",
+                                        params={"to": email, "wait": 10}, timeout=15)
+                messages = response.json()["messages"]
+                if messages:
+                    return messages[-1]["code"]
+            except (requests.RequestException, ValueError, KeyError):
+                pass
+        return self.get_verification_code_from_logs()
+
     def get_verification_code_from_logs(self):
         """Extract verification code from server logs"""
         try:
@@ -138,8 +495,8 @@ class SalesReplyCoachTester:
 
     def test_verify_code(self):
         """Test email verification code"""
-        # Try to get verification code from logs
-        self.verification_code = self.get_verification_code_from_logs()
+        # Try to get verification code from the mailbox stand-in or the logs
+        self.verification_code = self.get_verification_code(self.test_email)
         
         if not self.verification_code:
             # Try common test codes that might work in dev mode
@@ -183,6 +540,10 @@ class SalesReplyCoachTester:
         # For testing, we'll simulate a Supabase token
         # In real scenario, this would come from Supabase auth
         mock_token = "mock_supabase_jwt_token_for_testing"
+        if self.auth_url:
+            # The stand-in issues tokens the server can verify, so expect a real login
+            from perf.supabase import bulk_tokens
+            mock_token = bulk_tokens(self.auth_url, 1, prefix=f"testuser_{int(time.time())}")[0]["access_token"]
         
         login_data = {
             "token": mock_token
@@ -197,7 +558,7 @@ class SalesReplyCoachTester:
         else:
             error_msg = response.get("error", {}).get("json", {}).get("message", str(response))
             # This is expected to fail with invalid token in test environment
-            if "Invalid Supabase token" in str(error_msg):
+            if "Invalid Supabase token" in str(error_msg) and not self.auth_url:
                 self.log_test("Supabase Login", True, "Login validation working (rejects invalid tokens)")
                 return True
             else:
@@ -238,6 +599,7 @@ class SalesReplyCoachTester:
             result = subprocess.run(
                 ['npx', 'tsx', 'test_transcript.ts'], 
                 cwd='/app',
+                env=self.media_env,
                 capture_output=True, 
                 text=True, 
                 timeout=60
@@ -308,10 +670,12 @@ class SalesReplyCoachTester:
         
         try:
             import subprocess
-            result = subprocess.run(['which', 'ffmpeg'], capture_output=True, text=True, timeout=5)
+            result = subprocess.run(['which', 'ffmpeg'], capture_output=True, text=True, timeout=5,
+                                    env=self.media_env)
             if result.returncode == 0:
                 # Test ffmpeg version
-                version_result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True, timeout=5)
+                version_result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True, timeout=5,
+                                                env=self.media_env)
                 if version_result.returncode == 0:
                     version_line = version_result.stdout.split('\n')[0]
                     self.log_test("FFmpeg Availability", True, f"FFmpeg available: {version_line}")
@@ -332,10 +696,12 @@ class SalesReplyCoachTester:
         
         try:
             import subprocess
-            result = subprocess.run(['which', 'yt-dlp'], capture_output=True, text=True, timeout=5)
+            result = subprocess.run(['which', 'yt-dlp'], capture_output=True, text=True, timeout=5,
+                                    env=self.media_env)
             if result.returncode == 0:
                 # Test yt-dlp version
-                version_result = subprocess.run(['yt-dlp', '--version'], capture_output=True, text=True, timeout=10)
+                version_result = subprocess.run(['yt-dlp', '--version'], capture_output=True, text=True, timeout=10,
+                                                env=self.media_env)
                 if version_result.returncode == 0:
                     version = version_result.stdout.strip()
                     self.log_test("yt-dlp Availability", True, f"yt-dlp available: {version}")
@@ -387,42 +753,781 @@ class SalesReplyCoachTester:
         print(f"Success Rate: {(self.tests_passed/self.tests_run*100):.1f}%")
         
         # Print failed tests
-        failed_tests = [t for t in self.test_results if not t["success"]]
+        failed_tests = [(name, t) for name, t in self.test_totals.items() if t["failed"]]
         if failed_tests:
             print(f"\n❌ FAILED TESTS ({len(failed_tests)}):")
-            for test in failed_tests:
-                print(f"  - {test['test']}: {test['message']}")
+            for name, totals in failed_tests:
+                print(f"  - {name}: {totals['last_message']}")
         
         # Print passed tests
-        passed_tests = [t for t in self.test_results if t["success"]]
+        passed_tests = [(name, t) for name, t in self.test_totals.items() if not t["failed"]]
         if passed_tests:
             print(f"\n✅ PASSED TESTS ({len(passed_tests)}):")
-            for test in passed_tests:
-                print(f"  - {test['test']}: {test['message']}")
+            for name, totals in passed_tests:
+                print(f"  - {name}: {totals['last_message']}")
         
         return self.tests_passed == self.tests_run
 
-def main():
+    def preauthenticate_users(self, count: int, concurrency: int = 50) -> List[Dict[str, str]]:
+        """Create `count` users on the Supabase stand-in and log each in via auth.supabaseLogin
+
+        Returns their session cookies for run_load_test(sessions=...).
+        """
+        import asyncio
+        from perf.supabase import bulk_tokens, preauthenticate
+
+        print(f"\n🔍 Pre-authenticating {count} users through auth.supabaseLogin...")
+        tokens = bulk_tokens(self.auth_url, count)
+        logins = LoadResults()
+        sessions = asyncio.run(preauthenticate(self.base_url, tokens, logins, concurrency))
+        stats = logins.summary()["procedures"].get("auth.supabaseLogin")
+        self.latency.merge_dict(logins.to_dict())
+        latency = f", p95 {stats['latency_ms']['p95']:.0f}ms" if stats else ""
+        self.log_test("Bulk Pre-auth", len(sessions) == count,
+                      f"{len(sessions)}/{count} users logged in{latency}")
+        return sessions
+
+    def benchmark_signups(self, count: int, concurrency: int = 50) -> Dict[str, Any]:
+        """Sign up `count` users in parallel, reading each code from the mailbox stand-in
+
+        Times auth.sendVerificationCode and auth.verifyCode per call and the
+        whole signup as a journey.
+        """
+        import asyncio
+        from perf.load import print_load_summary
+        from perf.mailbox import run_signups
+
+        print(f"\n🔍 Signing up {count} users, {concurrency} at a time...")
+        results = LoadResults()
+        outcomes = asyncio.run(run_signups(self.base_url, self.mail_url, count, concurrency, results))
+        self.latency.merge_dict(results.to_dict())
+        summary = results.summary()
+        summary["outcomes"] = outcomes
+        print_load_summary(summary)
+        self.log_test("Parallel Signup", outcomes["verified"] == count,
+                      f"{outcomes['verified']}/{count} verified, {outcomes['no_email']} without email, "
+                      f"{outcomes['send_failed']} send and {outcomes['verify_failed']} verify failures")
+        return summary
+
+    def login_bench_user(self, prefix: str) -> Optional[int]:
+        """Log the tester's session in as a stand-in user and return their users.id
+
+        The user is fresh unless the database is a perf.snapshots clone, whose
+        datasets already hold PREFIX_0 and their rows.
+        """
+        from perf.supabase import bulk_tokens
+        from perf.scenarios import trpc_data
+
+        if self.dataset is None:
+            prefix = f"{prefix}_{int(time.time())}"
+        token = bulk_tokens(self.auth_url, 1, prefix=prefix)[0]["access_token"]
+        self.make_trpc_request("auth.supabaseLogin", {"token": token})
+        me = trpc_data(self.make_trpc_request("auth.me", method="GET"))
+        return me.get("id") if me else None
+
+    def create_bench_prospect(self, name: str) -> Optional[int]:
+        """A workspace with one prospect for the logged-in user; returns the prospect id"""
+        from perf.scenarios import trpc_data
+
+        workspace = trpc_data(self.make_trpc_request("workspace.create", {"name": f"{name} workspace"}))
+        if not workspace:
+            return None
+        prospect = trpc_data(self.make_trpc_request("prospect.create", {"workspaceId": workspace["id"],
+                                                                      "name": name}))
+        return prospect["id"] if prospect else None
+
+    def measure_chunk_scaling(self, database_url: str, counts: List[int], procedures: List[str],
+                              iterations: int = 10, seed: Optional[int] = None) -> Dict[str, Any]:
+        """Time the chunk-reading procedures as one user's knowledge_chunks grow through `counts`
+
+        A fresh stand-in user is topped up with perf.seed before each step, so
+        the table sizes are cumulative and only the difference is loaded.
+        chat.sendInbound also needs the server's LLM calls to reach a stand-in.
+        """
+        from perf import seed as seeding
+        from perf.load import chunk_calls
+        from perf.scaling import print_sweep, sweep_summary
+
+        user_id = self.login_bench_user("chunkuser")
+        if user_id is None:
+            self.log_test("Knowledge Chunk Scaling", False, "Could not log in a benchmark user")
+            return {}
+        prospect_id = None
+        if "chat.sendInbound" in procedures:
+            prospect_id = self.create_bench_prospect("Chunk Scaling")
+            if prospect_id is None:
+                self.log_test("Knowledge Chunk Scaling", False, "Could not create a prospect for chat.sendInbound")
+                return {}
+        calls = [c for c in chunk_calls(prospect_id or 0) if c[0] in procedures]
+        if not calls:
+            self.log_test("Knowledge Chunk Scaling", False, f"No known procedures in {', '.join(procedures)}")
+            return {}
+
+        print(f"\n🔍 Measuring {', '.join(c[0] for c in calls)} at "
+              f"{', '.join(str(n) for n in counts)} knowledge chunks (user {user_id})...")
+        samples: Dict[int, Dict[str, List[float]]] = {}
+        failures: Dict[int, Dict[str, int]] = {}
+        loads = []
+        with seeding.connect(database_url) as conn:
+            for count in sorted(counts):
+                loaded = seeding.seed_chunks(conn, user_id, count, seed=seed)
+                loads.append(loaded)
+                if loaded["rows"] > count:
+                    print(f"⚠️  User {user_id} already has {loaded['rows']} chunks, so the {count} step "
+                          f"measures {loaded['rows']}")
+                print(f"🌱 {loaded['rows']} chunks ({loaded['inserted']} inserted in {loaded['seconds']:.1f}s)")
+                for _ in range(iterations):
+                    for procedure, method, input_data in calls:
+                        response = self.make_trpc_request(procedure, input_data, method)
+                        if "error" in response:
+                            failures.setdefault(count, {})
+                            failures[count][procedure] = failures[count].get(procedure, 0) + 1
+                            continue
+                        samples.setdefault(count, {}).setdefault(procedure, []).append(
+                            self.pending_calls[-1]["latency_ms"])
+
+        report = sweep_summary(samples, failures)
+        report.update({"user_id": user_id, "iterations": iterations, "seeding": loads})
+        print_sweep(report, "LATENCY VS KNOWLEDGE CHUNKS")
+        failed = sum(n for by_procedure in failures.values() for n in by_procedure.values())
+        worst = max(report["fits"].items(), key=lambda item: item[1]["ms_per_100k_rows"], default=None)
+        slowest = (f", {worst[0]} +{worst[1]['ms_per_100k_rows']:.1f}ms per 100k chunks" if worst else "")
+        self.log_test("Knowledge Chunk Scaling", failed == 0,
+                      f"{len(counts)} sizes up to {max(counts)} chunks, {failed} failed calls{slowest}")
+        return report
+
+    def measure_history_scaling(self, database_url: str, forge_url: str, counts: List[int],
+                                iterations: int = 10, server_pid: Optional[int] = None,
+                                seed: Optional[int] = None) -> Dict[str, Any]:
+        """Age one prospect's conversation through `counts` messages and time chat.sendInbound at each
+
+        getConversationContext puts the whole history into the chat_analysis
+        prompt, so prompt tokens (from the forge stand-in's log), latency and,
+        with server_pid, the server's peak RSS are recorded per length.
+        """
+        from perf import seed as seeding
+        from perf.memory import RssSampler
+        from perf.scaling import history_summary, llm_requests_since, print_history
+
+        user_id = self.login_bench_user("historyuser")
+        prospect_id = self.create_bench_prospect("History Scaling") if user_id is not None else None
+        if prospect_id is None:
+            self.log_test("Conversation History Scaling", False, "Could not set up a benchmark user and prospect")
+            return {}
+
+        print(f"\n🔍 Measuring chat.sendInbound at {', '.join(str(n) for n in counts)} messages "
+              f"of history (prospect {prospect_id})...")
+        steps = []
+        with seeding.connect(database_url) as conn:
+            for count in sorted(counts):
+                loaded = seeding.seed_messages(conn, user_id, [prospect_id], str(count), seed=seed, high=count)
+                print(f"🌱 {count} messages ({loaded['inserted']} inserted in {loaded['seconds']:.1f}s)")
+                step = {"messages": count, "latencies": [], "prompt_tokens": [], "failures": 0, "peak_rss_mb": None}
+                sampler = RssSampler(server_pid, interval=0.1).start() if server_pid else None
+                since = llm_requests_since(forge_url, 0)["last_seq"]
+                try:
+                    for i in range(iterations):
+                        response = self.make_trpc_request("chat.sendInbound", {
+                            "prospectId": prospect_id,
+                            "content": f"Message {i + 1}: ok but how would that work with my schedule?"
+                        })
+                        latency_ms = self.pending_calls[-1]["latency_ms"]
+                        log = llm_requests_since(forge_url, since)
+                        since = log["last_seq"]
+                        prompts = [r["prompt_tokens"] for r in log["requests"] if r["schema"] == "chat_analysis"]
+                        if "error" in response or not prompts:
+                            step["failures"] += 1
+                            continue
+                        step["latencies"].append(latency_ms)
+                        step["prompt_tokens"].append(max(prompts))
+                finally:
+                    if sampler is not None:
+                        sampler.stop()
+                        step["peak_rss_mb"] = sampler.summary()["peak_mb"]
+                steps.append(step)
+
+        report = history_summary(steps)
+        report.update({"user_id": user_id, "prospect_id": prospect_id, "iterations": iterations})
+        print_history(report)
+        failed = sum(step["failures"] for step in steps)
+        self.log_test("Conversation History Scaling", failed == 0,
+                      f"{len(counts)} lengths up to {max(counts)} messages, {failed} failed calls, "
+                      f"+{report['fit']['ms_per_1k_messages']:.1f}ms per 1k messages")
+        return report
+
+    def measure_analytics_scaling(self, database_url: str, counts: List[int], iterations: int = 10,
+                                  seed: Optional[int] = None) -> Dict[str, Any]:
+        """Time analytics.getStats and analytics.getStageDistribution on workspaces of `counts` prospects
+
+        Each size gets its own seeded workspace under one fresh stand-in user,
+        so the larger workspaces also sit next to the smaller ones' rows.
+        getStats must report the seeded total, which catches calls that read
+        the wrong rows.
+        """
+        from perf import seed as seeding
+        from perf.load import analytics_calls
+        from perf.scaling import print_sweep, sweep_summary
+        from perf.scenarios import trpc_data
+
+        user_id = self.login_bench_user("analyticsuser")
+        if user_id is None:
+            self.log_test("Analytics Scaling", False, "Could not log in a benchmark user")
+            return {}
+
+        print(f"\n🔍 Measuring analytics at {', '.join(str(n) for n in counts)} prospects per workspace "
+              f"(user {user_id})...")
+        samples: Dict[int, Dict[str, List[float]]] = {}
+        failures: Dict[int, Dict[str, int]] = {}
+        mismatches = []
+        loads = []
+        with seeding.connect(database_url) as conn:
+            for count in sorted(counts):
+                loaded = seeding.seed_prospects(conn, user_id, count, seed)
+                loads.append(loaded)
+                print(f"🌱 Workspace {loaded['workspace_id']}: {loaded['rows']} prospects "
+                      f"({loaded['inserted']} inserted in {loaded['seconds']:.1f}s)")
+                for _ in range(iterations):
+                    for procedure, method, input_data in analytics_calls(loaded["workspace_id"]):
+                        response = self.make_trpc_request(procedure, input_data, method)
+                        latency_ms = self.pending_calls[-1]["latency_ms"]
+                        if "error" in response:
+                            failures.setdefault(count, {})
+                            failures[count][procedure] = failures[count].get(procedure, 0) + 1
+                            continue
+                        if procedure == "analytics.getStats":
+                            total = (trpc_data(response) or {}).get("total")
+                            if total != count:
+                                mismatches.append({"prospects": count, "total": total})
+                        samples.setdefault(count, {}).setdefault(procedure, []).append(latency_ms)
+
+        report = sweep_summary(samples, failures)
+        report.update({"user_id": user_id, "iterations": iterations, "seeding": loads,
+                       "total_mismatches": mismatches[:10]})
+        print_sweep(report, "LATENCY VS PROSPECTS PER WORKSPACE")
+        if mismatches:
+            print(f"⚠️  analytics.getStats reported {mismatches[0]['total']} prospects for a workspace "
+                  f"of {mismatches[0]['prospects']}")
+        failed = sum(n for by_procedure in failures.values() for n in by_procedure.values())
+        worst = max(report["fits"].items(), key=lambda item: item[1]["ms_per_100k_rows"], default=None)
+        slowest = f", {worst[0]} +{worst[1]['ms_per_100k_rows']:.1f}ms per 100k prospects" if worst else ""
+        self.log_test("Analytics Scaling", failed == 0 and not mismatches,
+                      f"{len(counts)} sizes up to {max(counts)} prospects, {failed} failed calls, "
+                      f"{len(mismatches)} wrong totals{slowest}")
+        return report
+
+    def measure_noisy_neighbours(self, database_url: str, count: int, whales: int = 3, whale_chunks: int = 500000,
+                                 rate: float = 10.0, duration: float = 30.0,
+                                 whale_action: str = "getLearningInsights", whale_concurrency: int = 1,
+                                 observe: int = 50, concurrency: int = 50,
+                                 seed: Optional[int] = None) -> Dict[str, Any]:
+        """Seed `count` tenants with skewed sizes, then compare small tenants' chat.sendInbound
+        with and without the whales running `whale_action` (see perf.tenants)
+
+        Tenants are stand-in users logged in through auth.supabaseLogin; reusing
+        the same stand-in keeps their users, so later runs only top up the data.
+        """
+        import asyncio
+        from perf import seed as seeding
+        from perf.supabase import bulk_tokens, log_in_all
+        from perf.tenants import SLOWDOWN_THRESHOLD, print_fairness, run_fairness, tenant_plan
+
+        print(f"\n🔍 Seeding {count} tenants ({whales} whales with {whale_chunks} chunks each)...")
+        tenants = tenant_plan(count, whales, whale_chunks, seed=seed)
+        tokens = bulk_tokens(self.auth_url, count, prefix="tenant")
+        logins = LoadResults()
+        for tenant, login in zip(tenants, asyncio.run(log_in_all(self.base_url, tokens, logins, concurrency))):
+            if login:
+                tenant.update(cookies=login["cookies"], user_id=login["user_id"])
+        self.latency.merge_dict(logins.to_dict())
+        tenants = [tenant for tenant in tenants if tenant.get("user_id")]
+        if not any(tenant["role"] == "whale" for tenant in tenants):
+            self.log_test("Noisy Neighbours", False, f"Only {len(tenants)}/{count} tenants logged in, no whales")
+            return {}
+        with seeding.connect(database_url) as conn:
+            loaded = seeding.seed_tenants(conn, tenants, seed)
+        print(f"🌱 {loaded['tenants']} tenants: {loaded['chunks_inserted']} chunks and "
+              f"{loaded['prospects_inserted']} prospects inserted in {loaded['seconds']:.1f}s")
+
+        print(f"🔍 chat.sendInbound from {min(observe, len(tenants) - whales)} small tenants at {rate}/s, "
+              f"{duration:.0f}s alone then {duration:.0f}s with whales running {whale_action}...")
+        results = LoadResults()
+        report = asyncio.run(run_fairness(self.base_url, tenants, rate, duration, whale_action, whale_concurrency,
+                                          observe, self.site_url, results, seed))
+        self.latency.merge_dict(results.to_dict())
+        report.update({"tenants_seeded": len(tenants), "logins_failed": count - len(tenants), "seeding": loaded})
+        print_fairness(report)
+        failed = sum(stats["failures"] for stats in report["phases"].values())
+        self.log_test("Noisy Neighbours", failed == 0 and report["phases"]["contended"]["calls"] > 0,
+                      f"small-tenant p95 {report['degradation']['p95']:.2f}x while whales ran {whale_action}, "
+                      f"{report['degraded_share'] * 100:.0f}% of observed tenants slowed "
+                      f"{SLOWDOWN_THRESHOLD:.0f}x or more, {failed} failed calls")
+        return report
+
+    def run_load_test(self, users: int = 10, duration: float = 30.0, prospect_id: int = 1,
+                      think_time: float = 0.0, arrival: str = "closed", rate: float = 10.0,
+                      steps: str = "", seed: int = None, processes: int = 1,
+                      batch: bool = False, scenarios: str = None, profile: str = None,
+                      window: float = 5.0, sessions: List[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Run load through the core tRPC calls
+
+        arrival="closed" runs `users` virtual users back to back; any other
+        value fires requests open-loop on that arrival schedule, spread over
+        `users` sessions, and measures latency from the intended send time.
+        processes > 1 splits the users (or rate) across a worker pool.
+        batch=True groups consecutive same-method calls into tRPC batches.
+        scenarios ("default" or a JSON file) makes closed-loop users sample
+        weighted journeys from perf.scenarios instead of the fixed call list.
+        profile (a preset or stage spec, see perf.profiles) varies the number
+        of closed-loop users over time and slices results per stage and per
+        `window` seconds, with spike recovery times.
+        sessions (from preauthenticate_users) log every virtual user in, so
+        protected procedures run their real handlers instead of UNAUTHORIZED.
+        """
+        import asyncio
+        from perf.load import run_load, default_calls, group_batches, print_load_summary
+        from perf.arrival import build_schedule, run_open_loop
+        from perf.workers import run_multiprocess
+        from perf.scenarios import load_scenarios, render
+        from perf.profiles import parse_profile, print_profile_summary, recovery_report, run_profile
+
+        journeys = load_scenarios(scenarios) if scenarios else None
+        if journeys and "$site_url" in json.dumps(journeys):
+            if not self.site_url:
+                raise ValueError(f"--scenarios {scenarios} fetches fixture pages: use --forge-standin or --site-url")
+            journeys = render(journeys, {"site_url": self.site_url})
+        if journeys and arrival != "closed":
+            raise ValueError("--scenarios needs closed-loop arrival")
+        stages = parse_profile(profile, users, duration) if profile else None
+        if stages and arrival != "closed":
+            raise ValueError("--profile needs closed-loop arrival")
+        calls = default_calls(prospect_id)
+        if batch:
+            calls = group_batches(calls)
+        results = LoadResults()
+        if self.sink is not None:
+            results.report_progress(self.sink)
+        if stages:
+            shape = ", ".join(f"{kind} {start}→{end} users/{seconds:g}s" if start != end
+                              else f"{kind} {start} users/{seconds:g}s"
+                              for _, kind, seconds, start, end in stages)
+            print(f"🚀 Starting profiled load test against {self.base_url}: {shape}")
+            print("=" * 60)
+            if processes > 1:
+                run_multiprocess(self.base_url, processes, users, duration, calls,
+                                 think_time, seed=seed, scenarios=journeys,
+                                 profile=stages, window=window, sessions=sessions, results=results)
+            else:
+                asyncio.run(run_profile(self.base_url, stages, calls, think_time, results=results,
+                                        scenarios=journeys, seed=seed, window=window, sessions=sessions))
+        elif processes > 1:
+            print(f"🚀 Starting {arrival} load test across {processes} worker processes against {self.base_url}")
+            print("=" * 60)
+            run_multiprocess(self.base_url, processes, users, duration, calls,
+                             think_time, arrival, rate, steps, seed, scenarios=journeys,
+                             sessions=sessions, results=results)
+        elif arrival == "closed":
+            print(f"🚀 Starting load test: {users} virtual users for {duration:.0f}s against {self.base_url}")
+            print("=" * 60)
+            asyncio.run(run_load(self.base_url, users, duration, calls, think_time, results=results,
+                                 scenarios=journeys, seed=seed, sessions=sessions))
+        else:
+            shape = f"steps {steps}" if arrival == "step" else f"{rate:g} req/s for {duration:.0f}s"
+            print(f"🚀 Starting open-loop load test: {arrival} arrivals, {shape} over {users} sessions")
+            print("=" * 60)
+            schedule = build_schedule(arrival, rate, duration, steps, seed)
+            asyncio.run(run_open_loop(self.base_url, schedule, calls, users, results=results,
+                                      sessions=sessions))
+        results.maybe_report_progress(final=True)
+        summary = results.summary()
+        summary["arrival"] = arrival
+        summary["processes"] = processes
+        summary["authenticated_users"] = len(sessions or [])
+        if journeys:
+            summary["scenarios"] = {j["name"]: j.get("weight", 1) for j in journeys}
+        if stages:
+            summary["profile"] = [{"stage": name, "kind": kind, "seconds": seconds,
+                                   "users_from": start, "users_to": end}
+                                  for name, kind, seconds, start, end in stages]
+            summary["recovery"] = recovery_report(summary, stages)
+        print_load_summary(summary)
+        if stages:
+            print_profile_summary(summary)
+
+        total = summary["total_requests"]
+        if total == 0:
+            self.log_test("Load Test", False, "No requests completed")
+        else:
+            transport_failures = sum(
+                stats["status_codes"].get("0", 0) for stats in summary["procedures"].values()
+            )
+            self.log_test("Load Test", transport_failures == 0,
+                          f"{total} requests at {summary['throughput_rps']:.1f} req/s, "
+                          f"{transport_failures} connection failures")
+        return summary
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Sales Reply Coach backend tests")
+    parser.add_argument("--mode", choices=["tests", "load", "batch-compare", "compare", "prompt-scaling",
+                                           "transcript-bench", "signup-bench", "llm-faults", "chunk-scaling",
+                                           "history-scaling", "analytics-scaling", "noisy-neighbour"],
+                        default="tests",
+                        help="functional tests (default), concurrent load test, batched vs unbatched "
+                             "comparison, compare the existing --report against --baseline, or "
+                             "chat.sendInbound latency vs prompt size (needs the forge stand-in)")
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--report", default="/app/test_reports/backend_test_results.json",
+                        help="where to write the JSON results")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users (load mode)")
+    parser.add_argument("--duration", type=float, default=30.0, help="load test length in seconds")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="seconds each virtual user waits between calls")
+    parser.add_argument("--prospect-id", type=int, default=1,
+                        help="prospect used for chat.sendInbound in load mode")
+    parser.add_argument("--arrival", choices=["closed", "constant", "poisson", "step"], default="closed",
+                        help="closed-loop virtual users (default) or an open-loop arrival schedule")
+    parser.add_argument("--rate", type=float, default=10.0,
+                        help="requests per second for constant/poisson arrivals")
+    parser.add_argument("--steps", default="",
+                        help="step arrivals as RATE:SECONDS,... e.g. 10:30,50:30,100:60")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for poisson arrivals and seeded rows")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="worker processes to spread the load over (load mode)")
+    parser.add_argument("--batch", action="store_true",
+                        help="send consecutive queries/mutations as tRPC batches (load mode)")
+    parser.add_argument("--scenarios", default=None,
+                        help="'default', 'uploads' (screenshot/PDF uploads), 'scrape' (analyzeProfile and "
+                             "URL ingestion against fixture pages) or a JSON file of weighted user "
+                             "journeys for virtual users to sample (load mode)")
+    parser.add_argument("--profile", default=None,
+                        help="time-varying users: ramp, soak, spike (scaled from --users/--duration) "
+                             "or stages like ramp:0-50:120,soak:50:3600,spike:500:30 (load mode)")
+    parser.add_argument("--window", type=float, default=5.0,
+                        help="timeline window in seconds for --profile runs")
+    parser.add_argument("--batch-procedures", default="auth.me,brain.getStats,workspace.list",
+                        help="procedures compared in batch-compare mode")
+    parser.add_argument("--iterations", type=int, default=20,
+                        help="rounds in batch-compare, transcript-bench and llm-faults modes and per "
+                             "size in the *-scaling modes, messages in prompt-scaling mode")
+    parser.add_argument("--fault-procedures", default="chat.sendInbound",
+                        help="procedures called with and without --llm-faults in llm-faults mode")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="the server's Postgres, seeded directly in the chunk-, history- and "
+                             "analytics-scaling modes (default: $DATABASE_URL)")
+    parser.add_argument("--dataset", default=None,
+                        help="perf.snapshots dataset --database-url was cloned from; its manifest goes "
+                             "into the report and the run stops if the database holds another one")
+    parser.add_argument("--chunk-counts", default="10000,100000,1000000",
+                        help="knowledge_chunks per user to measure at in chunk-scaling mode")
+    parser.add_argument("--chunk-procedures", default="knowledgeBase.brainStats,brain.getChunks,knowledgeBase.delete",
+                        help="procedures timed at each size in chunk-scaling mode; chat.sendInbound "
+                             "(searchKnowledgeChunks) also needs the LLM stand-in")
+    parser.add_argument("--message-counts", default="10,100,1000,5000",
+                        help="messages of prospect history to measure at in history-scaling mode")
+    parser.add_argument("--prospect-counts", default="100,10000,100000,1000000",
+                        help="prospects per seeded workspace to measure at in analytics-scaling mode")
+    parser.add_argument("--tenants", type=int, default=2000,
+                        help="stand-in users seeded in noisy-neighbour mode; small tenants send "
+                             "chat.sendInbound at --rate for --duration, alone and then next to the whales")
+    parser.add_argument("--whales", type=int, default=3, help="tenants with huge brains in noisy-neighbour mode")
+    parser.add_argument("--whale-chunks", type=int, default=500000,
+                        help="knowledge chunks per whale; small tenants stay below a tenth of this")
+    parser.add_argument("--whale-action", choices=["getLearningInsights", "processItem"],
+                        default="getLearningInsights",
+                        help="what whales run in closed loops; processItem needs the site stand-in")
+    parser.add_argument("--whale-concurrency", type=int, default=1, help="closed loops per whale")
+    parser.add_argument("--observe-tenants", type=int, default=50,
+                        help="small tenants measured in noisy-neighbour mode, spread over the size range")
+    parser.add_argument("--baseline", default=None,
+                        help="stored report to compare against; regressions make the run exit non-zero")
+    parser.add_argument("--threshold", action="append", default=None,
+                        help="allowed regression as [PROCEDURE:]METRIC=PERCENT, repeatable "
+                             "(e.g. p95=20, brain.getStats:p99=50, throughput=10, error_rate=1); "
+                             "default p95=20, throughput=20 and error_rate=1")
+    parser.add_argument("--results-jsonl", default=None,
+                        help="stream every test result to this JSONL file (default: --report with .jsonl)")
+    parser.add_argument("--rotate-mb", type=float, default=100.0,
+                        help="start a new JSONL segment once the current one reaches this size")
+    parser.add_argument("--forge-standin", action="store_true",
+                        help="start the local forge API stand-in (LLM, Whisper) for the run; the server "
+                             "must use BUILT_IN_FORGE_API_URL and OPENAI_API_URL=http://127.0.0.1:<--forge-port>")
+    parser.add_argument("--forge-port", type=int, default=forge.DEFAULT_PORT)
+    parser.add_argument("--forge-url", default=None,
+                        help="an already running forge stand-in to read LLM request logs from")
+    forge.add_arguments(parser)
+    parser.add_argument("--auth-url", default=None,
+                        help="a running Supabase auth stand-in (default: the --forge-standin one)")
+    parser.add_argument("--preauth-users", type=int, default=0,
+                        help="log this many stand-in users in before load mode; virtual users "
+                             "share their sessions (server needs SUPABASE_URL and VITE_APP_ID set)")
+    parser.add_argument("--preauth-concurrency", type=int, default=50,
+                        help="parallel auth.supabaseLogin calls while pre-authenticating")
+    parser.add_argument("--server-pid", type=int, default=None,
+                        help="sample this server process's resident memory during the run (Linux)")
+    parser.add_argument("--mail-url", default=None,
+                        help="a running Resend stand-in to read verification codes from "
+                             "(default: the --forge-standin one; server needs RESEND_BASE_URL)")
+    parser.add_argument("--site-url", default=None,
+                        help="base URL of fixture pages for --scenarios scrape "
+                             "(default: the --forge-standin's /site)")
+    parser.add_argument("--signup-concurrency", type=int, default=50,
+                        help="parallel signups in signup-bench mode (--users sets the total)")
+    parser.add_argument("--media-shims", action="store_true",
+                        help="run yt-dlp/ffmpeg from perf/shims (offline, deterministic); "
+                             "implied by --mode transcript-bench")
+    parser.add_argument("--shim-audio-seconds", type=float, default=None,
+                        help="length of the audio the yt-dlp shim downloads (default 600)")
+    parser.add_argument("--shim-audio-kbps", type=int, default=None,
+                        help="MP3 bitrate of the shim audio (default 128; 24MB is ~26 minutes at 128)")
+    parser.add_argument("--shim-audio-ext", default=None,
+                        help="container the shim downloads, e.g. m4a to exercise the ffmpeg conversion")
+    parser.add_argument("--shim-captions", choices=["vtt", "srt", "none"], default=None,
+                        help="captions yt-dlp finds; none forces the Whisper path")
+    parser.add_argument("--shim-delay", default=None,
+                        help="extra delay per yt-dlp call (same syntax as --llm-latency)")
+    parser.add_argument("--shim-download-mbps", type=float, default=None,
+                        help="simulated audio download bandwidth in megabits per second")
+    parser.add_argument("--shim-ffmpeg-speed", type=float, default=None,
+                        help="ffmpeg speed as a multiple of real time (e.g. 200)")
+    parser.add_argument("--transcript-urls",
+                        default="https://www.youtube.com/watch?v=dQw4w9WgXcQ,"
+                                "https://www.instagram.com/reel/C0ffee123/,"
+                                "https://www.tiktok.com/@coach/video/7300000000000000000",
+                        help="comma-separated URLs for transcript-bench mode")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="ignore latency regressions smaller than this many milliseconds")
+    args = parser.parse_args(argv)
+    from perf.compare import parse_threshold
+    for spec in args.threshold or []:
+        try:
+            parse_threshold(spec)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+def save_results(tester: SalesReplyCoachTester, path: str, extra: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Write the JSON report and return it"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'summary': {
+            'total_tests': tester.tests_run,
+            'passed': tester.tests_passed,
+            'failed': tester.tests_run - tester.tests_passed,
+            'success_rate': (tester.tests_passed/tester.tests_run*100) if tester.tests_run > 0 else 0
+        },
+        'test_totals': tester.test_totals,
+        # Most recent results only; results_files hold every one
+        'test_results': list(tester.test_results)
+    }
+    if tester.sink is not None:
+        report['results_files'] = tester.sink.files()
+        report['results_run'] = tester.sink.run_id
+    if tester.latency.histograms:
+        # Per-procedure percentiles and raw histogram buckets for every tRPC call made
+        report['latency'] = tester.latency.summary()['procedures']
+    report.update(extra or {})
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def check_baseline(args, current: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Compare a report (default: the stored --report) against --baseline and print the result
+
+    The returned comparison's "gate_failed" says whether the run should fail.
+    """
+    from perf.compare import (DEFAULT_THRESHOLDS, compare_reports, gate_failed, load_report,
+                              parse_threshold, print_comparison)
+    thresholds = [parse_threshold(spec) for spec in (args.threshold or DEFAULT_THRESHOLDS)]
+    current = current if current is not None else load_report(args.report)
+    comparison = compare_reports(load_report(args.baseline), current, thresholds, args.min_delta_ms,
+                                 require_all=bool(args.threshold))
+    comparison["gate_failed"] = gate_failed(comparison)
+    print_comparison(comparison)
+    return comparison
+
+def main(argv=None):
     """Main test runner"""
-    tester = SalesReplyCoachTester()
+    args = parse_args(argv)
+    tester = SalesReplyCoachTester(args.base_url)
+    standin = None
+    memory = None
     
     try:
-        success = tester.run_all_tests()
+        if args.mode == "compare":
+            if not args.baseline:
+                print("❌ --mode compare needs --baseline")
+                return 2
+            return 1 if check_baseline(args)["gate_failed"] else 0
+        
+        if args.forge_standin:
+            standin = forge.ForgeStandIn(args.forge_port, forge.cli_args(args)).start()
+            print(f"🧪 Forge stand-in running at {standin.url} (server needs "
+                  f"BUILT_IN_FORGE_API_URL={standin.url} OPENAI_API_URL={standin.url} "
+                  f"SUPABASE_URL={standin.url} RESEND_BASE_URL={standin.url} "
+                  f"INSTAGRAM_OEMBED_URL={standin.url}/instagram/oembed "
+                  f"TIKTOK_OEMBED_URL={standin.url}/tiktok/oembed)")
+        tester.auth_url = args.auth_url or (standin.url if standin is not None else None)
+        tester.mail_url = args.mail_url or (standin.url if standin is not None else None)
+        tester.site_url = args.site_url or (f"{standin.url}/site" if standin is not None else None)
+        
+        if args.media_shims or args.mode == "transcript-bench":
+            from perf import media
+            tester.media_env = media.shim_env(
+                audio_seconds=args.shim_audio_seconds, audio_kbps=args.shim_audio_kbps,
+                audio_ext=args.shim_audio_ext, captions=args.shim_captions, delay=args.shim_delay,
+                download_mbps=args.shim_download_mbps, ffmpeg_speed=args.shim_ffmpeg_speed)
+            if standin is not None:
+                # transcribeWithOpenAIWhisper only needs a key to be set
+                tester.media_env["OPENAI_API_URL"] = standin.url
+                tester.media_env.setdefault("OPENAI_API_KEY", "perf-standin")
+            print(f"🧪 yt-dlp/ffmpeg shims on PATH: {media.SHIM_DIR}")
+        
+        from perf.sink import JsonlSink
+        results_path = args.results_jsonl or os.path.splitext(args.report)[0] + ".jsonl"
+        tester.sink = JsonlSink(results_path, max_bytes=int(args.rotate_mb * 1024 * 1024))
+        
+        extra = {}
+        if args.dataset:
+            from perf.snapshots import database_of, dataset_version, is_current, read_manifest
+            if not args.database_url:
+                print("❌ --dataset needs --database-url (or DATABASE_URL)")
+                return 2
+            snapshots = f"python -m perf.snapshots --database-url {args.database_url}"
+            reclone = f"{snapshots} restore {args.dataset} --as {database_of(args.database_url)} --replace"
+            tester.dataset = read_manifest(args.database_url)
+            if tester.dataset is None:
+                # restore --replace only drops databases cloned from a dataset
+                print(f"❌ {args.database_url} holds no dataset; clone one into a new database with: "
+                      f"{snapshots} restore {args.dataset} --as {args.dataset.replace('-', '_')}_bench "
+                      f"and point the server and --database-url at the printed DATABASE_URL")
+                return 2
+            if tester.dataset.get("dataset") != args.dataset:
+                print(f"❌ {args.database_url} holds {tester.dataset['version']}, not {args.dataset}; run: {reclone}")
+                return 2
+            if not is_current(tester.dataset):
+                schema = tester.dataset.get("schema", "sql")
+                print(f"❌ {args.database_url} holds {tester.dataset['version']} but the code builds "
+                      f"{dataset_version(args.dataset, schema)}; run: "
+                      f"{snapshots} build {args.dataset} --schema {schema} && {reclone}")
+                return 2
+            print(f"📦 Dataset {tester.dataset['version']} (built {tester.dataset['built_at']})")
+            extra['dataset'] = tester.dataset
+            if args.seed is None:
+                # Tenant plans must match the sizes the dataset was seeded with
+                args.seed = tester.dataset["seed"]
+        if args.server_pid:
+            from perf.memory import RssSampler
+            memory = RssSampler(args.server_pid).start()
+        
+        if args.mode == "load":
+            sessions = None
+            if args.preauth_users:
+                if not tester.auth_url:
+                    print("❌ --preauth-users needs --forge-standin or --auth-url")
+                    return 2
+                sessions = tester.preauthenticate_users(args.preauth_users, args.preauth_concurrency)
+            extra['load'] = tester.run_load_test(args.users, args.duration, args.prospect_id,
+                                                 args.think_time, args.arrival, args.rate,
+                                                 args.steps, args.seed, args.processes, args.batch,
+                                                 args.scenarios, args.profile, args.window, sessions)
+            success = tester.tests_passed == tester.tests_run
+        elif args.mode == "batch-compare":
+            procedures = [p.strip() for p in args.batch_procedures.split(",") if p.strip()]
+            extra['batch_comparison'] = tester.compare_batching(procedures, args.iterations)
+            success = tester.tests_passed == tester.tests_run
+        elif args.mode == "prompt-scaling":
+            forge_url = standin.url if standin is not None else args.forge_url
+            if not forge_url or not tester.auth_url:
+                print("❌ --mode prompt-scaling needs --forge-standin (or --forge-url with --auth-url)")
+                return 2
+            extra['prompt_scaling'] = tester.measure_prompt_scaling(forge_url, args.iterations)
+            success = tester.tests_passed == tester.tests_run
+        elif args.mode == "llm-faults":
+            forge_url = standin.url if standin is not None else args.forge_url
+            if not forge_url or not args.llm_faults or not tester.auth_url:
+                print("❌ --mode llm-faults needs --llm-faults and --forge-standin "
+                      "(or --forge-url with --auth-url)")
+                return 2
+            procedures = [p.strip() for p in args.fault_procedures.split(",") if p.strip()]
+            extra['llm_faults'] = tester.measure_llm_faults(forge_url, args.llm_faults, procedures,
+                                                            args.iterations)
+            success = tester.tests_passed == tester.tests_run
+        elif args.mode == "chunk-scaling":
+            if not tester.auth_url or not args.database_url:
+                print("❌ --mode chunk-scaling needs --database-url (or DATABASE_URL) and "
+                      "--forge-standin or --auth-url")
+                return 2
+            counts = [int(n) for n in args.chunk_counts.split(",") if n.strip()]
+            procedures = [p.strip() for p in args.chunk_procedures.split(",") if p.strip()]
+            extra['chunk_scaling'] = tester.measure_chunk_scaling(args.database_url, counts, procedures,
+                                                                  args.iterations, args.seed)
+            success = tester.tests_passed == tester.tests_run
+        elif args.mode == "history-scaling":
+            forge_url = standin.url if standin is not None else args.forge_url
+            if not forge_url or not tester.auth_url or not args.database_url:
+                print("❌ --mode history-scaling needs --database-url (or DATABASE_URL) and "
+                      "--forge-standin (or --forge-url with --auth-url)")
+                return 2
+            counts = [int(n) for n in args.message_counts.split(",") if n.strip()]
+            extra['history_scaling'] = tester.measure_history_scaling(args.database_url, forge_url, counts,
+                                                                      args.iterations, args.server_pid,
+                                                                      args.seed)
+            success = tester.tests_passed == tester.tests_run
+        elif args.mode == "analytics-scaling":
+            if not tester.auth_url or not args.database_url:
+                print("❌ --mode analytics-scaling needs --database-url (or DATABASE_URL) and "
+                      "--forge-standin or --auth-url")
+                return 2
+            counts = [int(n) for n in args.prospect_counts.split(",") if n.strip()]
+            extra['analytics_scaling'] = tester.measure_analytics_scaling(args.database_url, counts,
+                                                                          args.iterations, args.seed)
+            success = tester.tests_passed == tester.tests_run
+        elif args.mode == "noisy-neighbour":
+            if not tester.auth_url or not args.database_url:
+                print("❌ --mode noisy-neighbour needs --database-url (or DATABASE_URL) and "
+                      "--forge-standin or --auth-url")
+                return 2
+            extra['noisy_neighbours'] = tester.measure_noisy_neighbours(
+                args.database_url, args.tenants, args.whales, args.whale_chunks, args.rate, args.duration,
+                args.whale_action, args.whale_concurrency, args.observe_tenants, args.preauth_concurrency,
+                args.seed)
+            success = tester.tests_passed == tester.tests_run
+        elif args.mode == "signup-bench":
+            if not tester.mail_url:
+                print("❌ --mode signup-bench needs --forge-standin or --mail-url")
+                return 2
+            extra['signups'] = tester.benchmark_signups(args.users, args.signup_concurrency)
+            success = tester.tests_passed == tester.tests_run
+        elif args.mode == "transcript-bench":
+            urls = [u.strip() for u in args.transcript_urls.split(",") if u.strip()]
+            extra['transcripts'] = tester.measure_transcripts(urls, args.iterations)
+            success = tester.tests_passed == tester.tests_run
+        else:
+            success = tester.run_all_tests()
+        
+        if memory is not None:
+            from perf.memory import print_memory
+            memory.stop()
+            extra['server_memory'] = memory.summary()
+            print_memory(extra['server_memory'])
+        if standin is not None:
+            extra['forge_standin'] = standin.stats()
+            replay = extra['forge_standin'].get('llm_replay') or {}
+            if replay.get('misses'):
+                print(f"⚠️  {replay['misses']} LLM prompts were not in {replay['cassette']}; "
+                      f"those replies were not replayed")
         
         # Save detailed results
-        import os
-        os.makedirs('/app/test_reports', exist_ok=True)
-        with open('/app/test_reports/backend_test_results.json', 'w') as f:
-            json.dump({
-                'timestamp': datetime.now().isoformat(),
-                'summary': {
-                    'total_tests': tester.tests_run,
-                    'passed': tester.tests_passed,
-                    'failed': tester.tests_run - tester.tests_passed,
-                    'success_rate': (tester.tests_passed/tester.tests_run*100) if tester.tests_run > 0 else 0
-                },
-                'test_results': tester.test_results
-            }, f, indent=2)
+        report = save_results(tester, args.report, extra)
+        
+        if args.baseline:
+            comparison = check_baseline(args, report)
+            if comparison["gate_failed"]:
+                success = False
+            report['baseline_comparison'] = comparison
+            with open(args.report, 'w') as f:
+                json.dump(report, f, indent=2)
         
         return 0 if success else 1
         
@@ -432,6 +1537,13 @@ def main():
     except Exception as e:
         print(f"\n💥 Test runner error: {str(e)}")
         return 1
+    finally:
+        if memory is not None:
+            memory.stop()
+        if tester.sink is not None:
+            tester.sink.close()
+        if standin is not None:
+            standin.stop()
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,4 @@
+"""
+Sales Reply Coach performance harness
+Load generation and reporting used by backend_test.py
+"""
@@ -0,0 +1,124 @@
+"""
+Open-loop arrival schedules
+Requests fire on a fixed timeline whether or not earlier ones have finished,
+so a stalled chat.sendInbound cannot hold back the next send (no coordinated
+omission). Latency is measured from the intended send time.
+"""
+
+import asyncio
+import random
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from perf.load import Call, VirtualUser, session_for
+from perf.results import LoadResults
+
+# (requests per second, seconds) stages for the step profile
+Step = Tuple[float, float]
+
+
+def constant_schedule(rate: float, duration: float) -> Iterator[float]:
+    """Evenly spaced send offsets (seconds from start)"""
+    if rate <= 0:
+        return
+    interval = 1.0 / rate
+    offset = 0.0
+    while offset < duration:
+        yield offset
+        offset += interval
+
+
+def poisson_schedule(rate: float, duration: float, seed: int = None) -> Iterator[float]:
+    """Exponentially distributed inter-arrival gaps with mean 1/rate"""
+    if rate <= 0:
+        return
+    rng = random.Random(seed)
+    offset = rng.expovariate(rate)
+    while offset < duration:
+        yield offset
+        offset += rng.expovariate(rate)
+
+
+def step_schedule(steps: List[Step]) -> Iterator[float]:
+    """Constant rate within each stage, stages run back to back"""
+    base = 0.0
+    for rate, seconds in steps:
+        for offset in constant_schedule(rate, seconds):
+            yield base + offset
+        base += seconds
+
+
+def parse_steps(spec: str) -> List[Step]:
+    """Parse '10:30,50:30,100:60' into [(10, 30), (50, 30), (100, 60)]"""
+    steps = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        rate, _, seconds = part.partition(":")
+        if not seconds:
+            raise ValueError(f"Invalid step '{part}', expected RATE:SECONDS")
+        steps.append((float(rate), float(seconds)))
+    return steps
+
+
+def build_schedule(kind: str, rate: float = 10.0, duration: float = 30.0,
+                   steps: str = "", seed: int = None) -> Iterator[float]:
+    """Schedule factory used by the command line"""
+    if kind == "constant":
+        return constant_schedule(rate, duration)
+    if kind == "poisson":
+        return poisson_schedule(rate, duration, seed)
+    if kind == "step":
+        return step_schedule(parse_steps(steps))
+    raise ValueError(f"Unknown arrival schedule: {kind}")
+
+
+async def run_open_loop(base_url: str, schedule: Iterator[float], calls: List[Call],
+                        connections: int = 50, max_in_flight: int = 10000,
+                        results: LoadResults = None,
+                        sessions: List[Dict[str, str]] = None) -> LoadResults:
+    """Fire calls at the scheduled offsets, round-robin over procedures and sessions
+
+    Each send is its own task; the scheduler never waits for responses.
+    Sends that would exceed max_in_flight are counted as dropped rather than
+    delayed, so an overloaded server shows up as errors instead of silently
+    lowering the offered rate.
+    """
+    results = results if results is not None else LoadResults()
+    vus = [VirtualUser(i, base_url, results, cookies=session_for(sessions, i))
+           for i in range(max(1, connections))]
+    for vu in vus:
+        await vu.__aenter__()
+
+    in_flight = set()
+    # Each VU walks the procedures on its own, starting at its index, so every
+    # session mixes them even when the VU count is a multiple of len(calls)
+    sent = list(range(len(vus)))
+    try:
+        results.started_at = time.perf_counter()
+        for index, offset in enumerate(schedule):
+            intended = results.started_at + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            vu_index = index % len(vus)
+            procedure, method, input_data = calls[sent[vu_index] % len(calls)]
+            sent[vu_index] += 1
+            if len(in_flight) >= max_in_flight:
+                results.record_dropped(procedure)
+                continue
+
+            vu = vus[vu_index]
+            task = asyncio.ensure_future(vu.call(procedure, input_data, method, intended_start=intended))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        results.finished_at = time.perf_counter()
+    finally:
+        for vu in vus:
+            await vu.__aexit__(None, None, None)
+    return results
@@ -0,0 +1,172 @@
+"""
+Baseline comparison for backend_test_results.json reports
+Diffs per-procedure latency percentiles and throughput between a stored
+baseline run and the current one, and flags regressions past a threshold,
+e.g. "brain.getStats:p95=20" fails when brain.getStats p95 rises over 20%.
+"""
+
+import json
+from typing import Dict, Any, List, Optional
+
+from perf.histogram import REPORT_PERCENTILES, percentile_key
+
+# Checked when no --threshold is given. Failed calls still count towards
+# latency and throughput, so a build that fails fast would look faster
+# without the error_rate check.
+DEFAULT_THRESHOLDS = ["p95=20", "throughput=20", "error_rate=1"]
+
+# Metrics where a higher value is better; everything else regresses upwards
+HIGHER_IS_BETTER = {"throughput"}
+
+# Everything metric_value() can read from a report's procedure stats
+METRICS = ["min", "mean", "max", "throughput", "error_rate"] + [percentile_key(p) for p in REPORT_PERCENTILES]
+
+
+class Threshold:
+    """Allowed worsening of one metric, in percent (error_rate: percentage points)"""
+
+    def __init__(self, metric: str, limit: float, procedure: Optional[str] = None):
+        self.metric = metric
+        self.limit = limit
+        self.procedure = procedure
+
+    def applies_to(self, procedure: str) -> bool:
+        return self.procedure is None or self.procedure == procedure
+
+    def __str__(self):
+        prefix = f"{self.procedure}:" if self.procedure else ""
+        return f"{prefix}{self.metric}={self.limit:g}"
+
+
+def parse_threshold(spec: str) -> Threshold:
+    """Parse '[PROCEDURE:]METRIC=PERCENT', e.g. 'p95=20' or 'brain.getStats:p99=50'"""
+    target, _, limit = spec.partition("=")
+    if not limit:
+        raise ValueError(f"Invalid threshold '{spec}', expected [PROCEDURE:]METRIC=PERCENT")
+    procedure, _, metric = target.rpartition(":")
+    if metric.strip() not in METRICS:
+        raise ValueError(f"Unknown metric '{metric.strip()}' in threshold '{spec}', "
+                         f"expected one of {', '.join(METRICS)}")
+    return Threshold(metric.strip(), float(limit), procedure.strip() or None)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def report_procedures(report: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Per-procedure stats from a report: the load run if present, else functional calls"""
+    if "load" in report:
+        return report["load"].get("procedures", {})
+    # Functional runs have no meaningful request rate, only latencies
+    return {procedure: {k: v for k, v in stats.items() if k != "throughput_rps"}
+            for procedure, stats in report.get("latency", {}).items()}
+
+
+def metric_value(stats: Dict[str, Any], metric: str) -> Optional[float]:
+    if metric == "throughput":
+        return stats.get("throughput_rps")
+    if metric == "error_rate":
+        return stats.get("error_rate", 0.0) * 100
+    return stats.get("latency_ms", {}).get(metric)
+
+
+def change_percent(metric: str, before: float, after: float) -> float:
+    """How much worse `after` is than `before` (negative means better)"""
+    if metric == "error_rate":
+        return after - before
+    if before == 0:
+        return 0.0 if after == 0 else float("inf")
+    change = (after - before) / before * 100
+    return -change if metric in HIGHER_IS_BETTER else change
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    thresholds: List[Threshold], min_delta_ms: float = 1.0,
+                    require_all: bool = True) -> Dict[str, Any]:
+    """Check every threshold against every procedure present in both runs
+
+    Latency changes smaller than min_delta_ms never count as regressions, so
+    sub-millisecond jitter on cheap procedures doesn't trip a percentage limit.
+    Thresholds that checked nothing (a procedure missing from either run, or
+    a metric neither run recorded) are listed as unmatched; see gate_failed().
+    With require_all off (the defaults, which include throughput that
+    functional runs lack) they are only listed when nothing was checked.
+    """
+    before_procs = report_procedures(baseline)
+    after_procs = report_procedures(current)
+    checks = []
+    matched = set()
+    for procedure in sorted(set(before_procs) & set(after_procs)):
+        for threshold in thresholds:
+            if not threshold.applies_to(procedure):
+                continue
+            before = metric_value(before_procs[procedure], threshold.metric)
+            after = metric_value(after_procs[procedure], threshold.metric)
+            if before is None or after is None:
+                continue
+            matched.add(str(threshold))
+            change = change_percent(threshold.metric, before, after)
+            regressed = change > threshold.limit
+            if regressed and threshold.metric not in HIGHER_IS_BETTER | {"error_rate"}:
+                regressed = after - before >= min_delta_ms
+            checks.append({
+                "procedure": procedure,
+                "metric": threshold.metric,
+                "baseline": before,
+                "current": after,
+                "change_pct": change,
+                "threshold": threshold.limit,
+                "regressed": regressed,
+            })
+    return {
+        "baseline_timestamp": baseline.get("timestamp"),
+        "current_timestamp": current.get("timestamp"),
+        # perf.snapshots versions; numbers from different data aren't comparable
+        "baseline_dataset": (baseline.get("dataset") or {}).get("version"),
+        "current_dataset": (current.get("dataset") or {}).get("version"),
+        "thresholds": [str(t) for t in thresholds],
+        "checks": checks,
+        "regressions": [c for c in checks if c["regressed"]],
+        "unmatched_thresholds": [str(t) for t in thresholds
+                                 if str(t) not in matched and (require_all or not matched)],
+        "missing_procedures": sorted(set(before_procs) - set(after_procs)),
+        "new_procedures": sorted(set(after_procs) - set(before_procs)),
+    }
+
+
+def print_comparison(comparison: Dict[str, Any]):
+    """Pretty-print a compare_reports() result"""
+    print("\n" + "=" * 60)
+    print("📐 BASELINE COMPARISON")
+    print("=" * 60)
+    print(f"Baseline: {comparison['baseline_timestamp']}  Current: {comparison['current_timestamp']}")
+    print(f"Thresholds: {', '.join(comparison['thresholds'])}")
+    if comparison.get("baseline_dataset") != comparison.get("current_dataset"):
+        print(f"⚠️  Baseline ran on {comparison.get('baseline_dataset') or 'unseeded data'}, this run on "
+              f"{comparison.get('current_dataset') or 'unseeded data'}")
+    checks = comparison["checks"]
+    width = max([22] + [len(c["procedure"]) + 2 for c in checks])
+    print(f"\n{'procedure':<{width}}{'metric':>12}{'baseline':>11}{'current':>11}{'worse':>10}{'limit':>8}")
+    for check in checks:
+        flag = "  ❌" if check["regressed"] else ""
+        print(f"{check['procedure']:<{width}}{check['metric']:>12}{check['baseline']:>11.1f}"
+              f"{check['current']:>11.1f}{check['change_pct']:>+9.1f}%{check['threshold']:>7g}%{flag}")
+    for procedure in comparison["missing_procedures"]:
+        print(f"❌ {procedure} is in the baseline but not in this run")
+    for threshold in comparison.get("unmatched_thresholds", []):
+        print(f"❌ Threshold {threshold} matched no procedure in both runs")
+    regressions = comparison["regressions"]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over threshold")
+    elif comparison.get("unmatched_thresholds") or comparison["missing_procedures"]:
+        print("\n❌ Some thresholds or procedures went unchecked, so the gate cannot pass")
+    else:
+        print("\n✅ No regressions over threshold")
+
+
+def gate_failed(comparison: Dict[str, Any]) -> bool:
+    """True when the run regressed, a threshold checked nothing or a baseline procedure is gone"""
+    return bool(comparison["regressions"] or comparison.get("unmatched_thresholds")
+                or comparison["missing_procedures"])
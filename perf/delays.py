@@ -0,0 +1,53 @@
+"""
+Latency distributions for the stand-in servers
+Specs are NAME:PARAMS in milliseconds:
+    fixed:200             always 200ms
+    uniform:100-500       uniform between 100 and 500ms
+    normal:800,200        mean 800ms, std dev 200ms (clamped at 0)
+    lognormal:800,0.5     median 800ms, sigma 0.5 (long right tail, like real LLMs)
+    exp:300               exponential with mean 300ms
+"""
+
+import math
+import random
+from typing import Optional
+
+
+class LatencyModel:
+    """Samples delays in seconds from one of the distributions above"""
+
+    def __init__(self, spec: str = "fixed:0", seed: Optional[int] = None):
+        self.spec = spec
+        self.rng = random.Random(seed)
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        try:
+            if kind == "fixed":
+                self.params = (float(params or 0),)
+            elif kind == "uniform":
+                low, _, high = params.partition("-")
+                self.params = (float(low), float(high or low))
+            elif kind in ("normal", "lognormal"):
+                center, _, spread = params.partition(",")
+                self.params = (float(center), float(spread or 0))
+            elif kind == "exp":
+                self.params = (float(params),)
+            else:
+                raise ValueError(f"Unknown latency distribution '{kind}'")
+        except ValueError as e:
+            raise ValueError(f"Invalid latency spec '{spec}': {e}")
+
+    def sample_ms(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self.rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, self.rng.gauss(*self.params))
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return median * math.exp(self.rng.gauss(0.0, sigma)) if median > 0 else 0.0
+        return self.rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+
+    def sample(self) -> float:
+        return self.sample_ms() / 1000.0
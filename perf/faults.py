@@ -0,0 +1,137 @@
+"""
+Fault injection for the LLM stand-in
+Specs are comma-separated KIND=RATE pairs, rates as fractions of requests:
+    html=0.05       502 with an nginx-style HTML error page (callLLMWithRetry's
+                    "service unavailable" branch)
+    5xx=0.05        500/502/503/504 with a JSON error body
+    timeout=0.01    hold the request open for `hang_seconds`, then 504; Node's
+                    fetch gives up first (undici headersTimeout is 300s)
+    drip=0.05       a valid reply whose body trickles out over `drip_seconds`
+By default only primary (invokeLLM) requests fail; the gpt-4o-mini fallback
+that callLLMWithRetry switches to stays healthy unless scope is "all".
+"""
+
+import asyncio
+import random
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+FAULT_KINDS = ("html", "5xx", "timeout", "drip")
+# Model callOpenAIFallback (server/videoTranscription.ts) requests
+FALLBACK_MODEL = "gpt-4o-mini"
+
+HTML_ERROR_PAGE = """<html>
+<head><title>502 Bad Gateway</title></head>
+<body>
+<center><h1>502 Bad Gateway</h1></center>
+<hr><center>nginx</center>
+</body>
+</html>
+"""
+
+
+def parse_faults(spec: str, kinds: Tuple[str, ...] = FAULT_KINDS) -> Dict[str, float]:
+    rates: Dict[str, float] = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        kind, _, rate = part.strip().partition("=")
+        if kind not in kinds:
+            raise ValueError(f"Unknown fault '{kind}', expected one of {', '.join(kinds)}")
+        try:
+            rates[kind] = float(rate)
+        except ValueError:
+            raise ValueError(f"Invalid fault rate in '{part}'")
+    if sum(rates.values()) > 1.0:
+        raise ValueError(f"Fault rates in '{spec}' add up to more than 1")
+    return rates
+
+
+def upstream_of(payload: Dict) -> str:
+    return "fallback" if payload.get("model") == FALLBACK_MODEL else "primary"
+
+
+class FaultInjector:
+    """Decides which requests fail and produces the failure"""
+
+    def __init__(self, spec: str = "", seed: Optional[int] = None, hang_seconds: float = 330.0,
+                 drip_seconds: float = 30.0, scope: str = "primary", kinds: Tuple[str, ...] = FAULT_KINDS):
+        self.rng = random.Random(seed)
+        self.kinds = kinds
+        self.hang_seconds = hang_seconds
+        self.drip_seconds = drip_seconds
+        self.scope = scope
+        self.configure(spec)
+        self.injected: Dict[str, int] = {}
+
+    def configure(self, spec: str):
+        self.rates = parse_faults(spec, self.kinds)
+        self.spec = spec or ""
+
+    def pick(self, upstream: str) -> Optional[str]:
+        if not self.rates or (self.scope == "primary" and upstream != "primary"):
+            return None
+        roll = self.rng.random()
+        for kind, rate in self.rates.items():
+            if roll < rate:
+                self.injected[kind] = self.injected.get(kind, 0) + 1
+                return kind
+            roll -= rate
+        return None
+
+    async def respond(self, kind: str) -> "web.Response":
+        """The error response for html, 5xx and timeout faults"""
+        from aiohttp import web
+        if kind == "html":
+            return web.Response(status=502, text=HTML_ERROR_PAGE, content_type="text/html")
+        if kind == "timeout":
+            await asyncio.sleep(self.hang_seconds)
+            return web.json_response({"error": {"message": "upstream request timeout"}}, status=504)
+        status = self.rng.choice([500, 502, 503, 504])
+        return web.json_response({"error": {"message": f"Injected upstream error {status}",
+                                            "type": "server_error"}}, status=status)
+
+    async def drip(self, request: "web.Request", body: bytes) -> "web.StreamResponse":
+        """Send a complete JSON body a few bytes at a time over drip_seconds"""
+        from aiohttp import web
+        response = web.StreamResponse(headers={"Content-Type": "application/json",
+                                               "Content-Length": str(len(body))})
+        await response.prepare(request)
+        pieces = max(1, min(len(body), int(self.drip_seconds * 10)))
+        size = -(-len(body) // pieces)
+        for offset in range(0, len(body), size):
+            await response.write(body[offset:offset + size])
+            await asyncio.sleep(self.drip_seconds / pieces)
+        await response.write_eof()
+        return response
+
+    async def update(self, request: "web.Request") -> "web.Response":
+        """POST /__llm/faults {"spec": "html=0.1,..."} - change fault rates mid-run"""
+        from aiohttp import web
+        body = await request.json()
+        try:
+            self.configure(body.get("spec", ""))
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response(self.stats())
+
+    def stats(self) -> Dict:
+        return {
+            "spec": self.spec,
+            "scope": self.scope,
+            "injected": dict(self.injected),
+            "hang_seconds": self.hang_seconds,
+            "drip_seconds": self.drip_seconds,
+        }
+
+
+def set_faults(forge_url: str, spec: str) -> Dict:
+    """Change a running stand-in's fault rates; returns its fault stats"""
+    import json
+    import urllib.request
+    request = urllib.request.Request(f"{forge_url}/__llm/faults", data=json.dumps({"spec": spec}).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
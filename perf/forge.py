@@ -0,0 +1,316 @@
+"""
+Local stand-in for the forge API (BUILT_IN_FORGE_API_URL)
+Serves the endpoints the server calls through ENV.forgeApiUrl so procedures
+can be load-tested offline with controlled upstream latency:
+    POST /v1/chat/completions      invokeLLM (perf.llm), SSE when "stream": true
+    POST /v1/audio/transcriptions  transcribeAudio and the OpenAI Whisper path (perf.whisper)
+    GET  /__llm/requests?since=N   per-request prompt/output tokens, timings and faults
+    POST /__llm/faults             change LLM fault injection rates (perf.faults)
+    GET  /auth/v1/user, POST /auth/v1/admin/users, /auth/v1/token, /__auth/bulk
+                                   Supabase auth (perf.supabase)
+    POST /emails, /emails/batch    Resend (perf.mailbox); GET /__mail/messages?to=EMAIL
+    POST /v1/storage/upload, GET /v1/storage/downloadUrl, GET /storage/KEY
+                                   storagePut/storageGet (perf.storage)
+    GET  /site/{store,article,profile}/SLUG, /instagram/oembed/, /tiktok/oembed,
+    POST /webdevtoken.v1.WebDevService/CallApi
+                                   fixture pages, oEmbed and data API for the scrapers (perf.sites)
+    GET  /__stats                  request counts for the harness report
+
+Run it on its own:
+    python -m perf.forge --port 8787 --llm-latency lognormal:800,0.5
+and start the server with BUILT_IN_FORGE_API_URL=http://127.0.0.1:8787
+(BUILT_IN_FORGE_API_KEY can be any non-empty value). Setting
+OPENAI_API_URL to the same address also routes the direct OpenAI calls
+(Whisper, gpt-4o-mini fallback) here, and SUPABASE_URL does the same for
+Supabase auth (SUPABASE_SERVICE_KEY can be any non-empty value) and
+RESEND_BASE_URL for verification emails (RESEND_API_KEY any non-empty value).
+INSTAGRAM_OEMBED_URL=http://127.0.0.1:8787/instagram/oembed and
+TIKTOK_OEMBED_URL=http://127.0.0.1:8787/tiktok/oembed keep the scrapers local.
+
+With --llm-record CASSETTE chat completions are proxied to the real LLM and
+recorded; --llm-replay CASSETTE answers them from the recording (perf.replay).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, Any, List, Optional
+
+DEFAULT_PORT = 8787
+
+
+def build_app(llm_latency: str = "fixed:0", seed: Optional[int] = None,
+              llm_prefill_ms_per_1k: float = 0.0, llm_decode_ms_per_token: float = 0.0,
+              llm_output_tokens: str = None, whisper_latency: str = "fixed:0",
+              whisper_ms_per_audio_second: float = 50.0, auth_latency: str = "fixed:0",
+              email_latency: str = "fixed:0", storage_latency: str = "fixed:0",
+              storage_upload_mbps: float = 0.0, storage_download_mbps: float = 0.0,
+              llm_faults: str = "", llm_fault_scope: str = "primary", llm_hang_seconds: float = 330.0,
+              llm_drip_seconds: float = 30.0, llm_record: str = None, llm_replay: str = None,
+              llm_upstream: str = "https://forge.manus.im",
+              llm_fallback_upstream: str = "https://api.openai.com",
+              llm_replay_scale: float = 1.0, llm_replay_miss: str = "synthetic",
+              site_latency: str = "fixed:0", site_page_bytes: str = "lognormal:60000,0.6",
+              site_mbps: float = 0.0, site_faults: str = "", site_hang_seconds: float = 30.0):
+    from aiohttp import web
+    from perf.delays import LatencyModel
+    from perf.faults import FaultInjector
+    from perf.llm import ChatCompletions
+    from perf.mailbox import Mailbox
+    from perf.replay import Cassette, LLMRecorder, LLMReplayer
+    from perf.sites import FixtureSite
+    from perf.storage import ObjectStore
+    from perf.supabase import SupabaseAuth
+    from perf.whisper import Transcriptions
+
+    faults = FaultInjector(llm_faults, seed, llm_hang_seconds, llm_drip_seconds, llm_fault_scope)
+    chat = ChatCompletions(
+        LatencyModel(llm_latency, seed), seed,
+        prefill_ms_per_1k=llm_prefill_ms_per_1k,
+        decode_ms_per_token=llm_decode_ms_per_token,
+        output_tokens=LatencyModel(llm_output_tokens, seed) if llm_output_tokens else None,
+        faults=faults,
+    )
+    if llm_record and llm_replay:
+        raise ValueError("--llm-record and --llm-replay cannot be used together")
+    replay = None
+    if llm_record:
+        replay = LLMRecorder(Cassette(llm_record), chat, llm_upstream, llm_fallback_upstream)
+    elif llm_replay:
+        replay = LLMReplayer(Cassette(llm_replay).load(), chat, llm_replay_scale, llm_replay_miss)
+
+    transcriptions = Transcriptions(LatencyModel(whisper_latency, seed), whisper_ms_per_audio_second)
+    auth = SupabaseAuth(LatencyModel(auth_latency, seed))
+    mailbox = Mailbox(LatencyModel(email_latency, seed))
+    storage = ObjectStore(LatencyModel(storage_latency, seed), storage_upload_mbps, storage_download_mbps)
+    site = FixtureSite(LatencyModel(site_latency, seed), site_page_bytes, site_mbps, site_faults,
+                       site_hang_seconds, seed)
+
+    async def stats(request):
+        return web.json_response({
+            "chat_completions": chat.stats(),
+            "llm_replay": replay.stats() if replay else None,
+            "transcriptions": transcriptions.stats(),
+            "supabase_auth": auth.stats(),
+            "email": mailbox.stats(),
+            "storage": storage.stats(),
+            "sites": site.stats(),
+        })
+
+    # Prompts carry whole transcripts and knowledge bases
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post("/v1/chat/completions", replay.handle if replay else chat.handle)
+    app.router.add_post("/v1/audio/transcriptions", transcriptions.handle)
+    app.router.add_get("/__llm/requests", chat.requests_since)
+    app.router.add_post("/__llm/faults", faults.update)
+    app.router.add_get("/auth/v1/user", auth.get_user)
+    app.router.add_post("/auth/v1/admin/users", auth.admin_create_user)
+    app.router.add_post("/auth/v1/token", auth.token)
+    app.router.add_post("/__auth/bulk", auth.bulk)
+    app.router.add_post("/emails", mailbox.send)
+    app.router.add_post("/emails/batch", mailbox.send_batch)
+    app.router.add_get("/__mail/messages", mailbox.list_messages)
+    app.router.add_delete("/__mail/messages", mailbox.clear)
+    app.router.add_post("/v1/storage/upload", storage.upload)
+    app.router.add_get("/v1/storage/downloadUrl", storage.download_url)
+    app.router.add_get("/storage/{key:.*}", storage.get_object)
+    app.router.add_get("/site/{kind}/{slug}", site.page)
+    app.router.add_get("/{platform:instagram|tiktok}/oembed", site.oembed)
+    app.router.add_get("/{platform:instagram|tiktok}/oembed/", site.oembed)
+    app.router.add_post("/webdevtoken.v1.WebDevService/CallApi", site.data_api)
+    app.router.add_post("/__site/faults", site.faults.update)
+    app.router.add_get("/__stats", stats)
+    if isinstance(replay, LLMRecorder):
+        app.on_cleanup.append(replay.close)
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--llm-latency", default="fixed:0",
+                        help="chat completion delay, e.g. fixed:200, uniform:100-500, "
+                             "normal:800,200, lognormal:800,0.5, exp:300 (ms)")
+    parser.add_argument("--llm-prefill-ms-per-1k", type=float, default=0.0,
+                        help="time to first token per 1000 prompt tokens, on top of --llm-latency")
+    parser.add_argument("--llm-decode-ms-per-token", type=float, default=0.0,
+                        help="decode time per output token")
+    parser.add_argument("--llm-output-tokens", default=None,
+                        help="output length distribution in tokens (same syntax as --llm-latency, "
+                             "e.g. lognormal:400,0.6); default: whatever the schema needs")
+    parser.add_argument("--llm-faults", default="",
+                        help="inject LLM failures, e.g. html=0.05,5xx=0.05,timeout=0.01,drip=0.05 "
+                             "(fractions of requests, see perf.faults)")
+    parser.add_argument("--llm-fault-scope", choices=["primary", "all"], default="primary",
+                        help="fail only invokeLLM requests (default) or the gpt-4o-mini fallback too")
+    parser.add_argument("--llm-hang-seconds", type=float, default=330.0,
+                        help="how long a timeout fault holds the request open")
+    parser.add_argument("--llm-drip-seconds", type=float, default=30.0,
+                        help="how long a drip fault takes to send its body")
+    parser.add_argument("--llm-record", default=None, metavar="CASSETTE",
+                        help="proxy chat completions to the real LLM and append them to this JSONL file")
+    parser.add_argument("--llm-replay", default=None, metavar="CASSETTE",
+                        help="answer chat completions from a --llm-record cassette")
+    parser.add_argument("--llm-upstream", default="https://forge.manus.im",
+                        help="real forge API for --llm-record")
+    parser.add_argument("--llm-fallback-upstream", default="https://api.openai.com",
+                        help="real OpenAI API for gpt-4o-mini fallback requests in --llm-record")
+    parser.add_argument("--llm-replay-scale", type=float, default=1.0,
+                        help="multiply recorded latencies by this in --llm-replay (0 = instant)")
+    parser.add_argument("--llm-replay-miss", choices=["synthetic", "error"], default="synthetic",
+                        help="answer prompts missing from the cassette with a generated reply or a 404")
+    parser.add_argument("--whisper-latency", default="fixed:0",
+                        help="fixed transcription overhead distribution (same syntax as --llm-latency)")
+    parser.add_argument("--whisper-ms-per-audio-second", type=float, default=50.0,
+                        help="transcription time per second of uploaded audio (50 = 20x real time)")
+    parser.add_argument("--auth-latency", default="fixed:0",
+                        help="Supabase getUser (token verification) delay distribution")
+    parser.add_argument("--email-latency", default="fixed:0",
+                        help="Resend send delay distribution")
+    parser.add_argument("--storage-latency", default="fixed:0",
+                        help="storage request overhead distribution, on top of transfer time")
+    parser.add_argument("--storage-upload-mbps", type=float, default=0.0,
+                        help="per-upload bandwidth in megabits per second (0 = unlimited)")
+    parser.add_argument("--storage-download-mbps", type=float, default=0.0,
+                        help="per-download bandwidth in megabits per second (0 = unlimited)")
+    parser.add_argument("--site-latency", default="fixed:0",
+                        help="fixture page, oEmbed and data API delay distribution")
+    parser.add_argument("--site-page-bytes", default="lognormal:60000,0.6",
+                        help="fixture page size distribution in bytes (same syntax as --llm-latency)")
+    parser.add_argument("--site-mbps", type=float, default=0.0,
+                        help="fixture response bandwidth in megabits per second (0 = unlimited)")
+    parser.add_argument("--site-faults", default="",
+                        help="fixture failures, e.g. 404=0.05,403=0.02,5xx=0.05,timeout=0.01,reset=0.01")
+    parser.add_argument("--site-hang-seconds", type=float, default=30.0,
+                        help="how long a fixture timeout fault holds the request open")
+
+
+def app_options(args) -> Dict[str, Any]:
+    return {
+        "llm_latency": args.llm_latency,
+        "seed": args.seed,
+        "llm_prefill_ms_per_1k": args.llm_prefill_ms_per_1k,
+        "llm_decode_ms_per_token": args.llm_decode_ms_per_token,
+        "llm_output_tokens": args.llm_output_tokens,
+        "llm_faults": args.llm_faults,
+        "llm_fault_scope": args.llm_fault_scope,
+        "llm_hang_seconds": args.llm_hang_seconds,
+        "llm_drip_seconds": args.llm_drip_seconds,
+        "llm_record": args.llm_record,
+        "llm_replay": args.llm_replay,
+        "llm_upstream": args.llm_upstream,
+        "llm_fallback_upstream": args.llm_fallback_upstream,
+        "llm_replay_scale": args.llm_replay_scale,
+        "llm_replay_miss": args.llm_replay_miss,
+        "whisper_latency": args.whisper_latency,
+        "whisper_ms_per_audio_second": args.whisper_ms_per_audio_second,
+        "auth_latency": args.auth_latency,
+        "email_latency": args.email_latency,
+        "storage_latency": args.storage_latency,
+        "storage_upload_mbps": args.storage_upload_mbps,
+        "storage_download_mbps": args.storage_download_mbps,
+        "site_latency": args.site_latency,
+        "site_page_bytes": args.site_page_bytes,
+        "site_mbps": args.site_mbps,
+        "site_faults": args.site_faults,
+        "site_hang_seconds": args.site_hang_seconds,
+    }
+
+
+def cli_args(args) -> List[str]:
+    """The add_arguments() options of a parsed namespace, as perf.forge command-line flags"""
+    argv = ["--llm-latency", args.llm_latency,
+            "--llm-prefill-ms-per-1k", str(args.llm_prefill_ms_per_1k),
+            "--llm-decode-ms-per-token", str(args.llm_decode_ms_per_token)]
+    argv += ["--llm-faults", args.llm_faults, "--llm-fault-scope", args.llm_fault_scope,
+             "--llm-hang-seconds", str(args.llm_hang_seconds),
+             "--llm-drip-seconds", str(args.llm_drip_seconds)]
+    argv += ["--whisper-latency", args.whisper_latency,
+             "--whisper-ms-per-audio-second", str(args.whisper_ms_per_audio_second),
+             "--auth-latency", args.auth_latency, "--email-latency", args.email_latency,
+             "--storage-latency", args.storage_latency,
+             "--storage-upload-mbps", str(args.storage_upload_mbps),
+             "--storage-download-mbps", str(args.storage_download_mbps)]
+    argv += ["--site-latency", args.site_latency, "--site-page-bytes", args.site_page_bytes,
+             "--site-mbps", str(args.site_mbps), "--site-faults", args.site_faults,
+             "--site-hang-seconds", str(args.site_hang_seconds)]
+    if args.llm_output_tokens:
+        argv += ["--llm-output-tokens", args.llm_output_tokens]
+    # The stand-in runs from the repo root, so cassette paths are made absolute
+    if args.llm_record:
+        argv += ["--llm-record", os.path.abspath(args.llm_record)]
+    if args.llm_replay:
+        argv += ["--llm-replay", os.path.abspath(args.llm_replay)]
+    argv += ["--llm-upstream", args.llm_upstream, "--llm-fallback-upstream", args.llm_fallback_upstream,
+             "--llm-replay-scale", str(args.llm_replay_scale), "--llm-replay-miss", args.llm_replay_miss]
+    if args.seed is not None:
+        argv += ["--seed", str(args.seed)]
+    return argv
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forge API stand-in for offline performance tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--seed", type=int, default=None)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from aiohttp import web
+    print(f"🧪 Forge stand-in listening on http://{args.host}:{args.port}", flush=True)
+    web.run_app(build_app(**app_options(args)), host=args.host, port=args.port, print=None)
+
+
+class ForgeStandIn:
+    """Runs `python -m perf.forge` in a subprocess for the length of a test run"""
+
+    def __init__(self, port: int = DEFAULT_PORT, extra_args: List[str] = None):
+        self.port = port
+        self.extra_args = extra_args or []
+        self.process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 10.0):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "perf.forge", "--port", str(self.port)] + self.extra_args,
+            cwd=root,
+        )
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Forge stand-in exited with code {self.process.returncode}")
+            try:
+                self.stats()
+                return self
+            except OSError:
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError(f"Forge stand-in did not start on port {self.port}")
+
+    def stats(self) -> Dict[str, Any]:
+        with urllib.request.urlopen(f"{self.url}/__stats", timeout=2) as response:
+            return json.loads(response.read())
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+HDR-style latency histogram
+Log-linear buckets over integer microseconds: values below 2**SUB_BUCKET_BITS
+get their own bucket, larger values keep SUB_BUCKET_BITS significant bits
+(< 0.8% relative error). Buckets are a sparse dict, so merging histograms from
+several workers is a dict sum and memory stays bounded however many requests
+are recorded.
+"""
+
+import math
+from typing import Dict, Any, List, Optional, Tuple
+
+SUB_BUCKET_BITS = 8
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKET_COUNT = SUB_BUCKET_COUNT >> 1
+
+# Percentiles exported in reports
+REPORT_PERCENTILES = [50, 90, 95, 99, 99.9]
+
+
+def bucket_index(value: int) -> int:
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    mantissa = value >> shift
+    return SUB_BUCKET_COUNT + (shift - 1) * HALF_SUB_BUCKET_COUNT + (mantissa - HALF_SUB_BUCKET_COUNT)
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """Lowest and highest value (inclusive) that map to a bucket"""
+    if index < SUB_BUCKET_COUNT:
+        return index, index
+    offset = index - SUB_BUCKET_COUNT
+    shift = offset // HALF_SUB_BUCKET_COUNT + 1
+    mantissa = offset % HALF_SUB_BUCKET_COUNT + HALF_SUB_BUCKET_COUNT
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+def percentile_key(pct: float) -> str:
+    """50 -> 'p50', 99.9 -> 'p99.9'"""
+    return f"p{pct:g}"
+
+
+class LatencyHistogram:
+    """Mergeable latency histogram; record() takes seconds, reports milliseconds"""
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us: Optional[int] = None
+
+    def record(self, seconds: float):
+        value = max(0, int(round(seconds * 1_000_000)))
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_us = value if self.max_us is None else max(self.max_us, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        if other.max_us is not None:
+            self.max_us = other.max_us if self.max_us is None else max(self.max_us, other.max_us)
+
+    def value_at_percentile(self, pct: float) -> float:
+        """Highest value equivalent to the pct-th percentile, in milliseconds"""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(pct / 100.0 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                _, high = bucket_bounds(index)
+                return min(high, self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    def stats(self) -> Dict[str, float]:
+        """min/mean/percentiles/max in milliseconds"""
+        stats = {
+            "min": (self.min_us or 0) / 1000.0,
+            "mean": self.total_us / self.count / 1000.0 if self.count else 0.0,
+        }
+        for pct in REPORT_PERCENTILES:
+            stats[percentile_key(pct)] = self.value_at_percentile(pct)
+        stats["max"] = (self.max_us or 0) / 1000.0
+        return stats
+
+    def buckets(self) -> List[List[int]]:
+        """Non-empty buckets as [low_us, high_us, count], ascending"""
+        return [list(bucket_bounds(index)) + [self.counts[index]] for index in sorted(self.counts)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Lossless export, also the wire format between workers"""
+        return {
+            "unit": "us",
+            "count": self.count,
+            "total_us": self.total_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "counts": {str(index): count for index, count in self.counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.counts = {int(index): count for index, count in data.get("counts", {}).items()}
+        histogram.count = data.get("count", 0)
+        histogram.total_us = data.get("total_us", 0)
+        histogram.min_us = data.get("min_us")
+        histogram.max_us = data.get("max_us")
+        return histogram
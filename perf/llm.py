@@ -0,0 +1,326 @@
+"""
+Chat-completions stand-in for invokeLLM (server/_core/llm.ts)
+Accepts the same payload invokeLLM posts to {BUILT_IN_FORGE_API_URL}/v1/chat/completions
+and answers with an InvokeResult. With response_format json_schema the
+content is JSON that validates against the schema, so routers that
+JSON.parse() the reply and write its fields to the database keep working.
+"""
+
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import deque
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+from perf.delays import LatencyModel
+from perf.faults import FaultInjector, upstream_of
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+# Realistic values for fields the routers store in enum columns or branch on
+FIELD_HINTS: Dict[str, List[Any]] = {
+    # conversation_stage enum (drizzle/schema.ts)
+    "contextType": ["first_contact", "warm_rapport", "pain_discovery", "objection_resistance",
+                    "trust_reinforcement", "referral_to_expert", "expert_close"],
+    "detectedTone": ["curious", "skeptical", "excited", "hesitant"],
+    "pushyWarning": [None],
+}
+
+FILLER_WORDS = (
+    "rapport trust question story result client niche offer follow up value pain goal "
+    "message reply curious genuine share help listen timing proof outcome"
+).split()
+
+# Items generated for arrays without minItems/maxItems
+DEFAULT_ARRAY_ITEMS = (3, 5)
+# Per-request entries kept for /__llm/requests
+REQUEST_LOG_SIZE = 10000
+
+
+def filler(rng: random.Random, words: int = 12) -> str:
+    text = " ".join(rng.choice(FILLER_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def from_schema(schema: Dict[str, Any], rng: random.Random, name: str = "") -> Any:
+    """A value that satisfies a (strict-mode) JSON schema"""
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if "const" in schema:
+        return schema["const"]
+    if name in FIELD_HINTS:
+        return rng.choice(FIELD_HINTS[name])
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            return from_schema(schema[key][0], rng, name)
+
+    kind = schema.get("type", "object" if "properties" in schema else "string")
+    if isinstance(kind, list):
+        # ["string", "null"]: prefer the non-null type
+        kind = next((k for k in kind if k != "null"), "null")
+
+    if kind == "object":
+        properties = schema.get("properties", {})
+        required = schema.get("required", list(properties))
+        return {key: from_schema(properties[key], rng, key) for key in properties
+                if key in required or rng.random() < 0.5}
+    if kind == "array":
+        low = schema.get("minItems", DEFAULT_ARRAY_ITEMS[0])
+        high = max(low, schema.get("maxItems", DEFAULT_ARRAY_ITEMS[1]))
+        items = schema.get("items", {"type": "string"})
+        return [from_schema(items, rng) for _ in range(rng.randint(low, high))]
+    if kind == "integer":
+        return rng.randint(schema.get("minimum", 0), schema.get("maximum", 100))
+    if kind == "number":
+        return round(rng.uniform(schema.get("minimum", 0), schema.get("maximum", 100)), 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    return filler(rng, rng.randint(6, 20))
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token, close enough for sizing"""
+    return max(1, len(text) // 4)
+
+
+def prompt_text(messages: List[Dict[str, Any]]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+        parts.append(str(content))
+    return "\n".join(parts)
+
+
+def completion_content(payload: Dict[str, Any], rng: random.Random) -> str:
+    """Reply text honouring response_format"""
+    response_format = payload.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        schema = response_format.get("json_schema", {}).get("schema", {})
+        return json.dumps(from_schema(schema, rng))
+    if response_format.get("type") == "json_object":
+        return json.dumps({"result": filler(rng)})
+    return filler(rng, 40)
+
+
+def invoke_result(payload: Dict[str, Any], content: str) -> Dict[str, Any]:
+    prompt_tokens = estimate_tokens(prompt_text(payload.get("messages", [])))
+    completion_tokens = estimate_tokens(content)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "gemini-2.5-flash"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def pad_strings(value: Any, words: int, rng: random.Random) -> Any:
+    """Spread `words` extra filler words over the string fields of a generated value"""
+    leaves: List[tuple] = []
+
+    def collect(node, parent, key):
+        if isinstance(node, dict):
+            for k, v in node.items():
+                collect(v, node, k)
+        elif isinstance(node, list):
+            for i, v in enumerate(node):
+                collect(v, node, i)
+        elif isinstance(node, str) and parent is not None:
+            leaves.append((parent, key))
+
+    if isinstance(value, str):
+        return value + " " + filler(rng, words)
+    collect(value, None, None)
+    if not leaves:
+        return value
+    for index, (parent, key) in enumerate(leaves):
+        share = words // len(leaves) + (1 if index < words % len(leaves) else 0)
+        if share:
+            parent[key] = parent[key] + " " + filler(rng, share)
+    return value
+
+
+def sized_content(payload: Dict[str, Any], rng: random.Random, target_tokens: int) -> str:
+    """completion_content() grown to roughly target_tokens output tokens"""
+    content = completion_content(payload, rng)
+    missing = target_tokens - estimate_tokens(content)
+    if missing <= 0:
+        return content
+    # Filler words average ~6 characters with the space, ~1.5 tokens
+    words = int(missing / 1.5) + 1
+    response_format = (payload.get("response_format") or {}).get("type")
+    if response_format in ("json_schema", "json_object"):
+        return json.dumps(pad_strings(json.loads(content), words, rng))
+    return pad_strings(content, words, rng)
+
+
+def split_tokens(text: str) -> List[str]:
+    """Streaming pieces of ~4 characters, matching estimate_tokens()"""
+    return [text[i:i + 4] for i in range(0, len(text), 4)] or [""]
+
+
+class ChatCompletions:
+    """aiohttp handler for POST /v1/chat/completions
+
+    Reply time is modelled like a real decoder:
+        overhead (latency distribution) + prefill_ms_per_1k * prompt_tokens / 1000
+        -> first token, then decode_ms_per_token for every output token.
+    Output length comes from output_tokens (a perf.delays spec, in tokens)
+    when given, else from the generated content, and is capped at max_tokens
+    (finish_reason "length"). Requests with "stream": true get SSE chunks.
+    With a FaultInjector some requests fail instead (see perf.faults).
+    """
+
+    def __init__(self, latency: LatencyModel, seed: Optional[int] = None,
+                 prefill_ms_per_1k: float = 0.0, decode_ms_per_token: float = 0.0,
+                 output_tokens: Optional[LatencyModel] = None, faults: Optional[FaultInjector] = None):
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.prefill_ms_per_1k = prefill_ms_per_1k
+        self.decode_ms_per_token = decode_ms_per_token
+        self.output_tokens = output_tokens
+        self.faults = faults
+        self.requests = 0
+        self.streamed = 0
+        self.by_schema: Dict[str, int] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.delay_total = 0.0
+        self.ttft_total = 0.0
+        # Per-request timings for prompt-size scaling reports, newest last
+        self.log: deque = deque(maxlen=REQUEST_LOG_SIZE)
+        self.sequence = 0
+
+    async def handle(self, request: "web.Request") -> "web.StreamResponse":
+        from aiohttp import web
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.json_response({"error": {"message": "Invalid JSON body"}}, status=400)
+        if not isinstance(payload.get("messages"), list):
+            return web.json_response({"error": {"message": "messages is required"}}, status=400)
+
+        upstream = upstream_of(payload)
+        schema_name = (payload.get("response_format") or {}).get("json_schema", {}).get("name", "text")
+        fault = self.faults.pick(upstream) if self.faults else None
+        if fault in ("html", "5xx", "timeout"):
+            # Logged up front: a hung request must not land in the next caller's window
+            self.log_request(schema_name, upstream, estimate_tokens(prompt_text(payload["messages"])), 0,
+                             0.0, self.faults.hang_seconds if fault == "timeout" else 0.0, fault)
+            return await self.faults.respond(fault)
+
+        target = int(self.output_tokens.sample_ms()) if self.output_tokens else 0
+        content = sized_content(payload, self.rng, target)
+        finish_reason = "stop"
+        max_tokens = payload.get("max_tokens")
+        if max_tokens and estimate_tokens(content) > max_tokens:
+            content = content[:max_tokens * 4]
+            finish_reason = "length"
+        result = invoke_result(payload, content)
+        result["choices"][0]["finish_reason"] = finish_reason
+        usage = result["usage"]
+
+        ttft = self.latency.sample() + self.prefill_ms_per_1k * usage["prompt_tokens"] / 1000 / 1000
+        decode = self.decode_ms_per_token * usage["completion_tokens"] / 1000
+        if payload.get("stream"):
+            response = await self.stream(request, result, ttft)
+        elif fault == "drip":
+            await asyncio.sleep(ttft + decode)
+            response = await self.faults.drip(request, json.dumps(result).encode())
+        else:
+            await asyncio.sleep(ttft + decode)
+            response = web.json_response(result)
+
+        self.requests += 1
+        self.streamed += 1 if payload.get("stream") else 0
+        self.by_schema[schema_name] = self.by_schema.get(schema_name, 0) + 1
+        self.prompt_tokens += usage["prompt_tokens"]
+        self.completion_tokens += usage["completion_tokens"]
+        self.delay_total += ttft + decode
+        self.ttft_total += ttft
+        self.log_request(schema_name, upstream, usage["prompt_tokens"], usage["completion_tokens"],
+                         ttft, ttft + decode, fault)
+        return response
+
+    def log_request(self, schema: str, upstream: str, prompt_tokens: int, completion_tokens: int,
+                    ttft: float, total: float, fault: Optional[str] = None, **extra):
+        """Add an entry to the /__llm/requests log (times in seconds)"""
+        self.sequence += 1
+        self.log.append(dict({
+            "seq": self.sequence,
+            "schema": schema,
+            "upstream": upstream,
+            "fault": fault,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "ttft_ms": ttft * 1000,
+            "total_ms": total * 1000,
+        }, **extra))
+
+    async def stream(self, request: "web.Request", result: Dict[str, Any], ttft: float) -> "web.StreamResponse":
+        """Send the completion as OpenAI-style chat.completion.chunk SSE events"""
+        from aiohttp import web
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        await asyncio.sleep(ttft)
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> bytes:
+            event = {
+                "id": result["id"],
+                "object": "chat.completion.chunk",
+                "created": result["created"],
+                "model": result["model"],
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(event)}\n\n".encode()
+
+        await response.write(chunk({"role": "assistant", "content": ""}))
+        delay = self.decode_ms_per_token / 1000
+        for piece in split_tokens(result["choices"][0]["message"]["content"]):
+            if delay:
+                await asyncio.sleep(delay)
+            await response.write(chunk({"content": piece}))
+        await response.write(chunk({}, result["choices"][0]["finish_reason"]))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def requests_since(self, request: "web.Request") -> "web.Response":
+        """GET /__llm/requests?since=SEQ - per-request token counts and timings"""
+        from aiohttp import web
+        since = int(request.query.get("since", 0))
+        return web.json_response({
+            "last_seq": self.sequence,
+            "requests": [entry for entry in self.log if entry["seq"] > since],
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "streamed": self.streamed,
+            "by_schema": dict(self.by_schema),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_model": self.latency.spec,
+            "prefill_ms_per_1k": self.prefill_ms_per_1k,
+            "decode_ms_per_token": self.decode_ms_per_token,
+            "mean_ttft_ms": self.ttft_total / self.requests * 1000 if self.requests else 0.0,
+            "mean_delay_ms": self.delay_total / self.requests * 1000 if self.requests else 0.0,
+            "faults": self.faults.stats() if self.faults else None,
+        }
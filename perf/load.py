@@ -0,0 +1,331 @@
+"""
+Asyncio load mode for the Sales Reply Coach tRPC API
+Runs N concurrent virtual users, each with its own session and cookie jar
+"""
+
+import asyncio
+import json
+import time
+import urllib.parse
+from typing import Dict, Any, List, Optional, Tuple
+
+import aiohttp
+
+from perf.results import LoadResults
+from perf.trpc import batch_url, batch_payload, decode_batch
+
+# (procedure, method, input) - same calls the functional tests make.
+# A batched call has a list of (procedure, input) pairs as its input.
+Call = Tuple[str, str, Any]
+
+
+def default_calls(prospect_id: int = 1) -> List[Call]:
+    """Procedure mix used by each virtual user iteration"""
+    return [
+        ("auth.me", "GET", {}),
+        ("brain.getStats", "GET", {}),
+        ("workspace.list", "GET", {}),
+        ("chat.sendInbound", "POST", {
+            "prospectId": prospect_id,
+            "content": "Hey, I saw your post. How did you get started?"
+        }),
+    ]
+
+
+def chunk_calls(prospect_id: int = 1) -> List[Call]:
+    """Procedures whose db.ts helpers read every knowledge chunk the user owns"""
+    return [
+        ("knowledgeBase.brainStats", "GET", {}),                     # getBrainStats
+        ("brain.getChunks", "GET", {}),                              # getKnowledgeChunks
+        ("knowledgeBase.delete", "POST", {"id": 0}),                 # updateBrainStats, nothing deleted
+        ("chat.sendInbound", "POST", {                               # searchKnowledgeChunks
+            "prospectId": prospect_id,
+            "content": "Sounds good but I'm not sure, I tried something like this before"
+        }),
+    ]
+
+
+def analytics_calls(workspace_id: int) -> List[Call]:
+    """Procedures whose db.ts helpers read every prospect in the workspace"""
+    return [
+        ("analytics.getStats", "GET", {"workspaceId": workspace_id}),              # getProspectStats
+        ("analytics.getStageDistribution", "GET", {"workspaceId": workspace_id}),  # getStageDistribution
+    ]
+
+
+def group_batches(calls: List[Call]) -> List[Call]:
+    """Merge consecutive calls with the same method into tRPC batch calls"""
+    grouped: List[Call] = []
+    pending: List[Tuple[str, Any]] = []
+    pending_method = None
+    for procedure, method, input_data in calls + [(None, None, None)]:
+        if pending and method != pending_method:
+            if len(pending) == 1:
+                grouped.append((pending[0][0], pending_method, pending[0][1]))
+            else:
+                label = ",".join(p for p, _ in pending)
+                grouped.append((label, pending_method, list(pending)))
+            pending = []
+        if procedure is not None:
+            pending.append((procedure, input_data))
+            pending_method = method
+    return grouped
+
+
+def phase_trace_config() -> aiohttp.TraceConfig:
+    """aiohttp tracing hooks that fill the per-request phases dict
+
+    Same phases as perf.phases for the requests client, except TLS is part of
+    connect (aiohttp has no separate handshake signal).
+    """
+    trace = aiohttp.TraceConfig()
+
+    def now(ctx, key):
+        ctx.trace_request_ctx["_marks"][key] = time.perf_counter()
+
+    async def on_request_start(session, ctx, params):
+        now(ctx, "start")
+        now(ctx, "acquired")
+
+    async def on_queued_start(session, ctx, params):
+        now(ctx, "queued")
+
+    async def on_queued_end(session, ctx, params):
+        marks = ctx.trace_request_ctx["_marks"]
+        ctx.trace_request_ctx["pool_wait"] += time.perf_counter() - marks.get("queued", marks["start"])
+        now(ctx, "acquired")
+
+    async def on_create_start(session, ctx, params):
+        now(ctx, "connecting")
+
+    async def on_create_end(session, ctx, params):
+        marks = ctx.trace_request_ctx["_marks"]
+        ctx.trace_request_ctx["connect"] += time.perf_counter() - marks.get("connecting", marks["start"])
+        now(ctx, "acquired")
+
+    async def on_reuseconn(session, ctx, params):
+        now(ctx, "acquired")
+
+    async def on_sent(session, ctx, params):
+        now(ctx, "written")
+
+    async def on_request_end(session, ctx, params):
+        marks = ctx.trace_request_ctx["_marks"]
+        written = marks.get("written", marks["acquired"])
+        ctx.trace_request_ctx["write"] += max(0.0, written - marks["acquired"])
+        ctx.trace_request_ctx["ttfb"] += time.perf_counter() - written
+        now(ctx, "headers")
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_connection_queued_start.append(on_queued_start)
+    trace.on_connection_queued_end.append(on_queued_end)
+    trace.on_connection_create_start.append(on_create_start)
+    trace.on_connection_create_end.append(on_create_end)
+    trace.on_connection_reuseconn.append(on_reuseconn)
+    trace.on_request_headers_sent.append(on_sent)
+    trace.on_request_chunk_sent.append(on_sent)
+    trace.on_request_end.append(on_request_end)
+    return trace
+
+
+def new_phases() -> Dict[str, Any]:
+    return {"pool_wait": 0.0, "connect": 0.0, "write": 0.0, "ttfb": 0.0, "download": 0.0, "_marks": {}}
+
+
+def finish_phases(phases: Dict[str, Any]) -> Dict[str, float]:
+    """Close the download phase and drop the internal timestamps"""
+    marks = phases.pop("_marks")
+    if "headers" in marks and "body" in marks:
+        phases["download"] += marks["body"] - marks["headers"]
+    return phases
+
+
+class VirtualUser:
+    """One simulated client with its own aiohttp session and cookie jar"""
+
+    def __init__(self, user_id: int, base_url: str, results: LoadResults, timeout: float = 120.0,
+                 cookies: Dict[str, str] = None):
+        self.user_id = user_id
+        self.base_url = base_url
+        self.results = results
+        self.timeout = timeout
+        # Session cookies to start with, e.g. from perf.supabase.preauthenticate()
+        self.cookies = cookies
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            # unsafe=True so cookies set by localhost/IP hosts are kept
+            cookie_jar=aiohttp.CookieJar(unsafe=True),
+            headers={
+                'Content-Type': 'application/json',
+                'User-Agent': f'SalesReplyCoach-LoadTester/1.0 (vu={self.user_id})'
+            },
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[phase_trace_config()],
+        )
+        if self.cookies:
+            from yarl import URL
+            self.session.cookie_jar.update_cookies(self.cookies, URL(self.base_url))
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def call(self, procedure: str, input_data: Dict = None, method: str = "POST",
+                   intended_start: float = None) -> Dict[str, Any]:
+        """Async twin of SalesReplyCoachTester.make_trpc_request that records latency
+
+        intended_start is the perf_counter() time the open-loop scheduler meant
+        to send this request; latency is measured from it when given.
+        """
+        if isinstance(input_data, list):
+            return await self.call_batch(input_data, method, intended_start)
+        url = f"{self.base_url}/api/trpc/{procedure}"
+        status = 0
+        body: Dict[str, Any]
+        phases = new_phases()
+        start = time.perf_counter()
+        try:
+            if method == "GET":
+                if input_data:
+                    query_param = urllib.parse.quote(json.dumps({"json": input_data}))
+                    url += f"?input={query_param}"
+                request = self.session.get(url, trace_request_ctx=phases)
+            else:
+                payload = {"json": input_data} if input_data is not None else {}
+                request = self.session.post(url, json=payload, trace_request_ctx=phases)
+            async with request as response:
+                status = response.status
+                text = await response.text()
+                phases["_marks"]["body"] = time.perf_counter()
+            try:
+                body = json.loads(text)
+            except ValueError:
+                body = {"error": f"Invalid JSON response: {text[:200]}", "status_code": status}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            body = {"error": f"Request failed: {type(e).__name__}: {e}", "status_code": status}
+        end = time.perf_counter()
+
+        phases = finish_phases(phases) if status else None
+
+        success = 0 < status < 400 and "error" not in body
+        if intended_start is None:
+            self.results.record(procedure, end - start, success, status, phases=phases)
+        else:
+            self.results.record(procedure, end - intended_start, success, status,
+                                service_time=end - start, phases=phases)
+        return body
+
+
+    async def call_batch(self, calls: List[Tuple[str, Any]], method: str = "GET",
+                         intended_start: float = None) -> List[Dict[str, Any]]:
+        """Send several procedures as one httpBatchLink request
+
+        Latency is recorded once under "batch[a,b,c]"; the returned list holds
+        one result dict per procedure.
+        """
+        label = "batch[" + ",".join(procedure for procedure, _ in calls) + "]"
+        status = 0
+        phases = new_phases()
+        start = time.perf_counter()
+        try:
+            url = batch_url(self.base_url, calls, method)
+            if method == "GET":
+                request = self.session.get(url, trace_request_ctx=phases)
+            else:
+                request = self.session.post(url, json=batch_payload(calls), trace_request_ctx=phases)
+            async with request as response:
+                status = response.status
+                text = await response.text()
+                phases["_marks"]["body"] = time.perf_counter()
+            try:
+                body = json.loads(text)
+            except ValueError:
+                body = {"error": f"Invalid JSON response: {text[:200]}", "status_code": status}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            body = {"error": f"Request failed: {type(e).__name__}: {e}", "status_code": status}
+        end = time.perf_counter()
+
+        phases = finish_phases(phases) if status else None
+
+        results = decode_batch(body, len(calls), status)
+        success = 0 < status < 400 and not any("error" in r for r in results)
+        if intended_start is None:
+            self.results.record(label, end - start, success, status, phases=phases)
+        else:
+            self.results.record(label, end - intended_start, success, status,
+                                service_time=end - start, phases=phases)
+        return results
+
+
+async def run_virtual_user(vu: VirtualUser, calls: List[Call], deadline: float, think_time: float = 0.0):
+    """Loop through the call sequence until the deadline passes"""
+    while time.perf_counter() < deadline:
+        for procedure, method, input_data in calls:
+            if time.perf_counter() >= deadline:
+                return
+            await vu.call(procedure, input_data, method)
+            if think_time > 0:
+                await asyncio.sleep(think_time)
+
+
+def session_for(sessions: Optional[List[Dict[str, str]]], user_id: int) -> Optional[Dict[str, str]]:
+    """Cookies for a virtual user, cycling through the pre-authenticated sessions"""
+    return sessions[user_id % len(sessions)] if sessions else None
+
+
+async def run_load(base_url: str, users: int, duration: float, calls: List[Call] = None,
+                   think_time: float = 0.0, results: LoadResults = None,
+                   scenarios: List[Dict[str, Any]] = None, seed: int = None,
+                   sessions: List[Dict[str, str]] = None) -> LoadResults:
+    """Run `users` concurrent virtual users for `duration` seconds
+
+    With `scenarios` each user samples weighted journeys (see perf.scenarios)
+    instead of looping over `calls`. With `sessions` each user starts with
+    one of those cookie sets, so protected procedures run as a real user.
+    """
+    from perf.scenarios import ScenarioMix, run_scenario_user
+
+    calls = calls or default_calls()
+    results = results if results is not None else LoadResults()
+    results.started_at = time.perf_counter()
+    deadline = results.started_at + duration
+
+    async def worker(user_id: int):
+        async with VirtualUser(user_id, base_url, results, cookies=session_for(sessions, user_id)) as vu:
+            if scenarios:
+                mix = ScenarioMix(scenarios, None if seed is None else seed + user_id)
+                await run_scenario_user(vu, mix, deadline, results)
+            else:
+                await run_virtual_user(vu, calls, deadline, think_time)
+
+    await asyncio.gather(*(worker(i) for i in range(users)))
+    results.finished_at = time.perf_counter()
+    return results
+
+
+def print_load_summary(summary: Dict[str, Any]):
+    """Pretty-print a LoadResults.summary() dict"""
+    print("\n" + "=" * 60)
+    print("📊 LOAD TEST SUMMARY")
+    print("=" * 60)
+    print(f"Duration: {summary['duration_s']:.1f}s")
+    print(f"Requests: {summary['total_requests']} ({summary['throughput_rps']:.1f} req/s)")
+    print(f"Errors: {summary['total_errors']}")
+    if summary.get("total_dropped"):
+        print(f"Dropped (client overload): {summary['total_dropped']}")
+    width = max([22] + [len(p) + 2 for p in summary["procedures"]])
+    print(f"\n{'procedure':<{width}}{'reqs':>8}{'err%':>7}{'rps':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'p99.9':>9}{'max':>9}")
+    for procedure, stats in summary["procedures"].items():
+        lat = stats["latency_ms"]
+        print(f"{procedure:<{width}}{stats['requests']:>8}{stats['error_rate'] * 100:>6.1f}%"
+              f"{stats['throughput_rps']:>9.1f}{lat['p50']:>9.1f}{lat['p90']:>9.1f}"
+              f"{lat['p99']:>9.1f}{lat['p99.9']:>9.1f}{lat['max']:>9.1f}")
+    if summary.get("journeys"):
+        print(f"\n{'journey':<{width}}{'runs':>8}{'fail%':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+        for name, stats in summary["journeys"].items():
+            lat = stats["duration_ms"]
+            fail_pct = stats["failed"] / stats["runs"] * 100 if stats["runs"] else 0.0
+            print(f"{name:<{width}}{stats['runs']:>8}{fail_pct:>6.1f}%{lat['p50']:>9.1f}"
+                  f"{lat['p90']:>9.1f}{lat['p99']:>9.1f}{lat['max']:>9.1f}")
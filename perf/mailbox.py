@@ -0,0 +1,179 @@
+"""
+Resend-compatible email capture (RESEND_BASE_URL)
+server/_core/email.ts sends verification codes through the resend SDK, which
+posts to {RESEND_BASE_URL}/emails. This stand-in accepts those sends, keeps
+them in memory indexed by recipient and exposes them to the harness:
+    POST /emails                      resend.emails.send()
+    POST /emails/batch                resend.batch.send()
+    GET  /__mail/messages?to=EMAIL&wait=SECONDS
+                                      messages for a recipient, newest last; waits
+                                      up to SECONDS for the first one to arrive
+    DELETE /__mail/messages           empty the mailbox
+
+Every captured message carries the 6-digit verification code found in its
+body, so signups can be verified without tailing server logs.
+"""
+
+import asyncio
+import re
+import time
+import uuid
+from collections import deque
+from typing import TYPE_CHECKING, Dict, Any, Optional
+
+from perf.delays import LatencyModel
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+# Oldest messages are dropped past this many
+MAX_MESSAGES = 100000
+# Per-recipient history kept in the index
+MESSAGES_PER_RECIPIENT = 20
+# The only 6-digit run in the verification template is the code itself
+CODE_PATTERN = re.compile(r"(?<![\d#])(\d{6})(?!\d)")
+
+
+def find_code(*texts: Optional[str]) -> Optional[str]:
+    for text in texts:
+        match = CODE_PATTERN.search(text or "")
+        if match:
+            return match.group(1)
+    return None
+
+
+class Mailbox:
+    """In-memory Resend API with a per-recipient index"""
+
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+        self.messages: deque = deque(maxlen=MAX_MESSAGES)
+        self.by_recipient: Dict[str, deque] = {}
+        self.waiters: Dict[str, asyncio.Event] = {}
+        self.sent = 0
+
+    def store(self, email: Dict[str, Any]) -> Dict[str, Any]:
+        recipients = email.get("to") or []
+        if isinstance(recipients, str):
+            recipients = [recipients]
+        message = {
+            "id": str(uuid.uuid4()),
+            "from": email.get("from"),
+            "to": recipients,
+            "subject": email.get("subject"),
+            "html": email.get("html"),
+            "text": email.get("text"),
+            "code": find_code(email.get("text"), email.get("html")),
+            "created_at": time.time(),
+        }
+        self.messages.append(message)
+        self.sent += 1
+        for recipient in recipients:
+            key = recipient.lower()
+            self.by_recipient.setdefault(key, deque(maxlen=MESSAGES_PER_RECIPIENT)).append(message)
+            waiter = self.waiters.pop(key, None)
+            if waiter is not None:
+                waiter.set()
+        # Keep the index from outgrowing the message log
+        if len(self.by_recipient) > MAX_MESSAGES:
+            self.by_recipient.pop(next(iter(self.by_recipient)))
+        return message
+
+    @staticmethod
+    def error(status: int, name: str, message: str) -> "web.Response":
+        from aiohttp import web
+        return web.json_response({"statusCode": status, "name": name, "message": message}, status=status)
+
+    async def send(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return self.error(401, "missing_api_key", "Missing API key in the authorization header.")
+        email = await request.json()
+        if not email.get("to") or not email.get("from"):
+            return self.error(422, "validation_error", "The `to` and `from` fields are required.")
+        await asyncio.sleep(self.latency.sample())
+        return web.json_response({"id": self.store(email)["id"]})
+
+    async def send_batch(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        emails = await request.json()
+        await asyncio.sleep(self.latency.sample())
+        return web.json_response({"data": [{"id": self.store(email)["id"]} for email in emails]})
+
+    async def list_messages(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        recipient = request.query.get("to", "").lower()
+        if not recipient:
+            return web.json_response({"messages": list(self.messages)[-100:]})
+        wait = float(request.query.get("wait", 0))
+        if wait > 0 and recipient not in self.by_recipient:
+            waiter = self.waiters.setdefault(recipient, asyncio.Event())
+            try:
+                await asyncio.wait_for(waiter.wait(), wait)
+            except asyncio.TimeoutError:
+                if self.waiters.get(recipient) is waiter:
+                    del self.waiters[recipient]
+        return web.json_response({"messages": list(self.by_recipient.get(recipient, []))})
+
+    async def clear(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        self.messages.clear()
+        self.by_recipient.clear()
+        return web.json_response({"cleared": True})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "stored": len(self.messages),
+            "recipients": len(self.by_recipient),
+            "latency_model": self.latency.spec,
+        }
+
+
+async def fetch_code(session, mail_url: str, email: str, wait: float = 10.0) -> Optional[str]:
+    """Latest verification code sent to `email`, waiting up to `wait` seconds for it"""
+    async with session.get(f"{mail_url}/__mail/messages", params={"to": email, "wait": str(wait)}) as response:
+        messages = (await response.json())["messages"]
+    return messages[-1]["code"] if messages else None
+
+
+async def run_signups(base_url: str, mail_url: str, count: int, concurrency: int = 50,
+                      results=None, password: str = "LoadPass123!") -> Dict[str, int]:
+    """Sign `count` new users up in parallel: sendVerificationCode, read the mailbox, verifyCode
+
+    Each procedure is timed into `results` (a LoadResults) and every complete
+    signup is recorded as a "signup" journey. Returns outcome counts.
+    """
+    import aiohttp
+    from perf.load import VirtualUser
+    from perf.results import LoadResults
+
+    results = results if results is not None else LoadResults()
+    semaphore = asyncio.Semaphore(concurrency)
+    outcomes = {"verified": 0, "send_failed": 0, "no_email": 0, "verify_failed": 0}
+    run_id = int(time.time())
+
+    async def signup(index: int, mail: aiohttp.ClientSession):
+        email = f"signup_{run_id}_{index}@example.com"
+        async with semaphore:
+            async with VirtualUser(index, base_url, results) as vu:
+                started = time.perf_counter()
+                body = await vu.call("auth.sendVerificationCode",
+                                     {"email": email, "password": password, "name": f"Signup {index}"})
+                if "error" in body:
+                    outcome = "send_failed"
+                else:
+                    code = await fetch_code(mail, mail_url, email)
+                    if code is None:
+                        outcome = "no_email"
+                    else:
+                        body = await vu.call("auth.verifyCode", {"email": email, "code": code})
+                        outcome = "verify_failed" if "error" in body else "verified"
+                outcomes[outcome] += 1
+                results.record_journey("signup", time.perf_counter() - started, outcome == "verified")
+
+    results.started_at = time.perf_counter()
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as mail:
+        await asyncio.gather(*(signup(i, mail) for i in range(count)))
+    results.finished_at = time.perf_counter()
+    return outcomes
@@ -0,0 +1,199 @@
+"""
+Offline yt-dlp / ffmpeg shims for the transcript pipeline
+perf/shims/yt-dlp and perf/shims/ffmpeg call into this module. Put
+perf/shims first on PATH (see shim_env()) and getYouTubeTranscript,
+getInstagramTranscript and getTikTokTranscript run against canned captions
+and synthetic MP3s instead of the network.
+
+Behaviour is set through environment variables:
+    SHIM_CAPTIONS          vtt (default), srt or none (forces the Whisper path)
+    SHIM_AUDIO_SECONDS     duration of downloaded audio (default 600)
+    SHIM_AUDIO_KBPS        MP3 bitrate (default 128; 1 hour at 128kbps = 57.6MB,
+                           over the 24MB split threshold)
+    SHIM_AUDIO_EXT         mp3 (default) or m4a/webm to exercise the ffmpeg conversion
+    SHIM_TITLE             printed by --get-title
+    SHIM_DELAY             extra delay on every yt-dlp call, a perf.delays spec (default fixed:0)
+    SHIM_DOWNLOAD_MBPS     simulated download bandwidth in megabits/s (default: instant)
+    SHIM_FFMPEG_SPEED      ffmpeg processing speed as a multiple of real time (default: instant)
+    SHIM_FAIL              comma list of steps that exit non-zero: title,subs,audio,ffmpeg
+    SHIM_LOG               append one JSON line per invocation (argv, step, seconds)
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+SHIM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shims")
+
+SAMPLE_RATE = 44100
+SAMPLES_PER_FRAME = 1152
+# MPEG-1 Layer III bitrate index for each supported kbps
+BITRATE_INDEX = {32: 1, 40: 2, 48: 3, 56: 4, 64: 5, 80: 6, 96: 7, 112: 8, 128: 9,
+                 160: 10, 192: 11, 224: 12, 256: 13, 320: 14}
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def shim_env(base: Dict[str, str] = None, **options) -> Dict[str, str]:
+    """Copy of the environment with the shims first on PATH
+
+    Keyword options map to SHIM_* variables: audio_seconds=3600 sets
+    SHIM_AUDIO_SECONDS=3600. None values are left out.
+    """
+    env = dict(os.environ if base is None else base)
+    env["PATH"] = SHIM_DIR + os.pathsep + env.get("PATH", "")
+    for key, value in options.items():
+        if value is not None:
+            env[f"SHIM_{key.upper()}"] = str(value)
+    return env
+
+
+def frame_header(kbps: int) -> bytes:
+    """MPEG-1 Layer III, no CRC, 44.1kHz, no padding, joint stereo"""
+    if kbps not in BITRATE_INDEX:
+        raise ValueError(f"Unsupported MP3 bitrate {kbps}kbps, use one of {sorted(BITRATE_INDEX)}")
+    return bytes([0xFF, 0xFB, BITRATE_INDEX[kbps] << 4, 0x64])
+
+
+def frame_length(kbps: int) -> int:
+    return 144 * kbps * 1000 // SAMPLE_RATE
+
+
+def write_mp3(path: str, seconds: float, kbps: int = 128):
+    """Silent constant-bitrate MP3 of the given duration (size = seconds * kbps / 8)"""
+    frame = frame_header(kbps) + bytes(frame_length(kbps) - 4)
+    frames = int(seconds * SAMPLE_RATE / SAMPLES_PER_FRAME)
+    block = frame * 1000
+    with open(path, "wb") as f:
+        for _ in range(frames // 1000):
+            f.write(block)
+        f.write(frame * (frames % 1000))
+
+
+def mp3_frame_length(data: bytes) -> Optional[int]:
+    """Frame size of a constant-bitrate MPEG-1 Layer III stream at 44.1kHz"""
+    from perf.whisper import mp3_bitrate_kbps
+    kbps = mp3_bitrate_kbps(data[:64 * 1024])
+    return frame_length(kbps) if kbps else None
+
+
+def log_step(step: str, argv: List[str], started: float, status: int = 0):
+    path = os.environ.get("SHIM_LOG")
+    if path:
+        with open(path, "a") as f:
+            f.write(json.dumps({"tool": os.path.basename(sys.argv[0]), "step": step, "argv": argv,
+                                "seconds": time.time() - started, "status": status}) + "\n")
+
+
+def failing(step: str) -> bool:
+    return step in os.environ.get("SHIM_FAIL", "").split(",")
+
+
+def option(argv: List[str], name: str) -> Optional[str]:
+    if name in argv and argv.index(name) + 1 < len(argv):
+        return argv[argv.index(name) + 1]
+    return None
+
+
+def captions_text(url: str, seconds: float, kind: str) -> str:
+    """Deterministic captions for a URL, in the same wording as the Whisper stand-in"""
+    from perf.whisper import captions, whisper_response
+    return captions(whisper_response(url.encode(), seconds), kind)
+
+
+def yt_dlp_main(argv: List[str]) -> int:
+    started = time.time()
+    if "--version" in argv:
+        print("2024.12.06 (perf shim)")
+        return 0
+    url = argv[-1] if argv else ""
+    seconds = env_float("SHIM_AUDIO_SECONDS", 600)
+    from perf.delays import LatencyModel
+    time.sleep(LatencyModel(os.environ.get("SHIM_DELAY") or "fixed:0").sample())
+
+    if "--get-title" in argv:
+        step = "title"
+        if failing(step):
+            print("ERROR: [shim] title lookup failed", file=sys.stderr)
+            log_step(step, argv, started, 1)
+            return 1
+        print(os.environ.get("SHIM_TITLE", f"Shim video {url.rstrip('/').rsplit('/', 1)[-1]}"))
+        log_step(step, argv, started)
+        return 0
+
+    output = option(argv, "-o")
+    if "--skip-download" in argv:
+        step = "subs"
+        kind = os.environ.get("SHIM_CAPTIONS", "vtt")
+        if failing(step) or kind == "none":
+            # Real yt-dlp exits 0 with a warning when a video has no subtitles
+            print("WARNING: [shim] There are no subtitles for the requested languages", file=sys.stderr)
+            log_step(step, argv, started, 1 if failing(step) else 0)
+            return 1 if failing(step) else 0
+        with open(f"{output}.en.{kind}", "w") as f:
+            f.write(captions_text(url, seconds, kind))
+        log_step(step, argv, started)
+        return 0
+
+    if "--extract-audio" in argv or "-x" in argv:
+        step = "audio"
+        if failing(step) or not output:
+            print("ERROR: [shim] audio download failed", file=sys.stderr)
+            log_step(step, argv, started, 1)
+            return 1
+        kbps = int(env_float("SHIM_AUDIO_KBPS", 128))
+        ext = os.environ.get("SHIM_AUDIO_EXT", "mp3")
+        path = os.path.splitext(output)[0] + f".{ext}"
+        mbps = env_float("SHIM_DOWNLOAD_MBPS", 0)
+        if mbps > 0:
+            time.sleep(seconds * kbps / 1000 / mbps)
+        write_mp3(path, seconds, kbps)
+        print(f"[ExtractAudio] Destination: {path}")
+        log_step(step, argv, started)
+        return 0
+
+    print(f"ERROR: [shim] unsupported yt-dlp invocation: {' '.join(argv)}", file=sys.stderr)
+    return 2
+
+
+def ffmpeg_main(argv: List[str]) -> int:
+    started = time.time()
+    if "-version" in argv or "--version" in argv:
+        print("ffmpeg version 6.1-perf-shim Copyright (c) 2000-2023 the FFmpeg developers")
+        return 0
+    source = option(argv, "-i")
+    output = argv[-1] if argv else None
+    if failing("ffmpeg") or not source or not os.path.exists(source) or output == source:
+        print(f"{source}: No such file or directory", file=sys.stderr)
+        log_step("ffmpeg", argv, started, 1)
+        return 1
+
+    from perf.whisper import audio_duration
+    with open(source, "rb") as f:
+        data = f.read()
+    seconds = audio_duration(data)
+    speed = env_float("SHIM_FFMPEG_SPEED", 0)
+    if speed > 0:
+        time.sleep(seconds / speed)
+
+    if option(argv, "-f") == "segment":
+        # -f segment -segment_time N -c copy out_%03d.mp3: split on frame boundaries
+        segment_time = float(option(argv, "-segment_time") or 600)
+        frame = mp3_frame_length(data) or 1
+        bytes_per_second = len(data) / seconds if seconds else len(data)
+        chunk = max(frame, int(segment_time * bytes_per_second) // frame * frame)
+        for index, offset in enumerate(range(0, len(data), chunk)):
+            with open(output % index, "wb") as f:
+                f.write(data[offset:offset + chunk])
+        log_step("segment", argv, started)
+        return 0
+
+    # Transcode (e.g. -vn -acodec libmp3lame): same duration, requested container
+    write_mp3(output, seconds, int(env_float("SHIM_AUDIO_KBPS", 128)))
+    log_step("transcode", argv, started)
+    return 0
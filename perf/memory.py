@@ -0,0 +1,79 @@
+"""
+Server memory sampling
+Reads VmRSS of the server process from /proc while a test runs, so request
+payloads held in memory (large uploads waiting on slow storage, prompts
+waiting on the LLM) show up next to the latency numbers. Linux only.
+"""
+
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+# Samples kept in the report; longer runs are thinned evenly
+MAX_REPORTED_SAMPLES = 200
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler:
+    """Background thread recording a process's resident memory every `interval` seconds"""
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[List[float]] = []
+        self.started_at = 0.0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.is_set():
+            value = rss_mb(self.pid)
+            if value is not None:
+                self.samples.append([time.perf_counter() - self.started_at, value])
+            self.stopped.wait(self.interval)
+
+    def start(self):
+        if rss_mb(self.pid) is None:
+            raise ValueError(f"Cannot read memory of process {self.pid} from /proc")
+        self.started_at = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def summary(self) -> Dict[str, Any]:
+        values = [value for _, value in self.samples]
+        step = max(1, len(self.samples) // MAX_REPORTED_SAMPLES)
+        return {
+            "pid": self.pid,
+            "start_mb": values[0] if values else None,
+            "peak_mb": max(values) if values else None,
+            "end_mb": values[-1] if values else None,
+            "mean_mb": sum(values) / len(values) if values else None,
+            "samples": [[round(t, 2), round(v, 1)] for t, v in self.samples[::step]],
+        }
+
+
+def print_memory(summary: Dict[str, Any]):
+    if summary.get("peak_mb") is None:
+        return
+    print(f"Server RSS (pid {summary['pid']}): start {summary['start_mb']:.0f}MB, "
+          f"peak {summary['peak_mb']:.0f}MB, end {summary['end_mb']:.0f}MB")
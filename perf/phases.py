@@ -0,0 +1,126 @@
+"""
+Per-request phase timings for the requests-based client
+Splits each call into pool wait, connect, TLS, request write, time-to-first-byte
+and body download by hooking urllib3's pool and connection classes. TTFB versus
+download separates server think time from payload size.
+
+Usage:
+    session.mount("http://", TimedHTTPAdapter())
+    phases = begin()          # before the request, same thread
+    response = session.get(url, stream=True)
+    with measure("download"):
+        response.content
+    end()                     # phases now holds seconds per phase
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+PHASES = ["pool_wait", "connect", "tls", "write", "ttfb", "download"]
+
+_state = threading.local()
+
+
+def begin() -> Dict[str, float]:
+    """Start collecting phases for the next request made on this thread"""
+    phases = {name: 0.0 for name in PHASES}
+    _state.phases = phases
+    return phases
+
+
+def end() -> Optional[Dict[str, float]]:
+    """Stop collecting and return the phases of the finished request"""
+    phases = getattr(_state, "phases", None)
+    _state.phases = None
+    return phases
+
+
+def add(phase: str, seconds: float):
+    phases = getattr(_state, "phases", None)
+    if phases is not None:
+        phases[phase] += seconds
+
+
+@contextmanager
+def measure(phase: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(phase, time.perf_counter() - start)
+
+
+def _connection_time() -> float:
+    phases = getattr(_state, "phases", None)
+    return phases["connect"] + phases["tls"] if phases is not None else 0.0
+
+
+class _TimedConnectionMixin:
+    """Records connect/TLS/write/TTFB into the current thread's phases"""
+
+    def _new_conn(self):
+        # Plain TCP connect (DNS included)
+        with measure("connect"):
+            return super()._new_conn()
+
+    def connect(self):
+        # connect() = _new_conn() (already timed) + TLS handshake for https
+        start = time.perf_counter()
+        before = _connection_time()
+        super().connect()
+        tcp = _connection_time() - before
+        add("tls", max(0.0, time.perf_counter() - start - tcp))
+
+    def request(self, *args, **kwargs):
+        # http.client connects lazily inside request(); don't count that as write
+        start = time.perf_counter()
+        before = _connection_time()
+        super().request(*args, **kwargs)
+        self._write_done = time.perf_counter()
+        add("write", max(0.0, self._write_done - start - (_connection_time() - before)))
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        add("ttfb", time.perf_counter() - getattr(self, "_write_done", time.perf_counter()))
+        return response
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+    def _get_conn(self, timeout=None):
+        with measure("pool_wait"):
+            return super()._get_conn(timeout)
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+    def _get_conn(self, timeout=None):
+        with measure("pool_wait"):
+            return super()._get_conn(timeout)
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """requests adapter whose connection pools record phase timings"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
@@ -0,0 +1,206 @@
+"""
+Time-varying load profiles: ramp, soak and spike
+A profile is a list of stages, each holding or linearly ramping the number of
+concurrent virtual users. Results are sliced per stage and per time window,
+and every spike stage reports how long latency took to recover afterwards.
+
+Stage specs (comma separated, run back to back):
+    ramp:0-50:120     linear ramp from 0 to 50 users over 120s
+    soak:50:7200      hold 50 users for two hours
+    spike:500:30      jump straight to 500 users for 30s
+Presets scale from --users/--duration: "ramp", "soak", "spike".
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from perf.load import Call, VirtualUser, default_calls, session_for
+from perf.results import LoadResults
+
+# (name, kind, seconds, users at start, users at end)
+Stage = Tuple[str, str, float, int, int]
+
+STAGE_KINDS = ("ramp", "soak", "spike")
+
+# How often the controller adjusts the number of running users
+TICK = 0.5
+# Spike recovery: first window whose p95 is back within this fraction of the
+# pre-spike level (and error rate within RECOVERY_ERROR_POINTS)
+RECOVERY_TOLERANCE = 0.2
+RECOVERY_ERROR_POINTS = 0.01
+
+
+def preset(name: str, users: int, duration: float) -> str:
+    """Stage spec for a named preset"""
+    if name == "ramp":
+        return f"ramp:0-{users}:{duration:g}"
+    if name == "soak":
+        warmup = min(60.0, duration / 10)
+        return f"ramp:0-{users}:{warmup:g},soak:{users}:{duration - warmup:g}"
+    if name == "spike":
+        return (f"soak:{users}:{duration / 3:g},spike:{users * 10}:{duration / 6:g},"
+                f"soak:{users}:{duration / 2:g}")
+    raise ValueError(f"Unknown load profile: {name}")
+
+
+def parse_profile(spec: str, users: int = 10, duration: float = 30.0) -> List[Stage]:
+    """Parse a preset name or 'KIND:USERS[-USERS]:SECONDS,...' into stages"""
+    if spec in STAGE_KINDS:
+        spec = preset(spec, users, duration)
+    stages: List[Stage] = []
+    for index, part in enumerate(p.strip() for p in spec.split(",") if p.strip()):
+        fields = part.split(":")
+        if len(fields) != 3 or fields[0] not in STAGE_KINDS:
+            raise ValueError(f"Invalid stage '{part}', expected ramp|soak|spike:USERS[-USERS]:SECONDS")
+        kind, count, seconds = fields
+        low, _, high = count.partition("-")
+        start_users = int(low)
+        end_users = int(high) if high else start_users
+        stages.append((f"{index + 1}-{kind}", kind, float(seconds), start_users, end_users))
+    if not stages:
+        raise ValueError("Empty load profile")
+    return stages
+
+
+def stage_bounds(stages: List[Stage]) -> List[Tuple[str, float, float]]:
+    """(name, start_s, end_s) offsets from the start of the run"""
+    bounds = []
+    offset = 0.0
+    for name, _, seconds, _, _ in stages:
+        bounds.append((name, offset, offset + seconds))
+        offset += seconds
+    return bounds
+
+
+def total_duration(stages: List[Stage]) -> float:
+    return sum(seconds for _, _, seconds, _, _ in stages)
+
+
+def users_at(stages: List[Stage], offset: float) -> int:
+    """Target concurrency `offset` seconds into the run"""
+    for _, kind, seconds, start_users, end_users in stages:
+        if offset < seconds:
+            if kind == "ramp" and seconds > 0:
+                return round(start_users + (end_users - start_users) * offset / seconds)
+            return start_users
+        offset -= seconds
+    return 0
+
+
+def share(total: int, worker_id: int, processes: int) -> int:
+    """This worker's part of `total` users, as in perf.workers.split_evenly"""
+    return total // processes + (1 if worker_id < total % processes else 0)
+
+
+async def run_profile(base_url: str, stages: List[Stage], calls: List[Call] = None,
+                      think_time: float = 0.0, results: LoadResults = None,
+                      scenarios: List[Dict[str, Any]] = None, seed: int = None,
+                      worker_id: int = 0, processes: int = 1, window: float = 5.0,
+                      sessions: List[Dict[str, str]] = None) -> LoadResults:
+    """Closed-loop users whose number follows the profile
+
+    Every TICK the controller starts users up to the target or asks the most
+    recently started ones to stop after their current call (or journey).
+    """
+    from perf.scenarios import ScenarioMix, run_journey
+
+    calls = calls or default_calls()
+    results = results if results is not None else LoadResults()
+    results.slice_by(stage_bounds(stages), window)
+    results.started_at = time.perf_counter()
+    deadline = results.started_at + total_duration(stages)
+    running: List[Tuple[asyncio.Task, asyncio.Event]] = []
+    next_id = 0
+
+    async def user(user_id: int, stop: asyncio.Event):
+        async with VirtualUser(user_id, base_url, results, cookies=session_for(sessions, user_id)) as vu:
+            mix = ScenarioMix(scenarios, None if seed is None else seed + user_id) if scenarios else None
+            iteration = 0
+            while not stop.is_set() and time.perf_counter() < deadline:
+                if mix:
+                    await run_journey(vu, mix.pick(), iteration, results, deadline)
+                    iteration += 1
+                    continue
+                for procedure, method, input_data in calls:
+                    if stop.is_set() or time.perf_counter() >= deadline:
+                        return
+                    await vu.call(procedure, input_data, method)
+                    if think_time > 0:
+                        await asyncio.sleep(think_time)
+
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        target = share(users_at(stages, now - results.started_at), worker_id, processes)
+        running = [(task, stop) for task, stop in running if not task.done()]
+        active = [(task, stop) for task, stop in running if not stop.is_set()]
+        while len(active) < target:
+            stop = asyncio.Event()
+            # Interleave ids across workers so they stay unique
+            task = asyncio.ensure_future(user(next_id * processes + worker_id, stop))
+            next_id += 1
+            running.append((task, stop))
+            active.append((task, stop))
+        for task, stop in active[target:]:
+            stop.set()
+        await asyncio.sleep(min(TICK, deadline - now))
+
+    if running:
+        await asyncio.gather(*(task for task, _ in running))
+    results.finished_at = time.perf_counter()
+    return results
+
+
+def recovery_report(summary: Dict[str, Any], stages: List[Stage]) -> List[Dict[str, Any]]:
+    """Seconds from the end of each spike until windows are back to pre-spike latency
+
+    The pre-spike level is the median window p95 (and error rate) of the stage
+    before the spike. recovery_s is None if latency never came back.
+    """
+    timeline = summary.get("timeline", [])
+    bounds = stage_bounds(stages)
+    reports = []
+    for index, (name, kind, _, _, _) in enumerate(stages):
+        if kind != "spike" or index == 0:
+            continue
+        _, before_start, before_end = bounds[index - 1]
+        _, spike_start, spike_end = bounds[index]
+        before = [w for w in timeline if before_start <= w["start_s"] < before_end and w["requests"]]
+        during = [w for w in timeline if spike_start <= w["start_s"] < spike_end and w["requests"]]
+        if not before:
+            continue
+        baseline_p95 = sorted(w["p95"] for w in before)[len(before) // 2]
+        baseline_errors = sorted(w["errors"] / w["requests"] for w in before)[len(before) // 2]
+        recovery_s: Optional[float] = None
+        for w in timeline:
+            if w["start_s"] < spike_end or not w["requests"]:
+                continue
+            if (w["p95"] <= baseline_p95 * (1 + RECOVERY_TOLERANCE)
+                    and w["errors"] / w["requests"] <= baseline_errors + RECOVERY_ERROR_POINTS):
+                recovery_s = w["start_s"] - spike_end
+                break
+        reports.append({
+            "stage": name,
+            "baseline_p95_ms": baseline_p95,
+            "peak_p95_ms": max((w["p95"] for w in during), default=0.0),
+            "recovery_s": recovery_s,
+        })
+    return reports
+
+
+def print_profile_summary(summary: Dict[str, Any]):
+    """Per-stage table plus spike recovery times"""
+    print(f"\n{'stage':<14}{'start':>8}{'reqs':>8}{'err%':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, stage in summary.get("stages", {}).items():
+        requests = stage["total_requests"]
+        err_pct = stage["total_errors"] / requests * 100 if requests else 0.0
+        lat = stage["latency_ms"]
+        print(f"{name:<14}{stage['start_s']:>7.0f}s{requests:>8}{err_pct:>6.1f}%"
+              f"{stage['throughput_rps']:>9.1f}{lat['p50']:>9.1f}{lat['p95']:>9.1f}{lat['p99']:>9.1f}")
+    for report in summary.get("recovery", []):
+        recovered = (f"recovered {report['recovery_s']:.0f}s after the spike"
+                     if report["recovery_s"] is not None else "did not recover before the run ended")
+        print(f"⚡ {report['stage']}: p95 {report['baseline_p95_ms']:.1f}ms → "
+              f"{report['peak_p95_ms']:.1f}ms, {recovered}")
@@ -0,0 +1,284 @@
+"""
+Record/replay of real LLM traffic
+In record mode the stand-in sits between the server and the real LLM: every
+chat completion is forwarded upstream, passed back unchanged and appended to
+a cassette (JSONL) with its timings, keyed by a hash of the normalized
+prompt. Replay mode answers the same prompts with the recorded replies after
+the recorded latency (optionally scaled), so prospect.analyzeProfile,
+knowledgeBase.processItem and friends can be compared across server builds
+on identical LLM behaviour and without outside traffic:
+
+    python -m perf.forge --llm-record llm.jsonl --llm-upstream https://forge.example.com
+    python -m perf.forge --llm-replay llm.jsonl --llm-replay-scale 0.5
+
+Prompts are normalized before hashing: whitespace is collapsed and values
+that change between runs (UUIDs, hex run ids, timestamps, database ids) are
+masked. A prompt recorded several times replays its replies in order,
+wrapping around; prompts missing from the cassette get a synthetic reply
+from perf.llm, or a 404 with --llm-replay-miss error.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+from perf.faults import upstream_of
+from perf.llm import ChatCompletions, estimate_tokens, prompt_text
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+# Run-specific values masked before hashing, most specific first
+VOLATILE_PATTERNS = [
+    re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?"),
+    re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"),
+    re.compile(r"\b(?=[0-9a-f]*\d)[0-9a-f]{12,}\b"),
+    re.compile(r"\d{5,}"),
+]
+WHITESPACE = re.compile(r"\s+")
+# Payload fields that decide the reply; sampling knobs and model names do not
+KEY_FIELDS = ("messages", "response_format", "tools", "tool_choice", "stream")
+
+
+def normalize(text: str) -> str:
+    for pattern in VOLATILE_PATTERNS:
+        text = pattern.sub("#", text)
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def prompt_key(payload: Dict[str, Any]) -> str:
+    """Stable hash of the parts of a chat completion request that shape the reply"""
+    material = {field: payload.get(field) for field in KEY_FIELDS}
+    material["upstream"] = upstream_of(payload)
+    canonical = normalize(json.dumps(material, sort_keys=True, ensure_ascii=False))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def schema_of(payload: Dict[str, Any]) -> str:
+    return (payload.get("response_format") or {}).get("json_schema", {}).get("name", "text")
+
+
+def completion_tokens_of(body: str, streamed: bool) -> int:
+    """Output tokens from the reply's usage block, else estimated from its content"""
+    if not streamed:
+        try:
+            reply = json.loads(body)
+            return reply["usage"]["completion_tokens"]
+        except (ValueError, KeyError, TypeError):
+            return estimate_tokens(body)
+    content = []
+    for event in body.split("\n\n"):
+        data = event.strip()[len("data:"):].strip() if event.strip().startswith("data:") else ""
+        if data and data != "[DONE]":
+            try:
+                content.append(json.loads(data)["choices"][0]["delta"].get("content") or "")
+            except (ValueError, KeyError, IndexError, TypeError):
+                pass
+    return estimate_tokens("".join(content))
+
+
+class Cassette:
+    """Recorded exchanges in a JSONL file, grouped by prompt key"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self.cursor: Dict[str, int] = {}
+        self.size = 0
+
+    def load(self):
+        with open(self.path) as f:
+            for line in f:
+                if line.strip():
+                    self.add(json.loads(line))
+        return self
+
+    def add(self, entry: Dict[str, Any]):
+        self.entries.setdefault(entry["key"], []).append(entry)
+        self.size += 1
+
+    def append(self, entry: Dict[str, Any]):
+        """Add an entry and write it out straight away, so an interrupted recording keeps it"""
+        self.add(entry)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def next(self, key: str) -> Optional[Dict[str, Any]]:
+        entries = self.entries.get(key)
+        if not entries:
+            return None
+        index = self.cursor.get(key, 0)
+        self.cursor[key] = index + 1
+        return entries[index % len(entries)]
+
+
+class LLMRecorder:
+    """aiohttp handler that proxies chat completions upstream and records them
+
+    Primary requests go to `upstream`, the gpt-4o-mini fallback to
+    `fallback_upstream`; the server's Authorization header is passed through.
+    Streams are forwarded as they arrive, so recording adds no buffering.
+    """
+
+    def __init__(self, cassette: Cassette, chat: ChatCompletions, upstream: str,
+                 fallback_upstream: str = "https://api.openai.com"):
+        self.cassette = cassette
+        self.chat = chat
+        self.upstream = upstream.rstrip("/")
+        self.fallback_upstream = fallback_upstream.rstrip("/")
+        self.session = None
+        self.recorded = 0
+        self.upstream_errors = 0
+
+    async def close(self, app=None):
+        if self.session is not None:
+            await self.session.close()
+
+    async def handle(self, request: "web.Request") -> "web.StreamResponse":
+        import aiohttp
+        from aiohttp import web
+        body = await request.read()
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return web.json_response({"error": {"message": "Invalid JSON body"}}, status=400)
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_read=600))
+
+        upstream = upstream_of(payload)
+        base = self.fallback_upstream if upstream == "fallback" else self.upstream
+        headers = {name: request.headers[name] for name in ("Authorization", "Content-Type")
+                   if name in request.headers}
+        started = time.perf_counter()
+        ttft = None
+        chunks = []
+        response = None
+        try:
+            async with self.session.post(f"{base}/v1/chat/completions", data=body, headers=headers) as reply:
+                status = reply.status
+                content_type = reply.headers.get("Content-Type", "application/json")
+                response = web.StreamResponse(status=status, headers={"Content-Type": content_type})
+                await response.prepare(request)
+                async for chunk in reply.content.iter_any():
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    chunks.append(chunk)
+                    await response.write(chunk)
+                await response.write_eof()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Cut-off replies are not recorded; replaying them would hide the failure
+            self.upstream_errors += 1
+            if response is not None:
+                return response
+            return web.json_response({"error": {"message": f"Upstream request failed: {e}"}}, status=502)
+        total = time.perf_counter() - started
+        ttft = total if ttft is None else ttft
+
+        text = b"".join(chunks).decode("utf-8", "replace")
+        streamed = bool(payload.get("stream"))
+        entry = {
+            "key": prompt_key(payload),
+            "schema": schema_of(payload),
+            "upstream": upstream,
+            "stream": streamed,
+            "status": status,
+            "content_type": content_type,
+            "body": text,
+            "prompt_tokens": estimate_tokens(prompt_text(payload.get("messages", []))),
+            "completion_tokens": completion_tokens_of(text, streamed),
+            "ttft_ms": ttft * 1000,
+            "total_ms": total * 1000,
+            "recorded_at": time.time(),
+        }
+        self.cassette.append(entry)
+        self.recorded += 1
+        self.chat.log_request(entry["schema"], upstream, entry["prompt_tokens"], entry["completion_tokens"],
+                              ttft, total, recorded=True)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "record",
+            "cassette": self.cassette.path,
+            "upstream": self.upstream,
+            "fallback_upstream": self.fallback_upstream,
+            "recorded": self.recorded,
+            "prompts": len(self.cassette.entries),
+            "upstream_errors": self.upstream_errors,
+        }
+
+
+class LLMReplayer:
+    """aiohttp handler answering chat completions from a cassette
+
+    Replies keep their recorded status, body and timing: non-streamed ones
+    arrive after total_ms, streamed ones send the first event at ttft_ms and
+    spread the rest up to total_ms. `scale` multiplies both (0 = instant).
+    """
+
+    def __init__(self, cassette: Cassette, chat: ChatCompletions, scale: float = 1.0, on_miss: str = "synthetic"):
+        self.cassette = cassette
+        self.chat = chat
+        self.scale = scale
+        self.on_miss = on_miss
+        self.hits = 0
+        self.misses = 0
+
+    async def handle(self, request: "web.Request") -> "web.StreamResponse":
+        from aiohttp import web
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.json_response({"error": {"message": "Invalid JSON body"}}, status=400)
+        key = prompt_key(payload)
+        entry = self.cassette.next(key)
+        if entry is None:
+            self.misses += 1
+            if self.on_miss == "synthetic":
+                return await self.chat.handle(request)
+            return web.json_response({"error": {"message": f"No recorded reply for prompt {key}"}}, status=404)
+
+        self.hits += 1
+        ttft = entry["ttft_ms"] / 1000 * self.scale
+        total = max(ttft, entry["total_ms"] / 1000 * self.scale)
+        if entry["stream"] and entry["status"] < 400:
+            response = await self.stream(request, entry, ttft, total)
+        else:
+            await asyncio.sleep(total)
+            response = web.Response(status=entry["status"], body=entry["body"].encode(),
+                                    headers={"Content-Type": entry["content_type"]})
+        self.chat.log_request(entry["schema"], entry["upstream"], entry["prompt_tokens"],
+                              entry["completion_tokens"], ttft, total, replayed=True)
+        return response
+
+    async def stream(self, request: "web.Request", entry: Dict[str, Any], ttft: float,
+                     total: float) -> "web.StreamResponse":
+        from aiohttp import web
+        response = web.StreamResponse(headers={"Content-Type": entry["content_type"], "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        events = [event + "\n\n" for event in entry["body"].split("\n\n") if event.strip()]
+        started = time.perf_counter()
+        gap = (total - ttft) / max(1, len(events) - 1)
+        for index, event in enumerate(events):
+            # Sleep to each event's deadline so per-sleep overshoot does not add up
+            wait = ttft + index * gap - (time.perf_counter() - started)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await response.write(event.encode())
+        await response.write_eof()
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "replay",
+            "cassette": self.cassette.path,
+            "recorded": self.cassette.size,
+            "prompts": len(self.cassette.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "on_miss": self.on_miss,
+            "latency_scale": self.scale,
+        }
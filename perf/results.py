@@ -0,0 +1,292 @@
+"""
+Load test results
+Per-procedure latency histograms and counters, kept separate from perf.load so
+the functional test runner can use them without aiohttp installed.
+"""
+
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from perf.histogram import LatencyHistogram
+
+# Subset of histogram stats reported for each request phase
+PHASE_STATS = ("mean", "p50", "p90", "p99", "max")
+# Seconds between progress records written to a sink during a run
+PROGRESS_INTERVAL = 10.0
+
+
+class LoadResults:
+    """Per-procedure latency histograms, request/error counts and status codes"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        # Open-loop runs only: time from actual send, excluding scheduler lag
+        self.service_histograms: Dict[str, LatencyHistogram] = {}
+        # procedure -> phase (connect, ttfb, download, ...) -> histogram
+        self.phase_histograms: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self.errors: Dict[str, int] = {}
+        self.dropped: Dict[str, int] = {}
+        self.status_codes: Dict[str, Dict[str, int]] = {}
+        # Scenario runs: journey name -> end-to-end duration histogram / failures
+        self.journey_histograms: Dict[str, LatencyHistogram] = {}
+        self.journey_failures: Dict[str, int] = {}
+        # Load profiles: samples are also sliced by stage and by fixed time window
+        self.stage_bounds: List[Tuple[str, float, float]] = []
+        self.stages: Dict[str, "LoadResults"] = {}
+        self.window = 0.0
+        self.windows: Dict[int, LatencyHistogram] = {}
+        self.window_errors: Dict[int, int] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Progress records go to this perf.sink.JsonlSink while the run is going
+        self.progress_sink = None
+        self.progress_interval = PROGRESS_INTERVAL
+        self.last_progress = 0.0
+        self.reported_windows = -1
+        self.reported_stages: List[str] = []
+
+    def report_progress(self, sink, interval: float = PROGRESS_INTERVAL):
+        """Write running totals, finished windows and finished stages to `sink` every
+        `interval` seconds, so a run killed halfway still leaves its numbers behind"""
+        self.progress_sink = sink
+        self.progress_interval = interval
+
+    def maybe_report_progress(self, final: bool = False):
+        if self.progress_sink is None or self.started_at is None:
+            return
+        now = time.perf_counter()
+        if not final and now - self.last_progress < self.progress_interval:
+            return
+        self.last_progress = now
+        offset = now - self.started_at
+        summary = self.summary()
+        record = {
+            "type": "load_final" if final else "load_progress",
+            "elapsed_s": offset,
+            "total_requests": summary["total_requests"],
+            "total_errors": summary["total_errors"],
+            "throughput_rps": summary["throughput_rps"],
+            "procedures": {procedure: {key: value for key, value in stats.items()
+                                       if key != "histogram_buckets_us"}
+                           for procedure, stats in summary["procedures"].items()},
+        }
+        if self.windows:
+            # Windows that can no longer change, unless this is the last record
+            done = max(self.windows) if final else int(offset // self.window) - 1
+            record["windows"] = summary["timeline"][self.reported_windows + 1:done + 1]
+            self.reported_windows = max(self.reported_windows, done)
+        finished = [name for name, _, end in self.stage_bounds
+                    if (final or end <= offset) and name not in self.reported_stages]
+        if finished:
+            record["stages"] = {name: summary["stages"][name] for name in finished}
+            self.reported_stages.extend(finished)
+        self.progress_sink.write(record)
+
+    def slice_by(self, stage_bounds: List[Tuple[str, float, float]], window: float = 0.0):
+        """Also keep per-stage results ((name, start_s, end_s) offsets) and a window timeline"""
+        self.stage_bounds = list(stage_bounds)
+        self.window = window
+
+    def _stage(self) -> Optional["LoadResults"]:
+        if not self.stage_bounds or self.started_at is None:
+            return None
+        offset = time.perf_counter() - self.started_at
+        for name, start, end in self.stage_bounds:
+            if start <= offset < end:
+                return self.stages.setdefault(name, LoadResults())
+        return None
+
+    def record(self, procedure: str, latency: float, success: bool, status: int,
+               service_time: float = None, phases: Dict[str, float] = None):
+        stage = self._stage()
+        if stage is not None:
+            stage.record(procedure, latency, success, status, service_time, phases)
+        if self.window and self.started_at is not None:
+            index = int((time.perf_counter() - self.started_at) // self.window)
+            self.windows.setdefault(index, LatencyHistogram()).record(latency)
+            self.window_errors[index] = self.window_errors.get(index, 0) + (0 if success else 1)
+        histogram = self.histograms.get(procedure)
+        if histogram is None:
+            histogram = self.histograms[procedure] = LatencyHistogram()
+        histogram.record(latency)
+        if service_time is not None:
+            self.service_histograms.setdefault(procedure, LatencyHistogram()).record(service_time)
+        if phases:
+            by_phase = self.phase_histograms.setdefault(procedure, {})
+            for phase, seconds in phases.items():
+                by_phase.setdefault(phase, LatencyHistogram()).record(seconds)
+        self.errors.setdefault(procedure, 0)
+        if not success:
+            self.errors[procedure] += 1
+        codes = self.status_codes.setdefault(procedure, {})
+        codes[str(status)] = codes.get(str(status), 0) + 1
+        self.maybe_report_progress()
+
+    def record_journey(self, name: str, duration: float, success: bool):
+        """One complete (or abandoned) scenario journey"""
+        stage = self._stage()
+        if stage is not None:
+            stage.record_journey(name, duration, success)
+        self.journey_histograms.setdefault(name, LatencyHistogram()).record(duration)
+        self.journey_failures[name] = self.journey_failures.get(name, 0) + (0 if success else 1)
+
+    def record_dropped(self, procedure: str):
+        """A scheduled send that was never issued (client-side overload)"""
+        stage = self._stage()
+        if stage is not None:
+            stage.record_dropped(procedure)
+        self.dropped[procedure] = self.dropped.get(procedure, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Counters and histograms in a picklable/JSON form, see merge_dict()"""
+        return {
+            "histograms": {p: h.to_dict() for p, h in self.histograms.items()},
+            "service_histograms": {p: h.to_dict() for p, h in self.service_histograms.items()},
+            "phase_histograms": {p: {phase: h.to_dict() for phase, h in by_phase.items()}
+                                 for p, by_phase in self.phase_histograms.items()},
+            "errors": dict(self.errors),
+            "dropped": dict(self.dropped),
+            "status_codes": {p: dict(c) for p, c in self.status_codes.items()},
+            "journey_histograms": {j: h.to_dict() for j, h in self.journey_histograms.items()},
+            "journey_failures": dict(self.journey_failures),
+            "stages": {name: stage.to_dict() for name, stage in self.stages.items()},
+            "windows": {str(index): h.to_dict() for index, h in self.windows.items()},
+            "window_errors": {str(index): count for index, count in self.window_errors.items()},
+        }
+
+    def merge_dict(self, data: Dict[str, Any]):
+        """Add another LoadResults.to_dict() (e.g. a worker's delta) into this one"""
+        for attr in ("histograms", "service_histograms", "journey_histograms"):
+            target = getattr(self, attr)
+            for procedure, exported in data.get(attr, {}).items():
+                target.setdefault(procedure, LatencyHistogram()).merge(LatencyHistogram.from_dict(exported))
+        for procedure, by_phase in data.get("phase_histograms", {}).items():
+            target = self.phase_histograms.setdefault(procedure, {})
+            for phase, exported in by_phase.items():
+                target.setdefault(phase, LatencyHistogram()).merge(LatencyHistogram.from_dict(exported))
+        for procedure, count in data.get("errors", {}).items():
+            self.errors[procedure] = self.errors.get(procedure, 0) + count
+        for procedure, count in data.get("dropped", {}).items():
+            self.dropped[procedure] = self.dropped.get(procedure, 0) + count
+        for name, count in data.get("journey_failures", {}).items():
+            self.journey_failures[name] = self.journey_failures.get(name, 0) + count
+        for name, exported in data.get("stages", {}).items():
+            self.stages.setdefault(name, LoadResults()).merge_dict(exported)
+        for index, exported in data.get("windows", {}).items():
+            self.windows.setdefault(int(index), LatencyHistogram()).merge(LatencyHistogram.from_dict(exported))
+        for index, count in data.get("window_errors", {}).items():
+            self.window_errors[int(index)] = self.window_errors.get(int(index), 0) + count
+        for procedure, codes in data.get("status_codes", {}).items():
+            target = self.status_codes.setdefault(procedure, {})
+            for code, count in codes.items():
+                target[code] = target.get(code, 0) + count
+        self.maybe_report_progress()
+
+    def clear_samples(self):
+        """Drop everything recorded so far but keep the timing window"""
+        self.histograms = {}
+        self.service_histograms = {}
+        self.phase_histograms = {}
+        self.errors = {}
+        self.dropped = {}
+        self.status_codes = {}
+        self.journey_histograms = {}
+        self.journey_failures = {}
+        self.stages = {}
+        self.windows = {}
+        self.window_errors = {}
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    def summary(self) -> Dict[str, Any]:
+        """Throughput, latency percentiles (ms) and histogram buckets per procedure"""
+        elapsed = self.elapsed or 1e-9
+        procedures = {}
+        total = 0
+        total_errors = 0
+        for procedure, histogram in sorted(self.histograms.items()):
+            count = histogram.count
+            errors = self.errors.get(procedure, 0)
+            total += count
+            total_errors += errors
+            stats = {
+                "requests": count,
+                "errors": errors,
+                "error_rate": errors / count if count else 0.0,
+                "throughput_rps": count / elapsed,
+                "latency_ms": histogram.stats(),
+                "status_codes": self.status_codes.get(procedure, {}),
+            }
+            if procedure in self.service_histograms:
+                stats["service_time_ms"] = self.service_histograms[procedure].stats()
+            if procedure in self.phase_histograms:
+                stats["phases_ms"] = {
+                    phase: {key: value for key, value in h.stats().items() if key in PHASE_STATS}
+                    for phase, h in self.phase_histograms[procedure].items()
+                }
+            if self.dropped.get(procedure):
+                stats["dropped"] = self.dropped[procedure]
+            stats["histogram_buckets_us"] = histogram.buckets()
+            procedures[procedure] = stats
+        summary = {
+            "duration_s": elapsed,
+            "total_requests": total,
+            "total_errors": total_errors,
+            "throughput_rps": total / elapsed,
+            "procedures": procedures,
+        }
+        if self.journey_histograms:
+            summary["journeys"] = {
+                name: {
+                    "runs": h.count,
+                    "failed": self.journey_failures.get(name, 0),
+                    "duration_ms": h.stats(),
+                }
+                for name, h in sorted(self.journey_histograms.items())
+            }
+        if self.dropped:
+            summary["total_dropped"] = sum(self.dropped.values())
+        if self.stage_bounds:
+            summary["stages"] = self.stage_summaries()
+        if self.windows:
+            summary["timeline"] = self.timeline()
+        return summary
+
+    def stage_summaries(self) -> Dict[str, Any]:
+        """summary() of each profile stage, throughput over the stage's own length"""
+        stages = {}
+        for name, start, end in self.stage_bounds:
+            stage = self.stages.get(name) or LoadResults()
+            stage.started_at = 0.0
+            stage.finished_at = max(0.0, min(end, self.elapsed) - start)
+            summary = stage.summary()
+            summary["start_s"] = start
+            combined = LatencyHistogram()
+            for histogram in stage.histograms.values():
+                combined.merge(histogram)
+            summary["latency_ms"] = combined.stats()
+            for stats in summary["procedures"].values():
+                stats.pop("histogram_buckets_us", None)
+            stages[name] = summary
+        return stages
+
+    def timeline(self) -> List[Dict[str, Any]]:
+        """All procedures combined, one entry per window"""
+        timeline = []
+        for index in range(max(self.windows) + 1):
+            histogram = self.windows.get(index) or LatencyHistogram()
+            stats = histogram.stats()
+            timeline.append({
+                "start_s": index * self.window,
+                "requests": histogram.count,
+                "errors": self.window_errors.get(index, 0),
+                "p50": stats["p50"],
+                "p95": stats["p95"],
+                "p99": stats["p99"],
+            })
+        return timeline
@@ -0,0 +1,78 @@
+"""
+Retry amplification under LLM faults
+Each procedure call is paired with the LLM requests it caused (from the forge
+stand-in's /__llm/requests log), once with faults off and once with them on.
+Comparing the two shows what callLLMWithRetry costs when the upstream
+misbehaves: extra LLM requests per call, how often the gpt-4o-mini fallback
+is reached, and how far the retry waits push out the latency tail.
+"""
+
+from typing import Dict, Any, List
+
+# Percentiles compared between the clean and faulted runs
+PERCENTILES = [50, 95, 99]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def call_record(latency_ms: float, success: bool, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One procedure call and the LLM requests logged while it ran"""
+    return {
+        "latency_ms": latency_ms,
+        "success": success,
+        "primary": sum(1 for r in requests if r.get("upstream", "primary") == "primary"),
+        "fallback": sum(1 for r in requests if r.get("upstream") == "fallback"),
+        "faults": [r["fault"] for r in requests if r.get("fault")],
+    }
+
+
+def summarize_calls(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    n = len(calls)
+    latencies = [c["latency_ms"] for c in calls]
+    faults: Dict[str, int] = {}
+    for call in calls:
+        for kind in call["faults"]:
+            faults[kind] = faults.get(kind, 0) + 1
+    summary = {
+        "calls": n,
+        "failure_rate": sum(1 for c in calls if not c["success"]) / n if n else 0.0,
+        "llm_requests_per_call": sum(c["primary"] + c["fallback"] for c in calls) / n if n else 0.0,
+        "fallback_rate": sum(1 for c in calls if c["fallback"]) / n if n else 0.0,
+        "faults": faults,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = percentile(latencies, pct)
+    return summary
+
+
+def amplification(clean: List[Dict[str, Any]], faulted: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Clean vs faulted summaries of one procedure plus the ratios between them"""
+    before = summarize_calls(clean)
+    after = summarize_calls(faulted)
+    return {
+        "clean": before,
+        "faulted": after,
+        "retry_amplification": (after["llm_requests_per_call"] / before["llm_requests_per_call"]
+                                if before["llm_requests_per_call"] else 0.0),
+        "p99_inflation": after["p99_ms"] / before["p99_ms"] if before["p99_ms"] else 0.0,
+    }
+
+
+def print_amplification(report: Dict[str, Any]):
+    print("\n" + "=" * 60)
+    print(f"🔁 RETRY AMPLIFICATION ({report['spec']})")
+    print("=" * 60)
+    print(f"{'procedure':<22}{'llm/call':>10}{'ampl':>7}{'fallback':>10}{'failed':>8}{'p99':>10}{'p99 x':>7}")
+    for procedure, row in report["procedures"].items():
+        faulted = row["faulted"]
+        print(f"{procedure:<22}{faulted['llm_requests_per_call']:>10.2f}{row['retry_amplification']:>6.2f}x"
+              f"{faulted['fallback_rate'] * 100:>9.1f}%{faulted['failure_rate'] * 100:>7.1f}%"
+              f"{faulted['p99_ms']:>10.0f}{row['p99_inflation']:>6.1f}x")
+        print(f"{'  clean':<22}{row['clean']['llm_requests_per_call']:>10.2f}{'':>7}"
+              f"{row['clean']['fallback_rate'] * 100:>9.1f}%{row['clean']['failure_rate'] * 100:>7.1f}%"
+              f"{row['clean']['p99_ms']:>10.0f}")
@@ -0,0 +1,167 @@
+"""
+Latency versus prompt size
+Pairs each chat.sendInbound call with the prompt tokens of the LLM request
+it triggered (from the forge stand-in's /__llm/requests log) and fits
+latency = intercept + slope * tokens, so growth of getConversationContext
+shows up as milliseconds per 1k prompt tokens.
+
+The same fit over table sizes (sweep_summary) charts latency against how many
+rows perf.seed put behind each procedure, and history_summary against how
+many messages a prospect's conversation has.
+"""
+
+import json
+import urllib.request
+from typing import Dict, Any, List, Tuple
+
+from perf.retries import percentile
+
+# (prompt_tokens, latency_ms)
+Point = Tuple[int, float]
+
+
+def llm_requests_since(forge_url: str, since: int) -> Dict[str, Any]:
+    with urllib.request.urlopen(f"{forge_url}/__llm/requests?since={since}", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def linear_fit(points: List[Point]) -> Dict[str, float]:
+    """Least-squares fit of latency_ms on prompt tokens"""
+    n = len(points)
+    if n < 2:
+        return {"ms_per_1k_tokens": 0.0, "intercept_ms": points[0][1] if points else 0.0, "r": 0.0}
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    syy = sum((y - mean_y) ** 2 for _, y in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    slope = sxy / sxx if sxx else 0.0
+    return {
+        "ms_per_1k_tokens": slope * 1000,
+        "intercept_ms": mean_y - slope * mean_x,
+        "r": sxy / (sxx * syy) ** 0.5 if sxx and syy else 0.0,
+    }
+
+
+def bucket_points(points: List[Point], buckets: int = 5) -> List[Dict[str, Any]]:
+    """Equal-width prompt-token ranges with the median latency in each"""
+    if not points:
+        return []
+    low = min(x for x, _ in points)
+    high = max(x for x, _ in points)
+    width = max(1, (high - low + buckets) // buckets)
+    rows = []
+    for index in range(buckets):
+        start = low + index * width
+        latencies = sorted(y for x, y in points if start <= x < start + width)
+        if latencies:
+            rows.append({
+                "prompt_tokens_from": start,
+                "prompt_tokens_to": start + width - 1,
+                "calls": len(latencies),
+                "p50_ms": latencies[len(latencies) // 2],
+                "max_ms": latencies[-1],
+            })
+    return rows
+
+
+def print_scaling(report: Dict[str, Any]):
+    print("\n" + "=" * 60)
+    print("📈 LATENCY VS PROMPT SIZE")
+    print("=" * 60)
+    print(f"{'prompt tokens':<20}{'calls':>8}{'p50':>10}{'max':>10}")
+    for row in report["buckets"]:
+        span = f"{row['prompt_tokens_from']}-{row['prompt_tokens_to']}"
+        print(f"{span:<20}{row['calls']:>8}{row['p50_ms']:>10.1f}{row['max_ms']:>10.1f}")
+    fit = report["fit"]
+    print(f"\n+{fit['ms_per_1k_tokens']:.1f}ms per 1k prompt tokens "
+          f"(intercept {fit['intercept_ms']:.1f}ms, r={fit['r']:.2f})")
+
+
+def sweep_summary(samples: Dict[int, Dict[str, List[float]]], failures: Dict[int, Dict[str, int]] = None
+                  ) -> Dict[str, Any]:
+    """Per-size latency percentiles and a p50-vs-rows fit per procedure
+
+    samples maps a row count to {procedure: [latency_ms, ...]} measured at that size.
+    """
+    failures = failures or {}
+    rows = []
+    by_procedure: Dict[str, List[Point]] = {}
+    for size in sorted(samples):
+        for procedure, latencies in samples[size].items():
+            p50 = percentile(latencies, 50)
+            rows.append({"rows": size, "procedure": procedure, "calls": len(latencies),
+                         "failures": failures.get(size, {}).get(procedure, 0),
+                         "p50_ms": p50, "p95_ms": percentile(latencies, 95)})
+            if latencies:
+                by_procedure.setdefault(procedure, []).append((size, p50))
+    fits = {}
+    for procedure, points in by_procedure.items():
+        fit = linear_fit(points)
+        fits[procedure] = {
+            "ms_per_100k_rows": fit["ms_per_1k_tokens"] * 100,
+            "intercept_ms": fit["intercept_ms"],
+            "r": fit["r"],
+            "growth": points[-1][1] / points[0][1] if points[0][1] else 0.0,
+        }
+    return {"rows": rows, "fits": fits}
+
+
+def print_sweep(report: Dict[str, Any], title: str):
+    print("\n" + "=" * 60)
+    print(f"📈 {title}")
+    print("=" * 60)
+    print(f"{'rows':>10}  {'procedure':<28}{'calls':>6}{'p50':>10}{'p95':>10}")
+    for row in report["rows"]:
+        failed = f"  ({row['failures']} failed)" if row["failures"] else ""
+        print(f"{row['rows']:>10}  {row['procedure']:<28}{row['calls']:>6}"
+              f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{failed}")
+    print()
+    for procedure, fit in report["fits"].items():
+        print(f"{procedure}: +{fit['ms_per_100k_rows']:.1f}ms per 100k rows, "
+              f"{fit['growth']:.1f}x p50 smallest to largest (r={fit['r']:.2f})")
+
+
+def history_summary(steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Latency, prompt size and server memory per conversation length
+
+    Each step is {"messages", "latencies", "prompt_tokens", "failures", "peak_rss_mb"}
+    for the calls made while the prospect had that many messages.
+    """
+    rows = []
+    for step in sorted(steps, key=lambda s: s["messages"]):
+        rows.append({
+            "messages": step["messages"],
+            "calls": len(step["latencies"]),
+            "failures": step.get("failures", 0),
+            "p50_ms": percentile(step["latencies"], 50),
+            "p95_ms": percentile(step["latencies"], 95),
+            "prompt_tokens": percentile(step["prompt_tokens"], 50),
+            "peak_rss_mb": step.get("peak_rss_mb"),
+        })
+    measured = [row for row in rows if row["calls"]]
+    latency = linear_fit([(row["messages"], row["p50_ms"]) for row in measured])
+    prompt = linear_fit([(row["messages"], row["prompt_tokens"]) for row in measured])
+    return {
+        "rows": rows,
+        "fit": {
+            "ms_per_1k_messages": latency["ms_per_1k_tokens"],
+            "prompt_tokens_per_message": prompt["ms_per_1k_tokens"] / 1000,
+            "r": latency["r"],
+        },
+    }
+
+
+def print_history(report: Dict[str, Any]):
+    print("\n" + "=" * 60)
+    print("📈 LATENCY VS CONVERSATION LENGTH")
+    print("=" * 60)
+    print(f"{'messages':>10}{'calls':>7}{'p50':>10}{'p95':>10}{'prompt tok':>12}{'peak RSS':>10}")
+    for row in report["rows"]:
+        rss = f"{row['peak_rss_mb']:.0f}MB" if row["peak_rss_mb"] is not None else "-"
+        failed = f"  ({row['failures']} failed)" if row["failures"] else ""
+        print(f"{row['messages']:>10}{row['calls']:>7}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}"
+              f"{row['prompt_tokens']:>12.0f}{rss:>10}{failed}")
+    fit = report["fit"]
+    print(f"\n+{fit['ms_per_1k_messages']:.1f}ms and +{fit['prompt_tokens_per_message']:.0f} prompt tokens "
+          f"per message of history (r={fit['r']:.2f})")
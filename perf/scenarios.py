@@ -0,0 +1,329 @@
+"""
+Weighted user-journey scenarios
+A journey is an ordered list of tRPC steps with its own weight and think
+time; each virtual user repeatedly samples a journey from the mix, so the
+load matches production's traffic ratio instead of a fixed call loop.
+
+Journeys are plain data (dicts/lists) so they can be loaded from JSON and
+shipped to worker processes. Step inputs may reference values saved by
+earlier steps or provided by the runner: "$workspace_id", "$email", "$vu",
+"$iteration", "$uid".
+
+    {"name": "outreach", "weight": 5, "think_time": 1.0, "steps": [
+        {"procedure": "workspace.create", "input": {"name": "Load $uid"},
+         "save": {"workspace_id": "id"}},
+        {"procedure": "chat.sendInbound", "repeat": 10,
+         "input": {"prospectId": "$prospect_id", "content": "Hi"}},
+        {"procedure": "knowledgeBase.get", "method": "GET", "input": {"id": "$item_id"},
+         "poll": {"path": "status", "until": ["ready", "failed"], "interval": 2, "max": 30}}
+    ]}
+
+A step's "files" adds generated base64 uploads to its input; sizes are
+perf.delays specs read as bytes:
+    {"procedure": "chat.uploadScreenshot", "input": {"fileName": "s.png"},
+     "files": {"imageBase64": {"type": "png", "bytes": "lognormal:700000,0.5"}}}
+"""
+
+import asyncio
+import base64
+import json
+import os
+import random
+import time
+import uuid
+from typing import Dict, Any, List, Optional
+
+from perf.delays import LatencyModel
+from perf.results import LoadResults
+
+# Journeys modelled on production traffic: mostly browsing, some new
+# conversations and knowledge-base ingestion. They run as the virtual user's
+# session, so use --preauth-users; signups are benchmarked by signup-bench.
+DEFAULT_SCENARIOS: List[Dict[str, Any]] = [
+    {
+        "name": "new_prospect_chat",
+        "weight": 1,
+        "think_time": 2.0,
+        "steps": [
+            {"procedure": "workspace.create",
+             "input": {"name": "Load Workspace $uid", "defaultReplyMode": "friend"},
+             "save": {"workspace_id": "id"}},
+            {"procedure": "prospect.create",
+             "input": {"workspaceId": "$workspace_id", "name": "Prospect $uid"},
+             "save": {"prospect_id": "id"}},
+            {"procedure": "chat.sendInbound", "repeat": 10,
+             "input": {"prospectId": "$prospect_id",
+                       "content": "Hey, I saw your post. How did you get started?"}},
+            {"procedure": "prospect.updateOutcome",
+             "input": {"id": "$prospect_id", "outcome": "won"}},
+        ],
+    },
+    {
+        "name": "ingest_url",
+        "weight": 1,
+        "think_time": 1.0,
+        "steps": [
+            {"procedure": "knowledgeBase.addUrl",
+             "input": {"title": "Load test $uid", "url": "https://example.com/?load=$uid"},
+             "save": {"item_id": "id"}},
+            # The client fires processItem and polls get() for progress
+            {"procedure": "knowledgeBase.processItem", "input": {"id": "$item_id"},
+             "background": True},
+            {"procedure": "knowledgeBase.get", "method": "GET", "input": {"id": "$item_id"},
+             "poll": {"path": "status", "until": ["ready", "failed"], "interval": 2.0, "max": 60}},
+        ],
+    },
+    {
+        "name": "browse",
+        "weight": 8,
+        "think_time": 0.5,
+        "steps": [
+            {"procedure": "auth.me", "method": "GET"},
+            {"procedure": "brain.getStats", "method": "GET"},
+            {"procedure": "workspace.list", "method": "GET"},
+        ],
+    },
+]
+
+
+# Upload-heavy journeys with realistic file sizes: phone screenshots are
+# 0.3-2MB PNGs, sales PDFs 1-15MB
+UPLOAD_SCENARIOS: List[Dict[str, Any]] = [
+    {
+        "name": "screenshot_ocr",
+        "weight": 3,
+        "think_time": 1.0,
+        "steps": [
+            {"procedure": "chat.uploadScreenshot",
+             "input": {"fileName": "screenshot_$uid.png"},
+             "files": {"imageBase64": {"type": "png", "bytes": "lognormal:700000,0.5"}}},
+        ],
+    },
+    {
+        "name": "pdf_upload",
+        "weight": 1,
+        "think_time": 1.0,
+        "steps": [
+            {"procedure": "knowledgeBase.addPdf",
+             "input": {"title": "Load test PDF $uid", "fileName": "playbook_$uid.pdf"},
+             "files": {"fileBase64": {"type": "pdf", "bytes": "lognormal:3000000,0.8"}},
+             "save": {"item_id": "id"}},
+            {"procedure": "knowledgeBase.get", "method": "GET", "input": {"id": "$item_id"}},
+        ],
+    },
+]
+
+# Scraping and URL ingestion against the forge stand-in's fixture pages
+# (perf.sites). "$site_url" is filled in by the harness; pages are keyed by
+# $vu so repeated runs fetch (and prompt the LLM with) the same content.
+SCRAPE_SCENARIOS: List[Dict[str, Any]] = [
+    {
+        "name": "analyze_prospect",
+        "weight": 2,
+        "think_time": 1.0,
+        "steps": [
+            {"procedure": "workspace.create",
+             "input": {"name": "Scrape Workspace $uid", "defaultReplyMode": "friend"},
+             "save": {"workspace_id": "id"}},
+            {"procedure": "prospect.create",
+             "input": {"workspaceId": "$workspace_id", "name": "Prospect $uid",
+                       "instagramUrl": "https://www.instagram.com/creator_$vu/",
+                       "tiktokUrl": "https://www.tiktok.com/@creator_$vu",
+                       "storeUrl": "$site_url/store/shop-$vu"},
+             "save": {"prospect_id": "id"}},
+            {"procedure": "prospect.analyzeProfile", "input": {"id": "$prospect_id"}},
+        ],
+    },
+    {
+        "name": "ingest_article",
+        "weight": 2,
+        "think_time": 1.0,
+        "steps": [
+            {"procedure": "knowledgeBase.addUrl",
+             "input": {"title": "Article $uid", "url": "$site_url/article/post-$vu"},
+             "save": {"item_id": "id"}},
+            {"procedure": "knowledgeBase.processItem", "input": {"id": "$item_id"},
+             "background": True},
+            {"procedure": "knowledgeBase.get", "method": "GET", "input": {"id": "$item_id"},
+             "poll": {"path": "status", "until": ["ready", "failed"], "interval": 2.0, "max": 60}},
+        ],
+    },
+    {
+        "name": "ingest_profile_page",
+        "weight": 1,
+        "think_time": 1.0,
+        "steps": [
+            {"procedure": "knowledgeBase.addUrl",
+             "input": {"title": "Links $uid", "url": "$site_url/profile/creator-$vu"},
+             "save": {"item_id": "id"}},
+            {"procedure": "knowledgeBase.processItem", "input": {"id": "$item_id"},
+             "background": True},
+            {"procedure": "knowledgeBase.get", "method": "GET", "input": {"id": "$item_id"},
+             "poll": {"path": "status", "until": ["ready", "failed"], "interval": 2.0, "max": 60}},
+        ],
+    },
+]
+
+SCENARIO_SETS = {"default": DEFAULT_SCENARIOS, "uploads": UPLOAD_SCENARIOS, "scrape": SCRAPE_SCENARIOS}
+
+FILE_HEADERS = {"png": b"\x89PNG\r\n\x1a\n", "pdf": b"%PDF-1.4\n", "bin": b""}
+# express.json() accepts 50mb bodies; base64 adds a third
+MAX_FILE_BYTES = 36 * 1024 * 1024
+
+_file_pools: Dict[str, str] = {}
+_size_models: Dict[str, LatencyModel] = {}
+
+
+def upload_base64(kind: str, size_spec: Any) -> str:
+    """Base64 of a `kind` file (png/pdf/bin) whose size is drawn from size_spec
+
+    Contents are random after the format's magic bytes, like compressed image
+    data, and sliced from one encoded pool so big uploads stay cheap to make.
+    """
+    if isinstance(size_spec, (int, float)):
+        size = int(size_spec)
+    else:
+        model = _size_models.setdefault(size_spec, LatencyModel(size_spec))
+        size = int(model.sample_ms())
+    # Whole base64 quanta only, so a slice of the pool is itself valid base64
+    size = max(3, min(MAX_FILE_BYTES, size)) // 3 * 3
+    pool = _file_pools.get(kind, "")
+    if len(pool) < size // 3 * 4:
+        # Grow to at least double so a run settles on one pool per kind
+        pool_size = min(MAX_FILE_BYTES, max(size, len(pool) // 4 * 3 * 2)) // 3 * 3
+        data = FILE_HEADERS.get(kind, b"") + os.urandom(pool_size)
+        pool = _file_pools[kind] = base64.b64encode(data[:pool_size]).decode()
+    return pool[:size // 3 * 4]
+
+
+class StepFailed(Exception):
+    """A journey step failed; the rest of the journey is skipped"""
+
+
+def load_scenarios(spec: str) -> List[Dict[str, Any]]:
+    """A built-in set ('default', 'uploads', 'scrape'), otherwise a JSON file with a list of journeys"""
+    if spec in SCENARIO_SETS:
+        return SCENARIO_SETS[spec]
+    with open(spec) as f:
+        scenarios = json.load(f)
+    for journey in scenarios:
+        if not journey.get("steps"):
+            raise ValueError(f"Journey '{journey.get('name')}' has no steps")
+    return scenarios
+
+
+def trpc_data(body: Any) -> Any:
+    """Unwrap {"result": {"data": {"json": ...}}} (superjson) or {"result": {"data": ...}}"""
+    if not isinstance(body, dict):
+        return None
+    data = body.get("result", {}).get("data")
+    if isinstance(data, dict) and "json" in data:
+        return data["json"]
+    return data
+
+
+def extract(data: Any, path: str) -> Any:
+    """Follow a dotted path such as 'prospect.id' or 'items.0.id'"""
+    for key in path.split(".") if path else []:
+        if isinstance(data, list) and key.isdigit():
+            data = data[int(key)] if int(key) < len(data) else None
+        elif isinstance(data, dict):
+            data = data.get(key)
+        else:
+            return None
+    return data
+
+
+def render(value: Any, context: Dict[str, Any]) -> Any:
+    """Substitute $name references; a string that is exactly "$name" keeps the value's type"""
+    if isinstance(value, dict):
+        return {k: render(v, context) for k, v in value.items()}
+    if isinstance(value, list):
+        return [render(v, context) for v in value]
+    if isinstance(value, str) and "$" in value:
+        if value.startswith("$") and value[1:] in context:
+            return context[value[1:]]
+        for name in sorted(context, key=len, reverse=True):
+            value = value.replace(f"${name}", str(context[name]))
+    return value
+
+
+class ScenarioMix:
+    """Weighted random choice of journeys"""
+
+    def __init__(self, scenarios: List[Dict[str, Any]], seed: Optional[int] = None):
+        self.scenarios = [s for s in scenarios if s.get("weight", 1) > 0]
+        self.weights = [s.get("weight", 1) for s in self.scenarios]
+        self.rng = random.Random(seed)
+
+    def pick(self) -> Dict[str, Any]:
+        return self.rng.choices(self.scenarios, weights=self.weights)[0]
+
+
+async def run_step(vu, step: Dict[str, Any], context: Dict[str, Any], background: List[asyncio.Task]):
+    """Run one step (with repeat/poll/save); raises StepFailed on an error"""
+    method = step.get("method", "POST")
+    procedure = step["procedure"]
+    input_data = render(step.get("input", {}), context)
+    for field, spec in step.get("files", {}).items():
+        input_data[field] = upload_base64(spec.get("type", "bin"), spec["bytes"])
+
+    if step.get("background"):
+        background.append(asyncio.ensure_future(vu.call(procedure, input_data, method)))
+        return
+
+    poll = step.get("poll")
+    for _ in range(step.get("repeat", 1)):
+        attempts = poll.get("max", 30) if poll else 1
+        for attempt in range(attempts):
+            body = await vu.call(procedure, input_data, method)
+            if "error" in body:
+                raise StepFailed(procedure)
+            data = trpc_data(body)
+            if not poll or extract(data, poll["path"]) in poll["until"]:
+                break
+            if attempt + 1 == attempts:
+                raise StepFailed(f"{procedure} (poll timed out)")
+            await asyncio.sleep(poll.get("interval", 1.0))
+        for name, path in step.get("save", {}).items():
+            context[name] = extract(data, path)
+
+
+async def run_journey(vu, journey: Dict[str, Any], iteration: int, results: LoadResults,
+                      deadline: float) -> bool:
+    """Run a journey's steps in order and record its end-to-end time"""
+    uid = uuid.uuid4().hex[:12]
+    context: Dict[str, Any] = {
+        "vu": vu.user_id,
+        "iteration": iteration,
+        "uid": uid,
+        "email": f"loadtest+{uid}@example.com",
+    }
+    think_time = journey.get("think_time", 0.0)
+    background: List[asyncio.Task] = []
+    start = time.perf_counter()
+    success = True
+    try:
+        for index, step in enumerate(journey["steps"]):
+            if time.perf_counter() >= deadline:
+                # Cut short by the end of the run: neither a success nor a failure
+                return False
+            await run_step(vu, step, context, background)
+            pause = step.get("think_time", think_time)
+            if pause > 0 and index + 1 < len(journey["steps"]):
+                await asyncio.sleep(pause)
+    except StepFailed:
+        success = False
+    finally:
+        if background:
+            await asyncio.gather(*background)
+    results.record_journey(journey["name"], time.perf_counter() - start, success)
+    return success
+
+
+async def run_scenario_user(vu, mix: ScenarioMix, deadline: float, results: LoadResults):
+    """Keep sampling and running journeys until the deadline passes"""
+    iteration = 0
+    while time.perf_counter() < deadline:
+        await run_journey(vu, mix.pick(), iteration, results, deadline)
+        iteration += 1
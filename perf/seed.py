@@ -0,0 +1,485 @@
+"""
+Bulk synthetic rows for database scaling tests
+Several db.ts helpers load every row a user owns and filter in JavaScript,
+which only hurts at production sizes. This seeds those sizes straight into
+Postgres: rows are generated from small pre-built text pools and streamed
+with COPY in large blocks, so millions of rows load in seconds.
+
+    python -m perf.seed chunks --user-id 42 --rows 1000000
+    python -m perf.seed messages --user-id 42 --prospect-ids 7,8 --messages lognormal:300,1.2
+    python -m perf.seed prospects --user-id 42 --prospects 100,10000,1000000
+
+Counts are targets: a table already holding some of a user's seeded rows is
+topped up, so stepping 10k -> 100k -> 1M only writes the difference. Seeded
+knowledge chunks hang off knowledge_base_items titled SEED_TITLE, which
+--clear (and clear_chunks) removes again; seeded prospects fill one workspace
+per size, named after it (SEED_WORKSPACE). Seeded messages are older history:
+they are dated before a prospect's earliest message, so the live conversation
+stays at the end. DATABASE_URL is read from the environment like the server
+does; needs psycopg 3.
+"""
+
+import argparse
+import datetime
+import functools
+import os
+import random
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from perf.delays import LatencyModel
+from perf.llm import filler
+
+# Rows per COPY write; big blocks keep the per-call overhead out of the way
+BLOCK_ROWS = 20000
+# Distinct sentences per text pool; rows are sampled from pools, not generated
+POOL_SENTENCES = 400
+SEED_TITLE = "[seed] synthetic knowledge source"
+SEED_WORKSPACE = "[seed] {size} prospects"
+
+# knowledge_category enum, weighted like chunks extracted from real sales content
+CATEGORY_WEIGHTS = {
+    "rapport_building": 14, "objection_handling": 12, "opening_lines": 10, "pain_discovery": 9,
+    "trust_building": 9, "closing_techniques": 8, "psychology_insight": 7, "language_pattern": 7,
+    "strategic_question": 6, "emotional_trigger": 5, "conversation_pattern": 5, "audience_insight": 4,
+    "need_identification": 4, "general_wisdom": 3,
+}
+BRAIN_TYPE_WEIGHTS = {"both": 50, "friend": 30, "expert": 20}
+CATEGORY_LEADS = {
+    "rapport_building": "Mirror their words before sharing your own story.",
+    "objection_handling": "When they say it is too expensive, ask what it is costing them to stay stuck.",
+    "opening_lines": "Open with something specific from their latest post.",
+    "pain_discovery": "Ask what they have already tried and how that felt.",
+    "trust_building": "Share a small failure before any result.",
+    "closing_techniques": "Let them name the next step themselves.",
+    "psychology_insight": "People defend decisions they feel pushed into.",
+    "language_pattern": "Swap 'but' for 'and' to keep the thread open.",
+    "strategic_question": "What would change for you if this worked in ninety days?",
+    "emotional_trigger": "Frustration with the 9-5 is a stronger motive than extra income.",
+    "conversation_pattern": "Two curious questions in a row before any suggestion.",
+    "audience_insight": "Stay-at-home parents respond to flexibility, not hype.",
+    "need_identification": "Listen for the goal behind the first goal they mention.",
+    "general_wisdom": "Consistency beats intensity in every follow up.",
+}
+# conversation_stage enum in funnel order, weighted like a pipeline that thins out
+STAGE_WEIGHTS = {
+    "first_contact": 30, "warm_rapport": 22, "pain_discovery": 15, "objection_resistance": 12,
+    "trust_reinforcement": 9, "referral_to_expert": 7, "expert_close": 5,
+}
+# Chance a prospect at each stage was won; the rest split by CLOSED_WEIGHTS or stay active
+STAGE_WIN_RATE = [0.01, 0.03, 0.05, 0.08, 0.15, 0.25, 0.45]
+CLOSED_WEIGHTS = {"active": 60, "ghosted": 25, "lost": 15}
+FIRST_NAMES = ["Ashley", "Brittany", "Jess", "Kayla", "Megan", "Sam", "Tasha", "Nicole", "Dani", "Chris",
+               "Lauren", "Jordan", "Alexis", "Morgan", "Taylor", "Destiny", "Amber", "Kelsey", "Rachel", "Tiff"]
+INBOUND_LEADS = [
+    "Haha yeah that's so true", "Honestly I've been thinking about that too", "What do you mean exactly?",
+    "I'm not sure it's for me", "How much does it cost?", "My husband thinks it's a scam lol",
+    "I don't have much time with the kids", "That sounds interesting", "I tried something like this before",
+]
+OUTBOUND_LEADS = [
+    "Totally get that", "That makes so much sense", "Can I ask what made you start looking?",
+    "No pressure at all", "I was in the exact same spot last year", "What would that change for you?",
+    "Happy to share what worked for me", "Love that you're thinking about it",
+]
+TRIGGER_PHRASES = [
+    "too expensive", "not sure", "tried before", "no time", "sounds like a scam", "how does it work",
+    "what do you do", "I'm curious", "my husband", "my job", "side income", "burned before",
+    "need to think", "send me info", "how much", "is this legit", "beginner", "no followers",
+]
+
+
+def weighted(weights: Dict[str, int]) -> List[str]:
+    """Population list for rng.choice() that follows the weights"""
+    return [name for name, weight in weights.items() for _ in range(weight)]
+
+
+def copy_text(value: Any) -> str:
+    """One value in COPY text format"""
+    if value is None:
+        return "\\N"
+    text = str(value)
+    if any(c in text for c in "\\\t\n\r"):
+        text = text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    return text
+
+
+def copy_line(values: Sequence[Any]) -> str:
+    return "\t".join(copy_text(v) for v in values) + "\n"
+
+
+def connect(database_url: Optional[str] = None):
+    import psycopg
+    url = database_url or os.environ.get("DATABASE_URL")
+    if not url:
+        raise ValueError("DATABASE_URL is not set")
+    return psycopg.connect(url, autocommit=True)
+
+
+def copy_rows(conn, table: str, columns: Sequence[str], lines: Iterable[str]) -> int:
+    """COPY pre-formatted text lines (see copy_line) into table; returns the row count"""
+    quoted = ", ".join(f'"{c}"' for c in columns)
+    count = 0
+    block: List[str] = []
+    with conn.cursor() as cur:
+        with cur.copy(f'COPY {table} ({quoted}) FROM STDIN') as copy:
+            for line in lines:
+                block.append(line)
+                if len(block) >= BLOCK_ROWS:
+                    copy.write("".join(block))
+                    count += len(block)
+                    block = []
+            if block:
+                copy.write("".join(block))
+                count += len(block)
+    return count
+
+
+def sentence_pool(rng: random.Random, lead: str, size: int = POOL_SENTENCES) -> List[str]:
+    return [lead] + [filler(rng, rng.randint(8, 22)) for _ in range(size - 1)]
+
+
+@functools.lru_cache(maxsize=8)
+def timestamps(seed: Optional[int], days: int = 180, size: int = 5000) -> List[str]:
+    """COPY-ready creation times spread over the last `days` days"""
+    rng = random.Random(seed)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [(now - datetime.timedelta(seconds=rng.randint(0, days * 86400))).strftime("%Y-%m-%d %H:%M:%S")
+            for _ in range(size)]
+
+
+def text_of_length(rng: random.Random, pool: List[str], length: int) -> str:
+    parts = []
+    total = 0
+    while total < length:
+        sentence = rng.choice(pool)
+        parts.append(sentence)
+        total += len(sentence) + 1
+    return " ".join(parts)[:length]
+
+
+CHUNK_COLUMNS = ["userId", "sourceId", "category", "content", "triggerPhrases", "usageExample",
+                 "relevanceScore", "brainType", "createdAt"]
+
+
+@functools.lru_cache(maxsize=8)
+def chunk_pools(seed: Optional[int]) -> Tuple[Dict[str, List[str]], List[str], List[str]]:
+    """Content sentences per category, usage examples and trigger phrase sets"""
+    rng = random.Random(seed)
+    pools = {category: sentence_pool(rng, lead) for category, lead in CATEGORY_LEADS.items()}
+    examples = [f'"{filler(rng, rng.randint(6, 14))}"' for _ in range(POOL_SENTENCES)]
+    triggers = [", ".join(rng.sample(TRIGGER_PHRASES, rng.randint(2, 4))) for _ in range(POOL_SENTENCES)]
+    return pools, examples, triggers
+
+
+def chunk_lines(user_id: int, source_ids: List[int], count: int, seed: Optional[int] = None,
+                content_chars: str = "lognormal:280,0.5", pool_seed: Optional[int] = None) -> Iterator[str]:
+    """COPY lines for `count` knowledge_chunks rows of one user
+
+    Category and brainType follow CATEGORY_WEIGHTS/BRAIN_TYPE_WEIGHTS, content
+    length follows content_chars (a perf.delays spec read as characters),
+    relevanceScore is centred on 60, half the rows carry a usage example.
+    Text pools are built once per pool_seed and shared between calls.
+    """
+    rng = random.Random(seed)
+    lengths = LatencyModel(content_chars, seed)
+    categories = weighted(CATEGORY_WEIGHTS)
+    brain_types = weighted(BRAIN_TYPE_WEIGHTS)
+    pools, examples, triggers = chunk_pools(pool_seed)
+    created = timestamps(pool_seed)
+    user = str(user_id)
+    sources = [str(s) for s in source_ids]
+    for _ in range(count):
+        category = rng.choice(categories)
+        content = text_of_length(rng, pools[category], max(40, int(lengths.sample_ms())))
+        example = rng.choice(examples) if rng.random() < 0.5 else "\\N"
+        score = min(100, max(1, int(rng.gauss(60, 15))))
+        # Pools hold no tabs, newlines or backslashes, so fields skip copy_text()
+        yield "\t".join((user, rng.choice(sources), category, content, rng.choice(triggers), example,
+                         str(score), rng.choice(brain_types), rng.choice(created))) + "\n"
+
+
+def seed_sources(conn, user_id: int, count: int) -> List[int]:
+    """The user's seeded knowledge_base_items, created up to `count`"""
+    with conn.cursor() as cur:
+        cur.execute('SELECT id FROM knowledge_base_items WHERE "userId" = %s AND title = %s ORDER BY id',
+                    (user_id, SEED_TITLE))
+        ids = [row[0] for row in cur.fetchall()]
+        for index in range(len(ids), count):
+            cur.execute(
+                'INSERT INTO knowledge_base_items ("userId", type, title, "sourceUrl", platform, status, '
+                '"processingProgress") VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id',
+                (user_id, "url", SEED_TITLE, f"https://seed.invalid/source/{index}", "other", "ready", 100))
+            ids.append(cur.fetchone()[0])
+    return ids[:count]
+
+
+def count_chunks(conn, user_id: int) -> int:
+    with conn.cursor() as cur:
+        cur.execute('SELECT count(*) FROM knowledge_chunks WHERE "userId" = %s', (user_id,))
+        return cur.fetchone()[0]
+
+
+def seed_chunks(conn, user_id: int, rows: int, sources: int = 50, seed: Optional[int] = None,
+                content_chars: str = "lognormal:280,0.5") -> Dict[str, Any]:
+    """Top the user's knowledge_chunks up to `rows` (counting chunks they already had)"""
+    existing = count_chunks(conn, user_id)
+    missing = max(0, rows - existing)
+    started = time.perf_counter()
+    if missing:
+        source_ids = seed_sources(conn, user_id, sources)
+        copy_rows(conn, "knowledge_chunks", CHUNK_COLUMNS,
+                  chunk_lines(user_id, source_ids, missing, None if seed is None else seed + existing,
+                              content_chars, pool_seed=seed))
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE knowledge_chunks")
+    seconds = time.perf_counter() - started
+    return {"user_id": user_id, "rows": existing + missing, "inserted": missing, "seconds": seconds,
+            "rows_per_second": missing / seconds if missing and seconds else 0.0}
+
+
+def clear_chunks(conn, user_id: int) -> int:
+    """Delete the user's seeded chunks and sources; returns chunks deleted"""
+    with conn.cursor() as cur:
+        cur.execute('DELETE FROM knowledge_chunks WHERE "userId" = %s AND "sourceId" IN '
+                    '(SELECT id FROM knowledge_base_items WHERE "userId" = %s AND title = %s)',
+                    (user_id, user_id, SEED_TITLE))
+        deleted = cur.rowcount
+        cur.execute('DELETE FROM knowledge_base_items WHERE "userId" = %s AND title = %s', (user_id, SEED_TITLE))
+    return deleted
+
+
+MESSAGE_COLUMNS = ["prospectId", "userId", "threadType", "direction", "content", "isAiSuggestion", "wasSent",
+                   "createdAt"]
+
+
+def message_lines(user_id: int, prospect_id: int, count: int, before: datetime.datetime,
+                  expert_share: float = 0.3, seed: Optional[int] = None,
+                  content_chars: str = "lognormal:110,0.6") -> Iterator[str]:
+    """COPY lines for `count` chat_messages of one prospect, dated backwards from `before`
+
+    Prospect and user turns alternate with occasional double texts, a share of
+    the turns is on the expert thread, and sent replies are often AI suggestions.
+    """
+    rng = random.Random(seed)
+    lengths = LatencyModel(content_chars, seed)
+    pools = {direction: [f"{lead}{'' if lead[-1] in '?!' else '.'} {filler(rng, rng.randint(4, 16))}"
+                         for lead in leads for _ in range(POOL_SENTENCES // len(leads))]
+             for direction, leads in (("inbound", INBOUND_LEADS), ("outbound", OUTBOUND_LEADS))}
+    user, prospect = str(user_id), str(prospect_id)
+    moment = before
+    direction = "outbound"
+    for _ in range(count):
+        if rng.random() < 0.8:
+            direction = "inbound" if direction == "outbound" else "outbound"
+        moment -= datetime.timedelta(seconds=rng.randint(20, 3600))
+        content = text_of_length(rng, pools[direction], max(8, int(lengths.sample_ms())))
+        suggested = "t" if direction == "outbound" and rng.random() < 0.6 else "f"
+        yield "\t".join((prospect, user, "expert" if rng.random() < expert_share else "friend", direction,
+                         content, suggested, "t" if direction == "outbound" else "f",
+                         moment.strftime("%Y-%m-%d %H:%M:%S"))) + "\n"
+
+
+def seed_messages(conn, user_id: int, prospect_ids: List[int], messages: str, expert_share: float = 0.3,
+                  seed: Optional[int] = None, low: int = 10, high: int = 5000) -> Dict[str, Any]:
+    """Top each prospect's chat_messages up to a count drawn from `messages`
+
+    `messages` is a plain count or a perf.delays spec sampled per prospect and
+    clamped to [low, high].
+    """
+    sizes = LatencyModel(messages if ":" in messages else f"fixed:{messages}", seed)
+    lines: List[Iterator[str]] = []
+    targets = {}
+    with conn.cursor() as cur:
+        for index, prospect_id in enumerate(prospect_ids):
+            target = min(high, max(low, int(sizes.sample_ms())))
+            cur.execute('SELECT count(*), min("createdAt") FROM chat_messages WHERE "prospectId" = %s',
+                        (prospect_id,))
+            existing, earliest = cur.fetchone()
+            targets[prospect_id] = target
+            if target > existing:
+                lines.append(message_lines(user_id, prospect_id, target - existing,
+                                           earliest or datetime.datetime.now(datetime.timezone.utc),
+                                           expert_share, None if seed is None else seed + index))
+    started = time.perf_counter()
+    inserted = copy_rows(conn, "chat_messages", MESSAGE_COLUMNS, (line for batch in lines for line in batch))
+    if inserted:
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE chat_messages")
+    seconds = time.perf_counter() - started
+    return {"user_id": user_id, "prospects": targets, "inserted": inserted, "seconds": seconds,
+            "rows_per_second": inserted / seconds if inserted and seconds else 0.0}
+
+
+PROSPECT_COLUMNS = ["workspaceId", "userId", "name", "instagramUrl", "conversationStage", "replyMode", "outcome",
+                    "lastMessageAt", "unreadCount", "createdAt", "updatedAt"]
+
+
+def prospect_lines(user_id: int, workspace_id: int, count: int, start: int = 0,
+                   seed: Optional[int] = None, pool_seed: Optional[int] = None) -> Iterator[str]:
+    """COPY lines for `count` prospects of one workspace
+
+    Stages follow STAGE_WEIGHTS; later stages are mostly in expert mode and
+    win more often (STAGE_WIN_RATE), the rest are active, ghosted or lost.
+    """
+    rng = random.Random(seed)
+    stages = list(STAGE_WEIGHTS)
+    stage_pool = weighted(STAGE_WEIGHTS)
+    closed = weighted(CLOSED_WEIGHTS)
+    created = timestamps(pool_seed)
+    user, workspace = str(user_id), str(workspace_id)
+    for index in range(start, start + count):
+        stage = rng.choice(stage_pool)
+        depth = stages.index(stage)
+        mode = "expert" if rng.random() < (0.8 if depth >= 5 else 0.15) else "friend"
+        outcome = "won" if rng.random() < STAGE_WIN_RATE[depth] else rng.choice(closed)
+        name = f"{rng.choice(FIRST_NAMES)} {index}"
+        instagram = f"https://www.instagram.com/prospect_{index}/" if rng.random() < 0.7 else "\\N"
+        moment = rng.choice(created)
+        yield "\t".join((workspace, user, name, instagram, stage, mode, outcome, moment,
+                         str(rng.randint(0, 3) if outcome == "active" else 0), moment, moment)) + "\n"
+
+
+def seed_workspace(conn, user_id: int, name: str) -> int:
+    """The user's workspace called `name`, created if missing"""
+    with conn.cursor() as cur:
+        cur.execute('SELECT id FROM workspaces WHERE "userId" = %s AND name = %s ORDER BY id LIMIT 1',
+                    (user_id, name))
+        row = cur.fetchone()
+        if row:
+            return row[0]
+        cur.execute('INSERT INTO workspaces ("userId", name, "nicheDescription") VALUES (%s, %s, %s) RETURNING id',
+                    (user_id, name, "Synthetic prospects for analytics scaling tests"))
+        return cur.fetchone()[0]
+
+
+def seed_prospects(conn, user_id: int, size: int, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Fill the user's SEED_WORKSPACE for `size` up to that many prospects"""
+    workspace_id = seed_workspace(conn, user_id, SEED_WORKSPACE.format(size=size))
+    with conn.cursor() as cur:
+        cur.execute('SELECT count(*) FROM prospects WHERE "workspaceId" = %s', (workspace_id,))
+        existing = cur.fetchone()[0]
+    missing = max(0, size - existing)
+    started = time.perf_counter()
+    if missing:
+        copy_rows(conn, "prospects", PROSPECT_COLUMNS,
+                  prospect_lines(user_id, workspace_id, missing, existing, None if seed is None else seed + existing,
+                                 pool_seed=seed))
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE prospects")
+    seconds = time.perf_counter() - started
+    return {"user_id": user_id, "workspace_id": workspace_id, "rows": existing + missing, "inserted": missing,
+            "seconds": seconds, "rows_per_second": missing / seconds if missing and seconds else 0.0}
+
+
+def clear_prospects(conn, user_id: int) -> int:
+    """Delete the user's seeded workspaces and everything in them; returns prospects deleted"""
+    pattern = SEED_WORKSPACE.format(size="%")
+    with conn.cursor() as cur:
+        cur.execute('SELECT id FROM workspaces WHERE "userId" = %s AND name LIKE %s', (user_id, pattern))
+        workspace_ids = [row[0] for row in cur.fetchall()]
+        if not workspace_ids:
+            return 0
+        cur.execute('DELETE FROM chat_messages WHERE "prospectId" IN '
+                    '(SELECT id FROM prospects WHERE "workspaceId" = ANY(%s))', (workspace_ids,))
+        cur.execute('DELETE FROM prospects WHERE "workspaceId" = ANY(%s)', (workspace_ids,))
+        deleted = cur.rowcount
+        cur.execute("DELETE FROM workspaces WHERE id = ANY(%s)", (workspace_ids,))
+    return deleted
+
+
+def seed_tenants(conn, tenants: List[Dict[str, Any]], seed: Optional[int] = None) -> Dict[str, Any]:
+    """Top up many users at once: each tenant dict names a user_id and its chunks and prospects
+
+    All tenants' rows go through one COPY per table. Sets workspace_id and
+    prospect_id (the first prospect of the seeded workspace) on every tenant.
+    """
+    chunk_batches: List[Iterator[str]] = []
+    prospect_batches: List[Iterator[str]] = []
+    for index, tenant in enumerate(tenants):
+        user_id = tenant["user_id"]
+        row_seed = None if seed is None else seed + index
+        existing = count_chunks(conn, user_id)
+        if tenant["chunks"] > existing:
+            source_ids = seed_sources(conn, user_id, max(1, min(50, tenant["chunks"] // 2000)))
+            chunk_batches.append(chunk_lines(user_id, source_ids, tenant["chunks"] - existing, row_seed,
+                                             pool_seed=seed))
+        size = max(1, tenant["prospects"])
+        tenant["workspace_id"] = seed_workspace(conn, user_id, SEED_WORKSPACE.format(size=size))
+        with conn.cursor() as cur:
+            cur.execute('SELECT count(*) FROM prospects WHERE "workspaceId" = %s', (tenant["workspace_id"],))
+            existing = cur.fetchone()[0]
+        if size > existing:
+            prospect_batches.append(prospect_lines(user_id, tenant["workspace_id"], size - existing, existing,
+                                                   row_seed, pool_seed=seed))
+
+    started = time.perf_counter()
+    chunks = copy_rows(conn, "knowledge_chunks", CHUNK_COLUMNS, (l for batch in chunk_batches for l in batch))
+    prospects = copy_rows(conn, "prospects", PROSPECT_COLUMNS, (l for batch in prospect_batches for l in batch))
+    with conn.cursor() as cur:
+        cur.execute("ANALYZE knowledge_chunks")
+        cur.execute("ANALYZE prospects")
+        cur.execute('SELECT DISTINCT ON ("workspaceId") "workspaceId", id FROM prospects '
+                    'WHERE "workspaceId" = ANY(%s) ORDER BY "workspaceId", id',
+                    ([tenant["workspace_id"] for tenant in tenants],))
+        first = dict(cur.fetchall())
+    for tenant in tenants:
+        tenant["prospect_id"] = first.get(tenant["workspace_id"])
+    return {"tenants": len(tenants), "chunks_inserted": chunks, "prospects_inserted": prospects,
+            "seconds": time.perf_counter() - started}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic rows for scaling tests")
+    parser.add_argument("--database-url", default=None, help="default: $DATABASE_URL")
+    parser.add_argument("--seed", type=int, default=None)
+    commands = parser.add_subparsers(dest="command", required=True)
+    chunks = commands.add_parser("chunks", help="knowledge_chunks for one user")
+    chunks.add_argument("--user-id", type=int, required=True)
+    chunks.add_argument("--rows", type=int, default=10000, help="chunks the user should end up with")
+    chunks.add_argument("--sources", type=int, default=50, help="seeded knowledge_base_items to spread them over")
+    chunks.add_argument("--content-chars", default="lognormal:280,0.5",
+                        help="chunk length distribution in characters (perf.delays syntax)")
+    chunks.add_argument("--clear", action="store_true", help="delete the user's seeded chunks instead")
+    messages = commands.add_parser("messages", help="chat history for existing prospects")
+    messages.add_argument("--user-id", type=int, required=True)
+    messages.add_argument("--prospect-ids", required=True, help="comma-separated prospects of that user")
+    messages.add_argument("--messages", default="lognormal:300,1.2",
+                          help="messages per prospect: a count or a perf.delays spec, clamped to 10-5000")
+    messages.add_argument("--expert-share", type=float, default=0.3,
+                          help="fraction of messages on the expert thread")
+    prospects = commands.add_parser("prospects", help="workspaces full of prospects for one user")
+    prospects.add_argument("--user-id", type=int, required=True)
+    prospects.add_argument("--prospects", default="100,10000,1000000",
+                           help="comma-separated sizes, one seeded workspace each")
+    prospects.add_argument("--clear", action="store_true", help="delete the user's seeded workspaces instead")
+    args = parser.parse_args(argv)
+
+    with connect(args.database_url) as conn:
+        if args.command == "prospects":
+            if args.clear:
+                print(f"🧹 Deleted {clear_prospects(conn, args.user_id)} seeded prospects of user {args.user_id}")
+                return
+            for size in [int(n) for n in args.prospects.split(",") if n.strip()]:
+                result = seed_prospects(conn, args.user_id, size, args.seed)
+                print(f"🌱 Workspace {result['workspace_id']} has {result['rows']} prospects "
+                      f"({result['inserted']} inserted in {result['seconds']:.1f}s, "
+                      f"{result['rows_per_second']:.0f} rows/s)")
+            return
+        if args.command == "messages":
+            prospect_ids = [int(p) for p in args.prospect_ids.split(",") if p.strip()]
+            result = seed_messages(conn, args.user_id, prospect_ids, args.messages, args.expert_share, args.seed)
+            print(f"🌱 {len(prospect_ids)} prospects of user {args.user_id} have "
+                  f"{sum(result['prospects'].values())} messages ({result['inserted']} inserted in "
+                  f"{result['seconds']:.1f}s, {result['rows_per_second']:.0f} rows/s)")
+            return
+        if args.clear:
+            print(f"🧹 Deleted {clear_chunks(conn, args.user_id)} seeded chunks of user {args.user_id}")
+            return
+        result = seed_chunks(conn, args.user_id, args.rows, args.sources, args.seed, args.content_chars)
+        print(f"🌱 User {args.user_id} has {result['rows']} knowledge chunks "
+              f"({result['inserted']} inserted in {result['seconds']:.1f}s, "
+              f"{result['rows_per_second']:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Append-only JSONL result sink
+Each test result, and every few seconds a progress record of a running
+load test (perf.results.LoadResults.report_progress), is written as one JSON
+line as soon as it is logged, so a long soak run keeps constant memory and a
+crash loses at most the last flush interval. Files rotate to numbered
+segments (results.jsonl.1, .2, ...) once they pass max_bytes; segments are
+never deleted or overwritten. Runs append to the same file, and every record
+carries the "run" id of the run that wrote it.
+"""
+
+import json
+import os
+import time
+from typing import Dict, Any, List
+
+# Flush to the OS after this many records or this many seconds, whichever first
+FLUSH_EVERY = 100
+FLUSH_INTERVAL = 1.0
+# Rotate the active file once it grows past this size
+MAX_BYTES = 100 * 1024 * 1024
+
+
+class JsonlSink:
+    """Writes one JSON object per line to `path`, rotating by size"""
+
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES, flush_every: int = FLUSH_EVERY,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.records = 0
+        self.segments: List[str] = []
+        self.unflushed = 0
+        self.last_flush = time.monotonic()
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Append: an earlier run's records stay; rotation skips over existing segments
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]):
+        self.file.write(json.dumps(dict(record, run=self.run_id), default=str) + "\n")
+        self.records += 1
+        self.unflushed += 1
+        if self.unflushed >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+        if self.max_bytes and self.file.tell() >= self.max_bytes:
+            self.rotate()
+
+    def flush(self):
+        self.file.flush()
+        self.unflushed = 0
+        self.last_flush = time.monotonic()
+
+    def rotate(self):
+        """Close the active file as the next numbered segment and start a new one"""
+        self.file.close()
+        index = len(self.segments) + 1
+        while os.path.exists(f"{self.path}.{index}"):
+            index += 1
+        segment = f"{self.path}.{index}"
+        os.rename(self.path, segment)
+        self.segments.append(segment)
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def files(self) -> List[str]:
+        """Every file written by this sink, oldest first (filter on run_id for this run's records)"""
+        return self.segments + [self.path]
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
@@ -0,0 +1,262 @@
+"""
+Fixture web for the scrapers and URL ingestion
+Serves what server/webScraper.ts and the knowledge-base URL path fetch, so
+prospect.analyzeProfile and knowledgeBase.addUrl/processItem run offline:
+    GET  /site/store/SLUG          shop page with priced product cards (scrapeStore)
+    GET  /site/article/SLUG        sales article with headings, scripts and styles
+                                   (fetchWebPageContent)
+    GET  /site/profile/SLUG        creator link-in-bio page
+    GET  /instagram/oembed/?url=   INSTAGRAM_OEMBED_URL (scrapeInstagramProfile,
+                                   getInstagramTranscript)
+    GET  /tiktok/oembed?url=       TIKTOK_OEMBED_URL (getTikTokTranscript)
+    POST /webdevtoken.v1.WebDevService/CallApi
+                                   callDataApi Youtube/search and Youtube/get_channel_details
+                                   (fetchYouTubeMetadata)
+    POST /__site/faults            change failure rates mid-run, like /__llm/faults
+
+Pages are generated from their slug, so a URL always returns the same page
+(and the same LLM prompt, which keeps perf.replay cassettes hitting). Page
+size comes from a byte distribution (perf.delays syntax); pages are sent at
+a set bandwidth after a latency sample. Failures are KIND=RATE pairs:
+    404, 403 (bot wall), 5xx, timeout (hold for hang_seconds; scrapeStore has
+    no fetch timeout, fetchWebPageContent aborts after 10s), reset (the
+    connection drops halfway through the body)
+"""
+
+import asyncio
+import json
+import random
+import zlib
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+from perf.delays import LatencyModel
+from perf.faults import FaultInjector
+from perf.llm import filler
+from perf.storage import CHUNK_BYTES, transfer_seconds
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+SITE_FAULT_KINDS = ("404", "403", "5xx", "timeout", "reset")
+PAGE_KINDS = ("store", "article", "profile")
+
+PRODUCT_NOUNS = ["Masterclass", "Coaching Call", "Starter Kit", "Template Pack", "Workbook",
+                 "Accelerator", "Community Pass", "Mini Course", "Swipe File", "Planner"]
+TOPICS = ["affiliate marketing", "content creation", "digital products", "mindset",
+          "social selling", "email funnels", "personal branding", "side income"]
+BOT_WALL = "<html><head><title>Just a moment...</title></head><body>Checking your browser</body></html>"
+
+
+def page_rng(kind: str, slug: str) -> random.Random:
+    return random.Random(zlib.crc32(f"{kind}:{slug}".encode()))
+
+
+def display_name(slug: str) -> str:
+    return " ".join(part.capitalize() for part in slug.replace("_", "-").split("-") if part) or "Creator"
+
+
+def paragraph(rng: random.Random) -> str:
+    return " ".join(filler(rng, rng.randint(10, 24)) for _ in range(rng.randint(2, 5)))
+
+
+def page_shell(title: str, description: str, rng: random.Random) -> List[str]:
+    """<head> with the title/description the scrapers extract, plus typical script and style weight"""
+    return [
+        "<!DOCTYPE html>",
+        '<html lang="en"><head><meta charset="utf-8">',
+        f"<title>{title}</title>",
+        f'<meta name="description" content="{description}">',
+        f'<meta property="og:title" content="{title}">',
+        "<style>" + " ".join(f".c{i}{{margin:{i}px;padding:{i % 7}px}}" for i in range(rng.randint(20, 80)))
+        + "</style>",
+        "<script>window.dataLayer=window.dataLayer||[];"
+        + "".join(f"dataLayer.push({{event:'view_{i}'}});" for i in range(rng.randint(10, 40)))
+        + "</script>",
+        "</head><body>",
+    ]
+
+
+def store_blocks(name: str, rng: random.Random):
+    while True:
+        product = f"{name} {rng.choice(PRODUCT_NOUNS)}"
+        price = rng.choice([9, 19, 27, 47, 97, 197, 497, 997]) + rng.choice([0, 0.99])
+        yield (f'<div class="product"><h3>{product}</h3><p>{paragraph(rng)}</p>'
+               f'<span class="price">${price:.2f}</span><button>Buy now</button></div>')
+
+
+def article_blocks(name: str, rng: random.Random):
+    while True:
+        yield f"<h2>{filler(rng, rng.randint(4, 9))[:-1]}</h2>"
+        for _ in range(rng.randint(2, 4)):
+            yield f"<p>{paragraph(rng)}</p>"
+
+
+def profile_blocks(name: str, rng: random.Random):
+    while True:
+        yield (f'<a class="link" href="https://example.com/{rng.randint(1, 9999)}">'
+               f'{filler(rng, rng.randint(3, 6))[:-1]}</a><p>{paragraph(rng)}</p>')
+
+
+BLOCKS = {"store": store_blocks, "article": article_blocks, "profile": profile_blocks}
+
+
+def render_page(kind: str, slug: str, size: int) -> bytes:
+    """A deterministic HTML page for `slug`, grown with content blocks to about `size` bytes"""
+    rng = page_rng(kind, slug)
+    name = display_name(slug)
+    topic = rng.choice(TOPICS)
+    if kind == "store":
+        title, description = f"{name} Shop", f"Shop {topic} products from {name}. Courses, kits and coaching."
+        intro = f"<header><h1>{name} Shop</h1><p>{paragraph(rng)}</p></header><main>"
+    elif kind == "article":
+        title, description = f"How {name} grew with {topic}", f"{name} shares what worked for {topic}."
+        intro = f"<article><h1>{title}</h1><p>{paragraph(rng)}</p>"
+    else:
+        title, description = f"{name} | Links", f"{name} helps people get started with {topic}."
+        intro = f"<header><h1>{name}</h1><p>{paragraph(rng)}</p></header><main>"
+
+    parts = page_shell(title, description, rng) + [intro]
+    length = sum(len(p) for p in parts)
+    for block in BLOCKS[kind](name, rng):
+        if length >= size:
+            break
+        parts.append(block)
+        length += len(block)
+    parts.append("</main></body></html>" if kind != "article" else "</article></body></html>")
+    return "\n".join(parts).encode()
+
+
+def handle_of(url: str, marker: str) -> str:
+    """'creator_1' from https://www.instagram.com/creator_1/ (marker 'instagram.com/')"""
+    tail = url.partition(marker)[2]
+    return tail.lstrip("@").split("/")[0].split("?")[0] or "creator"
+
+
+class FixtureSite:
+    """aiohttp handlers for the fixture pages, oEmbed and data API"""
+
+    def __init__(self, latency: LatencyModel, page_bytes: str = "lognormal:60000,0.6", mbps: float = 0.0,
+                 faults: str = "", hang_seconds: float = 30.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.page_bytes = LatencyModel(page_bytes)
+        self.mbps = mbps
+        self.faults = FaultInjector(faults, seed, hang_seconds, scope="all", kinds=SITE_FAULT_KINDS)
+        self.by_kind: Dict[str, int] = {}
+        self.bytes_out = 0
+
+    def page_size(self, kind: str, slug: str) -> int:
+        # Seeded by the URL, so a page keeps its size across runs
+        model = LatencyModel(self.page_bytes.spec, zlib.crc32(f"size:{kind}:{slug}".encode()))
+        return max(512, int(model.sample_ms()))
+
+    async def fail(self, request: "web.Request", fault: str, body: bytes = b"") -> "web.StreamResponse":
+        from aiohttp import web
+        if fault == "404":
+            return web.Response(status=404, text="<html><body><h1>Not Found</h1></body></html>",
+                                content_type="text/html")
+        if fault == "403":
+            return web.Response(status=403, text=BOT_WALL, content_type="text/html")
+        if fault == "5xx":
+            return web.Response(status=self.faults.rng.choice([500, 502, 503]), text="Server Error")
+        if fault == "timeout":
+            await asyncio.sleep(self.faults.hang_seconds)
+            return web.Response(status=504, text="Gateway Timeout")
+        # reset: promise the whole body, send half, then drop the connection
+        response = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8",
+                                               "Content-Length": str(len(body))})
+        await response.prepare(request)
+        await response.write(body[:len(body) // 2])
+        request.transport.close()
+        return response
+
+    async def send(self, request: "web.Request", body: bytes, content_type: str) -> "web.StreamResponse":
+        from aiohttp import web
+        response = web.StreamResponse(headers={"Content-Type": content_type, "Content-Length": str(len(body))})
+        await response.prepare(request)
+        for offset in range(0, len(body), CHUNK_BYTES):
+            chunk = body[offset:offset + CHUNK_BYTES]
+            await asyncio.sleep(transfer_seconds(len(chunk), self.mbps))
+            await response.write(chunk)
+        await response.write_eof()
+        self.bytes_out += len(body)
+        return response
+
+    def count(self, kind: str):
+        self.by_kind[kind] = self.by_kind.get(kind, 0) + 1
+
+    async def page(self, request: "web.Request") -> "web.StreamResponse":
+        from aiohttp import web
+        kind, slug = request.match_info["kind"], request.match_info["slug"]
+        if kind not in PAGE_KINDS:
+            return web.Response(status=404, text="Unknown fixture page kind")
+        self.count(kind)
+        await asyncio.sleep(self.latency.sample())
+        body = render_page(kind, slug, self.page_size(kind, slug))
+        fault = self.faults.pick("primary")
+        if fault:
+            return await self.fail(request, fault, body)
+        return await self.send(request, body, "text/html; charset=utf-8")
+
+    async def oembed(self, request: "web.Request") -> "web.StreamResponse":
+        platform = request.match_info["platform"]
+        self.count(f"{platform}_oembed")
+        await asyncio.sleep(self.latency.sample())
+        fault = self.faults.pick("primary")
+        url = request.query.get("url", "")
+        handle = handle_of(url, "instagram.com/" if platform == "instagram" else "tiktok.com/")
+        rng = page_rng(platform, handle)
+        body = json.dumps({
+            "version": "1.0",
+            "type": "video" if platform == "tiktok" else "rich",
+            "title": f"{filler(rng, rng.randint(8, 20))} #{rng.choice(TOPICS).replace(' ', '')}",
+            "author_name": handle,
+            "author_url": f"https://www.{platform}.com/{'@' if platform == 'tiktok' else ''}{handle}",
+            "provider_name": platform.capitalize(),
+            "provider_url": f"https://www.{platform}.com",
+            "thumbnail_url": f"https://cdn.example.com/{platform}/{handle}.jpg",
+            "width": 540,
+        }).encode()
+        if fault:
+            return await self.fail(request, fault, body)
+        return await self.send(request, body, "application/json")
+
+    async def data_api(self, request: "web.Request") -> "web.StreamResponse":
+        """callDataApi: the Youtube endpoints fetchYouTubeMetadata uses, wrapped in {"jsonData"}"""
+        from aiohttp import web
+        payload = await request.json()
+        api_id = payload.get("apiId", "")
+        query = payload.get("query") or {}
+        self.count(api_id)
+        await asyncio.sleep(self.latency.sample())
+        if api_id == "Youtube/search":
+            key = str(query.get("q", ""))
+            rng = page_rng("youtube", key)
+            data = {"contents": [{"type": "video", "video": {
+                "videoId": key,
+                "title": filler(rng, rng.randint(6, 12))[:-1],
+                "channelTitle": display_name(f"channel-{rng.randint(1, 500)}"),
+                "viewCountText": f"{rng.randint(1, 900)}K views",
+                "descriptionSnippet": paragraph(rng),
+            }}]}
+        elif api_id == "Youtube/get_channel_details":
+            key = str(query.get("id", ""))
+            rng = page_rng("youtube", key)
+            data = {"title": display_name(key.split("@")[-1].split("/")[-1]), "description": paragraph(rng),
+                    "stats": {"subscribersText": f"{rng.randint(1, 900)}K subscribers"}}
+        else:
+            return web.json_response({"code": "not_found", "message": f"Unknown apiId {api_id}"}, status=404)
+        fault = self.faults.pick("primary")
+        body = json.dumps({"jsonData": json.dumps(data)}).encode()
+        if fault:
+            return await self.fail(request, fault, body)
+        return await self.send(request, body, "application/json")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": dict(self.by_kind),
+            "bytes_out": self.bytes_out,
+            "page_bytes": self.page_bytes.spec,
+            "mbps": self.mbps,
+            "latency_model": self.latency.spec,
+            "faults": self.faults.stats(),
+        }
@@ -0,0 +1,305 @@
+"""
+Template databases for seeded datasets
+Seeding a million rows takes longer than the benchmark that reads them, so
+each dataset is built once into its own Postgres database and marked as a
+template; runs then clone it with CREATE DATABASE ... TEMPLATE, which copies
+files instead of replaying inserts:
+
+    python -m perf.snapshots build tenants-2k
+    python -m perf.snapshots restore tenants-2k --as salescoach_bench --replace
+    python -m perf.snapshots list
+
+A build creates the schema (setup_database.sql, or the pg-core
+drizzle/schema.ts through drizzle-kit push with --schema drizzle; only the
+drizzle/*.sql migrations and their journal are MySQL leftovers, so they are
+not replayed), inserts the dataset's users the way
+auth.supabaseLogin would for perf.supabase stand-in logins, and runs the
+perf.seed generators. Its manifest (dataset, version, schema and generator
+hashes, seed, row counts) goes into a perf_manifest table inside the
+template, so every clone carries it, and into the template's COMMENT. A
+template is rebuilt when the manifest version no longer matches the code.
+
+Start the server with the printed DATABASE_URL and pass --dataset NAME to
+backend_test.py so the report records which data it ran on.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import time
+import urllib.parse
+from typing import Any, Dict, List, Optional
+
+from perf import seed as seeding
+from perf.supabase import user_uuid
+from perf.tenants import tenant_plan
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMAS = {
+    "sql": os.path.join(ROOT, "setup_database.sql"),
+    "drizzle": os.path.join(ROOT, "drizzle", "schema.ts"),
+}
+TEMPLATE_PREFIX = "perf_tpl_"
+# Seed every dataset is generated with, so a version always means the same rows
+DATASET_SEED = 0
+SEEDED_TABLES = ["users", "knowledge_base_items", "knowledge_chunks", "workspaces", "prospects", "chat_messages"]
+
+# Bump a dataset's version when its recipe changes; schema and generator
+# changes are picked up through their hashes
+DATASETS: Dict[str, Dict[str, Any]] = {
+    "empty": {"version": 1, "description": "schema only"},
+    "chunks-1m": {"version": 1, "description": "chunkuser_0 with 1M knowledge chunks",
+                  "chunks": {"prefix": "chunkuser", "rows": 1000000}},
+    "analytics-1m": {"version": 1, "description": "analyticsuser_0 with workspaces of 100 to 1M prospects",
+                     "prospects": {"prefix": "analyticsuser", "sizes": [100, 10000, 100000, 1000000]}},
+    "tenants-2k": {"version": 1, "description": "2000 tenants, 3 whales with 500k chunks each",
+                   "tenants": {"prefix": "tenant", "count": 2000, "whales": 3, "whale_chunks": 500000}},
+}
+
+
+def with_database(url: str, name: str) -> str:
+    """`url` pointing at database `name` instead"""
+    parts = urllib.parse.urlsplit(url)
+    return urllib.parse.urlunsplit(parts._replace(path="/" + name))
+
+
+def database_of(url: str) -> str:
+    return urllib.parse.urlsplit(url).path.lstrip("/")
+
+
+def template_name(dataset: str) -> str:
+    return TEMPLATE_PREFIX + dataset.replace("-", "_")
+
+
+def file_hash(*paths: str) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def dataset_version(dataset: str, schema: str = "sql") -> str:
+    """'tenants-2k@v1-<schema hash>-<generator hash>'"""
+    generators = [os.path.join(ROOT, "perf", name) for name in ("seed.py", "tenants.py", "snapshots.py")]
+    return f"{dataset}@v{DATASETS[dataset]['version']}-{file_hash(SCHEMAS[schema])}-{file_hash(*generators)}"
+
+
+def is_current(manifest: Dict[str, Any]) -> bool:
+    """Whether a template's (or clone's) manifest still matches the code that builds its dataset"""
+    dataset = manifest.get("dataset")
+    return (dataset in DATASETS
+            and manifest.get("version") == dataset_version(dataset, manifest.get("schema", "sql")))
+
+
+def admin_connect(url: str):
+    """Autocommit connection to the maintenance database next to `url`'s"""
+    return seeding.connect(with_database(url, "postgres"))
+
+
+def templates(url: str) -> Dict[str, Dict[str, Any]]:
+    """Manifests of the perf templates on the server, by database name"""
+    with admin_connect(url) as conn, conn.cursor() as cur:
+        cur.execute("SELECT datname, shobj_description(oid, 'pg_database') FROM pg_database "
+                    "WHERE datname LIKE %s", (TEMPLATE_PREFIX + "%",))
+        found = {}
+        for name, comment in cur.fetchall():
+            try:
+                found[name] = json.loads(comment or "{}")
+            except ValueError:
+                found[name] = {}
+        return found
+
+
+def drop_database(cur, name: str):
+    cur.execute(f'ALTER DATABASE "{name}" WITH IS_TEMPLATE false ALLOW_CONNECTIONS true')
+    cur.execute(f'DROP DATABASE "{name}" WITH (FORCE)')
+
+
+def create_schema(url: str, schema: str):
+    if schema == "drizzle":
+        subprocess.run(["npx", "drizzle-kit", "push", "--force"], cwd=ROOT, check=True,
+                       env=dict(os.environ, DATABASE_URL=url))
+        return
+    with open(SCHEMAS["sql"]) as f, seeding.connect(url) as conn:
+        conn.execute(f.read())
+
+
+def insert_users(conn, prefix: str, count: int) -> List[int]:
+    """users rows for perf.supabase bulk users PREFIX_0..count-1, as auth.supabaseLogin would create them"""
+    ids = []
+    with conn.cursor() as cur:
+        for index in range(count):
+            email = f"{prefix}_{index}@example.com"
+            cur.execute('INSERT INTO users ("openId", name, email, "loginMethod") VALUES (%s, %s, %s, %s) '
+                        'ON CONFLICT ("openId") DO UPDATE SET email = EXCLUDED.email RETURNING id',
+                        (f"supabase:{user_uuid(email)}", f"{prefix} {index}", email, "supabase"))
+            ids.append(cur.fetchone()[0])
+    return ids
+
+
+def populate(url: str, recipe: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    """Run the recipe's generators against the database at `url`"""
+    with seeding.connect(url) as conn:
+        if "chunks" in recipe:
+            step = recipe["chunks"]
+            user_id = insert_users(conn, step["prefix"], 1)[0]
+            seeding.seed_chunks(conn, user_id, step["rows"], seed=seed)
+        if "prospects" in recipe:
+            step = recipe["prospects"]
+            user_id = insert_users(conn, step["prefix"], 1)[0]
+            for size in step["sizes"]:
+                seeding.seed_prospects(conn, user_id, size, seed)
+        if "tenants" in recipe:
+            step = recipe["tenants"]
+            tenants = tenant_plan(step["count"], step["whales"], step["whale_chunks"], seed=seed)
+            for tenant, user_id in zip(tenants, insert_users(conn, step["prefix"], step["count"])):
+                tenant["user_id"] = user_id
+            seeding.seed_tenants(conn, tenants, seed)
+        rows = {}
+        with conn.cursor() as cur:
+            for table in SEEDED_TABLES:
+                cur.execute(f"SELECT count(*) FROM {table}")
+                rows[table] = cur.fetchone()[0]
+            cur.execute("VACUUM ANALYZE")
+    return rows
+
+
+def build(url: str, dataset: str, schema: str = "sql", rebuild: bool = False) -> Dict[str, Any]:
+    """Create (or keep, when its version is current) the dataset's template; returns its manifest"""
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}', expected one of {', '.join(DATASETS)}")
+    name = template_name(dataset)
+    version = dataset_version(dataset, schema)
+    existing = templates(url).get(name)
+    if existing is not None and existing.get("version") == version and not rebuild:
+        return existing
+
+    started = time.perf_counter()
+    with admin_connect(url) as conn, conn.cursor() as cur:
+        if existing is not None:
+            drop_database(cur, name)
+        cur.execute(f'CREATE DATABASE "{name}"')
+    target = with_database(url, name)
+    create_schema(target, schema)
+    rows = populate(target, DATASETS[dataset], DATASET_SEED)
+    manifest = {
+        "dataset": dataset,
+        "version": version,
+        "description": DATASETS[dataset]["description"],
+        "schema": schema,
+        "seed": DATASET_SEED,
+        "rows": rows,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "build_seconds": round(time.perf_counter() - started, 1),
+    }
+    with seeding.connect(target) as conn:
+        conn.execute("CREATE TABLE perf_manifest (manifest JSON NOT NULL)")
+        conn.execute("INSERT INTO perf_manifest VALUES (%s)", (json.dumps(manifest),))
+    with admin_connect(url) as conn, conn.cursor() as cur:
+        cur.execute(f'COMMENT ON DATABASE "{name}" IS %s', (json.dumps(manifest),))
+        # No connections: CREATE DATABASE ... TEMPLATE fails while anyone is connected
+        cur.execute(f'ALTER DATABASE "{name}" WITH IS_TEMPLATE true ALLOW_CONNECTIONS false')
+    return manifest
+
+
+def restore(url: str, dataset: str, target: Optional[str] = None, replace: bool = False,
+            allow_stale: bool = False) -> Dict[str, Any]:
+    """Clone the dataset's template into `target` (default: the database in `url`)
+
+    `replace` drops `target` first, so it must be named explicitly and may only
+    be a database that was itself cloned from a dataset (has a perf_manifest).
+    A template built by older code is refused unless `allow_stale`.
+    """
+    if replace and not target:
+        raise ValueError("Replacing needs an explicit target database (--as NAME), "
+                         "so the one in --database-url is never dropped by default")
+    name = template_name(dataset)
+    manifest = templates(url).get(name)
+    if manifest is None:
+        raise ValueError(f"No template for '{dataset}' yet; run: python -m perf.snapshots build {dataset}")
+    if not is_current(manifest) and not allow_stale:
+        raise ValueError(f"{name} holds {manifest.get('version')} but the code builds "
+                         f"{dataset_version(dataset, manifest.get('schema', 'sql'))}; run: "
+                         f"python -m perf.snapshots build {dataset} (or pass --allow-stale)")
+    target = target or database_of(url)
+    if target.startswith(TEMPLATE_PREFIX):
+        raise ValueError(f"{target} is a template; pick another name with --as")
+    started = time.perf_counter()
+    with admin_connect(url) as conn, conn.cursor() as cur:
+        if replace:
+            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (target,))
+            if cur.fetchone() is not None and read_manifest(with_database(url, target)) is None:
+                raise ValueError(f"{target} was not cloned from a perf dataset (no perf_manifest table); "
+                                 f"refusing to drop it")
+            cur.execute(f'DROP DATABASE IF EXISTS "{target}" WITH (FORCE)')
+        cur.execute(f'CREATE DATABASE "{target}" TEMPLATE "{name}"')
+    return {"dataset": dataset, "database": target, "database_url": with_database(url, target),
+            "seconds": time.perf_counter() - started, "manifest": manifest, "stale": not is_current(manifest)}
+
+
+def read_manifest(url: str) -> Optional[Dict[str, Any]]:
+    """The manifest of the dataset the database at `url` was cloned from, if any"""
+    with seeding.connect(url) as conn, conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('perf_manifest')")
+        if cur.fetchone()[0] is None:
+            return None
+        cur.execute("SELECT manifest FROM perf_manifest LIMIT 1")
+        row = cur.fetchone()
+        return row[0] if row else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and clone template databases of seeded datasets")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="any database on the server; default: $DATABASE_URL")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_cmd = commands.add_parser("build", help="build a dataset's template (skipped when current)")
+    build_cmd.add_argument("dataset", choices=list(DATASETS))
+    build_cmd.add_argument("--schema", choices=list(SCHEMAS), default="sql",
+                           help="setup_database.sql or drizzle-kit push of drizzle/schema.ts")
+    build_cmd.add_argument("--rebuild", action="store_true", help="rebuild even when the version matches")
+    restore_cmd = commands.add_parser("restore", help="clone a template into a database")
+    restore_cmd.add_argument("dataset", choices=list(DATASETS))
+    restore_cmd.add_argument("--as", dest="target", default=None,
+                             help="database to create (default: the one in --database-url; "
+                                  "required with --replace)")
+    restore_cmd.add_argument("--replace", action="store_true",
+                             help="drop the --as database first; only databases cloned from a dataset")
+    restore_cmd.add_argument("--allow-stale", action="store_true",
+                             help="clone a template even when the code now builds a different version")
+    commands.add_parser("list", help="show built templates and whether they are current")
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    if args.command == "build":
+        manifest = build(args.database_url, args.dataset, args.schema, args.rebuild)
+        rows = ", ".join(f"{table} {count}" for table, count in manifest.get("rows", {}).items() if count)
+        print(f"📦 {template_name(args.dataset)}: {manifest['version']} ({rows}; "
+              f"built in {manifest.get('build_seconds', 0):.0f}s)")
+    elif args.command == "restore":
+        if args.replace and not args.target:
+            parser.error("--replace needs --as NAME; the database in --database-url is never dropped by default")
+        try:
+            restored = restore(args.database_url, args.dataset, args.target, args.replace, args.allow_stale)
+        except ValueError as error:
+            parser.exit(1, f"❌ {error}\n")
+        print(f"📦 {restored['database']} cloned from {restored['manifest']['version']} "
+              f"{'(stale) ' if restored['stale'] else ''}in {restored['seconds'] * 1000:.0f}ms")
+        print(f"DATABASE_URL={restored['database_url']}")
+    else:
+        found = templates(args.database_url)
+        for dataset in DATASETS:
+            manifest = found.get(template_name(dataset))
+            if manifest is None:
+                print(f"  {dataset:<14} not built")
+            else:
+                print(f"  {dataset:<14} {manifest.get('version')} {'' if is_current(manifest) else '(stale) '}"
+                      f"built {manifest.get('built_at')}")
+
+
+if __name__ == "__main__":
+    main()
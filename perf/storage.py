@@ -0,0 +1,123 @@
+"""
+Object storage stand-in for storagePut/storageGet (server/storage.ts)
+Serves the forge storage proxy endpoints with configurable latency and
+per-connection bandwidth, so slow uploads back up into the server the way a
+congested bucket would:
+    POST /v1/storage/upload?path=KEY      multipart "file" field, returns {"url"}
+    GET  /v1/storage/downloadUrl?path=KEY returns {"url"}
+    GET  /storage/KEY                     the object (zero-filled, original size)
+
+Only object sizes and content types are kept, not the bytes: nothing in the
+server reads stored files back, the URLs are only handed to the LLM.
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Dict, Any
+
+from perf.delays import LatencyModel
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+CHUNK_BYTES = 64 * 1024
+
+
+def transfer_seconds(size: int, mbps: float) -> float:
+    """Time to move `size` bytes at `mbps` megabits per second (0 = unlimited)"""
+    return size * 8 / (mbps * 1000 * 1000) if mbps > 0 else 0.0
+
+
+class ObjectStore:
+    """aiohttp handlers for the storage proxy
+
+    Upload time = bandwidth-limited read of the body + latency distribution.
+    """
+
+    def __init__(self, latency: LatencyModel, upload_mbps: float = 0.0, download_mbps: float = 0.0):
+        self.latency = latency
+        self.upload_mbps = upload_mbps
+        self.download_mbps = download_mbps
+        self.objects: Dict[str, Dict[str, Any]] = {}
+        self.uploads = 0
+        self.downloads = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.upload_seconds = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def object_url(self, request: "web.Request", key: str) -> str:
+        return f"{request.scheme}://{request.host}/storage/{key}"
+
+    async def upload(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        key = request.query.get("path", "").lstrip("/")
+        if not key:
+            return web.json_response({"error": "path is required"}, status=400)
+        started = time.perf_counter()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            reader = await request.multipart()
+            size = 0
+            content_type = "application/octet-stream"
+            async for part in reader:
+                if part.name != "file":
+                    continue
+                content_type = part.headers.get("Content-Type", content_type)
+                while True:
+                    chunk = await part.read_chunk(CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    # Reading slowly applies TCP backpressure to the uploader
+                    await asyncio.sleep(transfer_seconds(len(chunk), self.upload_mbps))
+            await asyncio.sleep(self.latency.sample())
+        finally:
+            self.in_flight -= 1
+
+        self.objects[key] = {"size": size, "content_type": content_type}
+        self.uploads += 1
+        self.bytes_in += size
+        self.upload_seconds += time.perf_counter() - started
+        return web.json_response({"url": self.object_url(request, key)})
+
+    async def download_url(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        key = request.query.get("path", "").lstrip("/")
+        await asyncio.sleep(self.latency.sample())
+        return web.json_response({"url": self.object_url(request, key)})
+
+    async def get_object(self, request: "web.Request") -> "web.StreamResponse":
+        from aiohttp import web
+        stored = self.objects.get(request.match_info["key"])
+        if stored is None:
+            return web.Response(status=404, text="NoSuchKey")
+        response = web.StreamResponse(headers={"Content-Type": stored["content_type"],
+                                               "Content-Length": str(stored["size"])})
+        await response.prepare(request)
+        remaining = stored["size"]
+        while remaining > 0:
+            chunk = min(CHUNK_BYTES, remaining)
+            await asyncio.sleep(transfer_seconds(chunk, self.download_mbps))
+            await response.write(bytes(chunk))
+            remaining -= chunk
+        await response.write_eof()
+        self.downloads += 1
+        self.bytes_out += stored["size"]
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "uploads": self.uploads,
+            "objects": len(self.objects),
+            "bytes_in": self.bytes_in,
+            "downloads": self.downloads,
+            "bytes_out": self.bytes_out,
+            "max_concurrent_uploads": self.max_in_flight,
+            "upload_mbps": self.upload_mbps,
+            "download_mbps": self.download_mbps,
+            "latency_model": self.latency.spec,
+            "mean_upload_ms": self.upload_seconds / self.uploads * 1000 if self.uploads else 0.0,
+        }
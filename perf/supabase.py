@@ -0,0 +1,238 @@
+"""
+Supabase auth stand-in (SUPABASE_URL)
+Serves the GoTrue endpoints server/_core/supabase-auth.ts and auth.verifyCode
+reach through @supabase/supabase-js, and issues real HS256 access tokens so
+auth.supabaseLogin succeeds and load tests exercise protected procedures:
+    GET  /auth/v1/user                    supabase.auth.getUser(token)
+    POST /auth/v1/admin/users             supabase.auth.admin.createUser(...)
+    POST /auth/v1/token?grant_type=password
+    POST /__auth/bulk                     create N users and return their tokens
+
+preauthenticate() turns bulk tokens into app_session_id cookies by calling
+auth.supabaseLogin once per user, so every virtual user starts logged in.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+from perf.delays import LatencyModel
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+# Default JWT secret of `supabase start`; tokens never leave the test machine
+JWT_SECRET = "super-secret-jwt-token-with-at-least-32-characters-long"
+TOKEN_SECONDS = 24 * 3600
+SESSION_COOKIE = "app_session_id"
+# Largest batch a single /__auth/bulk call creates
+MAX_BULK_USERS = 100000
+# User ids derive from the email, so a user keeps its id (and the server's
+# supabase:<id> openId) across stand-in restarts; perf.snapshots relies on it
+USER_NAMESPACE = uuid.UUID("6f1c7a52-3d0e-4b8a-9a51-2f4c8e6d0b17")
+
+
+def user_uuid(email: str) -> str:
+    return str(uuid.uuid5(USER_NAMESPACE, email.lower()))
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def b64url_decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def sign_jwt(payload: Dict[str, Any], secret: str = JWT_SECRET) -> str:
+    header = b64url(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+    body = b64url(json.dumps(payload, separators=(",", ":")).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{body}".encode(), hashlib.sha256).digest()
+    return f"{header}.{body}.{b64url(signature)}"
+
+
+def verify_jwt(token: str, secret: str = JWT_SECRET) -> Optional[Dict[str, Any]]:
+    """Payload of a valid, unexpired HS256 token, else None"""
+    try:
+        header, body, signature = token.split(".")
+        expected = hmac.new(secret.encode(), f"{header}.{body}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, b64url_decode(signature)):
+            return None
+        payload = json.loads(b64url_decode(body))
+    except ValueError:
+        return None
+    if payload.get("exp", 0) < time.time():
+        return None
+    return payload
+
+
+class SupabaseAuth:
+    """In-memory GoTrue users with aiohttp handlers
+
+    getUser delay comes from the latency distribution, so token verification
+    cost can be dialled in like any other upstream.
+    """
+
+    def __init__(self, latency: LatencyModel, secret: str = JWT_SECRET):
+        self.latency = latency
+        self.secret = secret
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.by_email: Dict[str, str] = {}
+        self.passwords: Dict[str, str] = {}
+        self.verified = 0
+        self.rejected = 0
+        self.created = 0
+
+    def create_user(self, email: str, password: str = "", user_metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        user = {
+            "id": user_uuid(email),
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": email,
+            "email_confirmed_at": now,
+            "phone": "",
+            "app_metadata": {"provider": "email", "providers": ["email"]},
+            "user_metadata": user_metadata or {},
+            "identities": [],
+            "created_at": now,
+            "updated_at": now,
+        }
+        self.users[user["id"]] = user
+        self.by_email[email.lower()] = user["id"]
+        self.passwords[user["id"]] = password
+        self.created += 1
+        return user
+
+    def access_token(self, user: Dict[str, Any]) -> str:
+        now = int(time.time())
+        return sign_jwt({
+            "aud": "authenticated",
+            "exp": now + TOKEN_SECONDS,
+            "iat": now,
+            "sub": user["id"],
+            "email": user["email"],
+            "role": "authenticated",
+            "user_metadata": user["user_metadata"],
+        }, self.secret)
+
+    def session(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "access_token": self.access_token(user),
+            "token_type": "bearer",
+            "expires_in": TOKEN_SECONDS,
+            "expires_at": int(time.time()) + TOKEN_SECONDS,
+            "refresh_token": uuid.uuid4().hex,
+            "user": user,
+        }
+
+    @staticmethod
+    def error(status: int, code: str, message: str) -> "web.Response":
+        from aiohttp import web
+        return web.json_response({"code": status, "error_code": code, "msg": message}, status=status)
+
+    async def get_user(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        await asyncio.sleep(self.latency.sample())
+        token = request.headers.get("Authorization", "").partition("Bearer ")[2]
+        payload = verify_jwt(token, self.secret)
+        user = self.users.get(payload["sub"]) if payload else None
+        if user is None:
+            self.rejected += 1
+            return self.error(401, "bad_jwt", "invalid JWT: unable to parse or verify signature")
+        self.verified += 1
+        return web.json_response(user)
+
+    async def admin_create_user(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        body = await request.json()
+        email = body.get("email", "")
+        if not email:
+            return self.error(400, "validation_failed", "Unable to validate email address: invalid format")
+        if email.lower() in self.by_email:
+            return self.error(422, "email_exists", "A user with this email address has already been registered")
+        return web.json_response(self.create_user(email, body.get("password", ""), body.get("user_metadata")))
+
+    async def token(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        body = await request.json()
+        user_id = self.by_email.get(body.get("email", "").lower())
+        if user_id is None or self.passwords[user_id] != body.get("password"):
+            return self.error(400, "invalid_credentials", "Invalid login credentials")
+        return web.json_response(self.session(self.users[user_id]))
+
+    async def bulk(self, request: "web.Request") -> "web.Response":
+        """POST /__auth/bulk {"count": N, "prefix": "loaduser"} - users plus access tokens"""
+        from aiohttp import web
+        body = await request.json()
+        count = min(int(body.get("count", 1)), MAX_BULK_USERS)
+        prefix = body.get("prefix", "loaduser")
+        created = []
+        for i in range(count):
+            email = f"{prefix}_{i}@example.com"
+            user_id = self.by_email.get(email)
+            user = self.users[user_id] if user_id else self.create_user(email, "", {"name": f"{prefix} {i}"})
+            created.append({"id": user["id"], "email": email, "access_token": self.access_token(user)})
+        return web.json_response({"users": created})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self.users),
+            "created": self.created,
+            "tokens_verified": self.verified,
+            "tokens_rejected": self.rejected,
+            "latency_model": self.latency.spec,
+        }
+
+
+def bulk_tokens(auth_url: str, count: int, prefix: str = "loaduser") -> List[Dict[str, Any]]:
+    """Create (or reuse) `count` stand-in users and return {id, email, access_token} for each"""
+    import urllib.request
+    request = urllib.request.Request(f"{auth_url}/__auth/bulk",
+                                     data=json.dumps({"count": count, "prefix": prefix}).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return json.loads(response.read())["users"]
+
+
+async def log_in_all(base_url: str, tokens: List[Dict[str, Any]], results=None,
+                     concurrency: int = 50) -> List[Optional[Dict[str, Any]]]:
+    """Log every token in through auth.supabaseLogin
+
+    Returns one {"cookies", "user_id"} per token (users.id from the login
+    reply), or None where the login failed. Logins are timed into `results`
+    (a LoadResults) under auth.supabaseLogin.
+    """
+    from perf.load import VirtualUser
+    from perf.results import LoadResults
+    from perf.scenarios import trpc_data
+
+    results = results if results is not None else LoadResults()
+    semaphore = asyncio.Semaphore(concurrency)
+    logins: List[Optional[Dict[str, Any]]] = [None] * len(tokens)
+
+    async def login(index: int, token: Dict[str, Any]):
+        async with semaphore:
+            async with VirtualUser(index, base_url, results) as vu:
+                body = await vu.call("auth.supabaseLogin", {"token": token["access_token"]})
+                cookie = next((c for c in vu.session.cookie_jar if c.key == SESSION_COOKIE), None)
+                if "error" not in body and cookie is not None:
+                    user = (trpc_data(body) or {}).get("user") or {}
+                    logins[index] = {"cookies": {SESSION_COOKIE: cookie.value}, "user_id": user.get("id")}
+
+    results.started_at = time.perf_counter()
+    await asyncio.gather(*(login(i, token) for i, token in enumerate(tokens)))
+    results.finished_at = time.perf_counter()
+    return logins
+
+
+async def preauthenticate(base_url: str, tokens: List[Dict[str, Any]], results=None,
+                          concurrency: int = 50) -> List[Dict[str, str]]:
+    """Session cookies of every token that logged in (see log_in_all)"""
+    logins = await log_in_all(base_url, tokens, results, concurrency)
+    return [login["cookies"] for login in logins if login]
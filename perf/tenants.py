@@ -0,0 +1,206 @@
+"""
+Noisy-neighbour fairness across tenants
+Every db.ts query is scoped by userId, but a tenant with a huge brain still
+shares the server's event loop, connection pool and Postgres with everyone
+else. This sends small tenants' chat.sendInbound at a steady open-loop rate,
+first on its own (baseline) and then while the whales run a heavy procedure
+in closed loops (contended), and compares the two per tenant:
+    getLearningInsights   analytics.getLearningInsights (getAllKnowledgeChunks)
+    processItem           knowledgeBase.addUrl + processItem on a fixture article
+                          (needs the LLM and site stand-ins)
+
+tenant_plan() draws the sizes: a few whales with whale_chunks chunks and
+many small users from a long-tailed distribution, seeded with
+perf.seed.seed_tenants. Only `observe` small tenants, spread over the size
+range, are measured, so each gets enough calls for its own percentiles.
+"""
+
+import asyncio
+import contextlib
+import time
+from typing import Dict, Any, List, Optional
+
+from perf.arrival import poisson_schedule
+from perf.delays import LatencyModel
+from perf.load import VirtualUser
+from perf.results import LoadResults
+from perf.retries import percentile
+from perf.scenarios import trpc_data
+
+PHASES = ("baseline", "contended")
+WHALE_ACTIONS = ("getLearningInsights", "processItem")
+# A small tenant counts as degraded when its contended p50 is this many times its baseline
+SLOWDOWN_THRESHOLD = 2.0
+
+
+def tenant_plan(count: int, whales: int = 3, whale_chunks: int = 500000, whale_prospects: int = 50000,
+                chunks: str = "lognormal:300,1.2", prospects: str = "lognormal:40,1.0",
+                seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Sizes for `count` tenants, whales first; small tenants stay below a tenth of a whale"""
+    chunk_sizes = LatencyModel(chunks, seed)
+    prospect_sizes = LatencyModel(prospects, None if seed is None else seed + 1)
+    plan = []
+    for index in range(count):
+        if index < whales:
+            plan.append({"index": index, "role": "whale", "chunks": whale_chunks, "prospects": whale_prospects})
+        else:
+            plan.append({"index": index, "role": "small",
+                         "chunks": min(whale_chunks // 10, int(chunk_sizes.sample_ms())),
+                         "prospects": min(whale_prospects // 10, max(1, int(prospect_sizes.sample_ms())))})
+    return plan
+
+
+def observed_tenants(tenants: List[Dict[str, Any]], observe: int) -> List[Dict[str, Any]]:
+    """Up to `observe` small tenants with a prospect, evenly spread from smallest to largest brain"""
+    small = sorted((t for t in tenants if t["role"] == "small" and t.get("prospect_id")),
+                   key=lambda t: t["chunks"])
+    if len(small) <= observe:
+        return small
+    step = len(small) / observe
+    return [small[int(i * step)] for i in range(observe)]
+
+
+async def run_fairness(base_url: str, tenants: List[Dict[str, Any]], rate: float = 10.0,
+                       duration: float = 30.0, whale_action: str = "getLearningInsights",
+                       whale_concurrency: int = 1, observe: int = 50, site_url: Optional[str] = None,
+                       results: LoadResults = None, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Run the baseline and contended phases and return fairness_report()
+
+    Tenants need "cookies" (perf.supabase.log_in_all) and, for small ones,
+    the "prospect_id" perf.seed.seed_tenants sets.
+    """
+    results = results if results is not None else LoadResults()
+    senders = observed_tenants(tenants, observe)
+    whales = [t for t in tenants if t["role"] == "whale"]
+    if not senders:
+        raise ValueError("No small tenant has a prospect to send chat.sendInbound to")
+    if whale_action == "processItem" and not site_url:
+        raise ValueError("processItem whales need a site URL for their articles")
+
+    samples: Dict[str, Dict[int, List[float]]] = {phase: {} for phase in PHASES}
+    failures = {phase: 0 for phase in PHASES}
+    whale_latencies: List[float] = []
+    whale_failures = 0
+    vus: Dict[int, VirtualUser] = {}
+
+    async with contextlib.AsyncExitStack() as stack:
+        async def vu_for(tenant: Dict[str, Any]) -> VirtualUser:
+            if tenant["index"] not in vus:
+                vus[tenant["index"]] = await stack.enter_async_context(
+                    VirtualUser(tenant["index"], base_url, results, cookies=tenant["cookies"]))
+            return vus[tenant["index"]]
+
+        async def send(tenant: Dict[str, Any], phase: str, intended: float, message: int):
+            vu = await vu_for(tenant)
+            body = await vu.call("chat.sendInbound", {
+                "prospectId": tenant["prospect_id"],
+                "content": f"Message {message}: that sounds good, what would my first week look like?"
+            }, "POST", intended_start=intended)
+            if "error" in body:
+                failures[phase] += 1
+            else:
+                samples[phase].setdefault(tenant["index"], []).append((time.perf_counter() - intended) * 1000)
+
+        async def whale_loop(whale: Dict[str, Any], worker: int, deadline: float):
+            nonlocal whale_failures
+            vu = await vu_for(whale)
+            iteration = 0
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                if whale_action == "getLearningInsights":
+                    body = await vu.call("analytics.getLearningInsights", None, "GET")
+                else:
+                    body = await vu.call("knowledgeBase.addUrl", {
+                        "title": f"Whale article {iteration}",
+                        "url": f"{site_url}/article/whale-{whale['index']}-{worker}-{iteration}"})
+                    item = trpc_data(body)
+                    if item and "error" not in body:
+                        body = await vu.call("knowledgeBase.processItem", {"id": item["id"]})
+                if "error" in body:
+                    whale_failures += 1
+                else:
+                    whale_latencies.append((time.perf_counter() - started) * 1000)
+                iteration += 1
+
+        results.started_at = time.perf_counter()
+        for phase_index, phase in enumerate(PHASES):
+            started = time.perf_counter()
+            deadline = started + duration
+            background = [asyncio.ensure_future(whale_loop(whale, worker, deadline))
+                          for whale in (whales if phase == "contended" else [])
+                          for worker in range(whale_concurrency)]
+            in_flight = []
+            schedule = poisson_schedule(rate, duration, None if seed is None else seed + phase_index)
+            for message, offset in enumerate(schedule):
+                delay = started + offset - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                in_flight.append(asyncio.ensure_future(
+                    send(senders[message % len(senders)], phase, started + offset, message)))
+            await asyncio.gather(*in_flight, *background)
+        results.finished_at = time.perf_counter()
+
+    return fairness_report(senders, samples, failures, whale_action, whale_latencies, whale_failures)
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, Any]:
+    return {"calls": len(latencies), "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95), "p99_ms": percentile(latencies, 99)}
+
+
+def fairness_report(senders: List[Dict[str, Any]], samples: Dict[str, Dict[int, List[float]]],
+                    failures: Dict[str, int], whale_action: str, whale_latencies: List[float],
+                    whale_failures: int) -> Dict[str, Any]:
+    """Pooled and per-tenant small-tenant latency per phase, plus the whales' own calls"""
+    phases = {}
+    for phase in PHASES:
+        pooled = [ms for latencies in samples[phase].values() for ms in latencies]
+        phases[phase] = dict(latency_stats(pooled), failures=failures[phase])
+    baseline, contended = phases["baseline"], phases["contended"]
+    degradation = {key: contended[f"{key}_ms"] / baseline[f"{key}_ms"] if baseline[f"{key}_ms"] else 0.0
+                   for key in ("p50", "p95", "p99")}
+
+    tenants = []
+    for tenant in senders:
+        before = samples["baseline"].get(tenant["index"], [])
+        during = samples["contended"].get(tenant["index"], [])
+        row = {"user_id": tenant.get("user_id"), "chunks": tenant["chunks"], "prospects": tenant["prospects"],
+               "baseline_p50_ms": percentile(before, 50), "contended_p50_ms": percentile(during, 50),
+               "baseline_p95_ms": percentile(before, 95), "contended_p95_ms": percentile(during, 95),
+               "calls": len(before) + len(during)}
+        row["slowdown"] = row["contended_p50_ms"] / row["baseline_p50_ms"] if before and during else None
+        tenants.append(row)
+    compared = [row for row in tenants if row["slowdown"] is not None]
+    degraded = sum(1 for row in compared if row["slowdown"] >= SLOWDOWN_THRESHOLD)
+
+    return {
+        "phases": phases,
+        "degradation": degradation,
+        "tenants": sorted(tenants, key=lambda row: row["slowdown"] or 0.0, reverse=True),
+        "degraded_tenants": degraded,
+        "degraded_share": degraded / len(compared) if compared else 0.0,
+        "whales": dict(latency_stats(whale_latencies), action=whale_action, failures=whale_failures),
+    }
+
+
+def print_fairness(report: Dict[str, Any], worst: int = 10):
+    print("\n" + "=" * 60)
+    print("⚖️  NOISY NEIGHBOURS")
+    print("=" * 60)
+    print(f"{'small tenants':<16}{'calls':>8}{'failed':>8}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for phase, stats in report["phases"].items():
+        print(f"{phase:<16}{stats['calls']:>8}{stats['failures']:>8}{stats['p50_ms']:>10.1f}"
+              f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+    degradation = report["degradation"]
+    print(f"\nContended vs baseline: p50 {degradation['p50']:.2f}x, p95 {degradation['p95']:.2f}x, "
+          f"p99 {degradation['p99']:.2f}x")
+    whales = report["whales"]
+    print(f"Whales ran {whales['action']} {whales['calls']} times ({whales['failures']} failed), "
+          f"p50 {whales['p50_ms']:.0f}ms, p95 {whales['p95_ms']:.0f}ms")
+    print(f"{report['degraded_tenants']} small tenants ({report['degraded_share'] * 100:.0f}%) slowed "
+          f"{SLOWDOWN_THRESHOLD:.0f}x or more")
+    print(f"\n{'user':>8}{'chunks':>9}{'base p50':>10}{'cont p50':>10}{'slowdown':>10}")
+    for row in report["tenants"][:worst]:
+        slowdown = f"{row['slowdown']:.2f}x" if row["slowdown"] is not None else "-"
+        print(f"{row['user_id'] or '-':>8}{row['chunks']:>9}{row['baseline_p50_ms']:>10.1f}"
+              f"{row['contended_p50_ms']:>10.1f}{slowdown:>10}")
@@ -0,0 +1,39 @@
+// Times the video transcript pipeline; run by backend_test.py --mode transcript-bench
+// with perf/shims first on PATH. Prints one JSON line per call.
+//   npx tsx perf/transcript_bench.ts <iterations> <url> [<url> ...]
+import {
+  getInstagramTranscript,
+  getTikTokTranscript,
+  getYouTubeTranscript,
+} from "../server/videoTranscription";
+
+function transcriber(url: string) {
+  if (url.includes("instagram.com")) return { platform: "instagram", fn: getInstagramTranscript };
+  if (url.includes("tiktok.com")) return { platform: "tiktok", fn: getTikTokTranscript };
+  return { platform: "youtube", fn: getYouTubeTranscript };
+}
+
+async function main() {
+  const [iterations, ...urls] = process.argv.slice(2);
+  for (let i = 0; i < Number(iterations || 1); i++) {
+    for (const url of urls) {
+      const { platform, fn } = transcriber(url);
+      const started = performance.now();
+      const result = await fn(url);
+      console.log(JSON.stringify({
+        bench: true,
+        platform,
+        url,
+        method: result.method,
+        title: result.title,
+        chars: result.transcript.length,
+        ms: performance.now() - started,
+      }));
+    }
+  }
+}
+
+main().catch(error => {
+  console.error(error);
+  process.exit(1);
+});
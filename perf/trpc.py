@@ -0,0 +1,50 @@
+"""
+tRPC HTTP batch-link wire format
+Mirrors httpBatchLink in client/src/main.tsx:
+    GET  /api/trpc/a,b,c?batch=1&input={"0":{"json":...},"1":...}
+    POST /api/trpc/a,b?batch=1  body {"0":{"json":...},"1":...}
+The response is a JSON array with one {"result":...} or {"error":...} per call.
+"""
+
+import json
+import urllib.parse
+from typing import Dict, Any, List, Tuple
+
+# (procedure, input) pairs sent together in one HTTP request
+BatchCall = Tuple[str, Dict[str, Any]]
+
+
+def batch_path(calls: List[BatchCall]) -> str:
+    """'/api/trpc/a,b,c?batch=1' without the input parameter"""
+    return "/api/trpc/" + ",".join(procedure for procedure, _ in calls) + "?batch=1"
+
+
+def batch_payload(calls: List[BatchCall]) -> Dict[str, Any]:
+    """Index-keyed inputs, each wrapped in the superjson {"json": ...} envelope"""
+    return {str(i): {"json": input_data} for i, (_, input_data) in enumerate(calls)
+            if input_data is not None}
+
+
+def batch_url(base_url: str, calls: List[BatchCall], method: str) -> str:
+    """Full URL; queries carry the inputs in the query string"""
+    url = base_url + batch_path(calls)
+    if method == "GET":
+        url += "&input=" + urllib.parse.quote(json.dumps(batch_payload(calls)))
+    return url
+
+
+def decode_batch(body: Any, count: int, status_code: int = 0) -> List[Dict[str, Any]]:
+    """Split a batch response into one make_trpc_request-style dict per call"""
+    if isinstance(body, list):
+        results = [item if isinstance(item, dict) else {"error": f"Unexpected batch item: {item!r}"}
+                   for item in body[:count]]
+        while len(results) < count:
+            results.append({"error": "Missing result in batch response", "status_code": status_code})
+        return results
+    # The whole batch failed (bad request, invalid JSON, connection error)
+    return [body] * count
+
+
+def is_error(result: Dict[str, Any]) -> bool:
+    return "error" in result
+
@@ -0,0 +1,171 @@
+"""
+Whisper transcription stand-in
+Serves POST /v1/audio/transcriptions for both transcribeAudio
+(server/_core/voiceTranscription.ts, verbose_json via the forge API) and
+transcribeWithOpenAIWhisper (server/videoTranscription.ts, text via
+OPENAI_API_URL). Processing time is proportional to the uploaded audio's
+duration, and the transcript is derived from a hash of the file, so the same
+audio always gets the same WhisperResponse segments.
+"""
+
+import asyncio
+import hashlib
+import random
+import struct
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+from perf.delays import LatencyModel
+from perf.llm import FILLER_WORDS
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+# OpenAI rejects uploads over 25MB; transcribeLargeAudio splits above 24MB
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+# Assumed when the MP3 frame header can't be read
+DEFAULT_BITRATE_KBPS = 128
+SEGMENT_SECONDS = 5.0
+WORDS_PER_SECOND = 2.5
+
+# MPEG audio bitrates (kbps) by bitrate index, Layer III
+MPEG1_L3_BITRATES = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0]
+MPEG2_L3_BITRATES = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0]
+
+
+def mp3_bitrate_kbps(data: bytes) -> Optional[int]:
+    """Bitrate from the first MPEG Layer III frame header, skipping an ID3v2 tag"""
+    offset = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = data[6:10]
+        offset = 10 + ((size[0] << 21) | (size[1] << 14) | (size[2] << 7) | size[3])
+    end = min(len(data) - 4, offset + 64 * 1024)
+    for i in range(offset, max(offset, end)):
+        if data[i] == 0xFF and (data[i + 1] & 0xE0) == 0xE0:
+            version = (data[i + 1] >> 3) & 0x03
+            layer = (data[i + 1] >> 1) & 0x03
+            index = data[i + 2] >> 4
+            if layer != 0x01:
+                continue
+            table = MPEG1_L3_BITRATES if version == 0x03 else MPEG2_L3_BITRATES
+            if table[index]:
+                return table[index]
+    return None
+
+
+def audio_duration(data: bytes, filename: str = "") -> float:
+    """Seconds of audio in a WAV or MP3 upload (estimated for other formats)"""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE" and len(data) >= 44:
+        byte_rate = struct.unpack("<I", data[28:32])[0]
+        if byte_rate:
+            return max(0.0, (len(data) - 44) / byte_rate)
+    bitrate = mp3_bitrate_kbps(data) or DEFAULT_BITRATE_KBPS
+    return len(data) * 8 / (bitrate * 1000)
+
+
+def whisper_response(data: bytes, duration: float, language: str = "en") -> Dict[str, Any]:
+    """Deterministic WhisperResponse (verbose_json) for this audio"""
+    rng = random.Random(hashlib.sha1(data).hexdigest())
+    segments: List[Dict[str, Any]] = []
+    start = 0.0
+    while start < duration:
+        end = min(duration, start + SEGMENT_SECONDS)
+        words = max(1, int((end - start) * WORDS_PER_SECOND))
+        text = " " + " ".join(rng.choice(FILLER_WORDS) for _ in range(words)).capitalize() + "."
+        segments.append({
+            "id": len(segments),
+            "seek": int(start * 100),
+            "start": round(start, 2),
+            "end": round(end, 2),
+            "text": text,
+            "tokens": [rng.randint(200, 50000) for _ in range(words)],
+            "temperature": 0.0,
+            "avg_logprob": round(-rng.uniform(0.1, 0.5), 4),
+            "compression_ratio": round(rng.uniform(1.2, 1.8), 4),
+            "no_speech_prob": round(rng.uniform(0.0, 0.05), 4),
+        })
+        start = end
+    return {
+        "task": "transcribe",
+        "language": language,
+        "duration": round(duration, 2),
+        "text": "".join(s["text"] for s in segments).strip(),
+        "segments": segments,
+    }
+
+
+def format_timestamp(seconds: float, separator: str) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{int(secs):02d}{separator}{int(secs % 1 * 1000):03d}"
+
+
+def captions(result: Dict[str, Any], kind: str) -> str:
+    """srt or vtt rendering of a whisper_response()"""
+    separator = "," if kind == "srt" else "."
+    lines = ["WEBVTT", ""] if kind == "vtt" else []
+    for segment in result["segments"]:
+        if kind == "srt":
+            lines.append(str(segment["id"] + 1))
+        lines.append(f"{format_timestamp(segment['start'], separator)} --> "
+                     f"{format_timestamp(segment['end'], separator)}")
+        lines += [segment["text"].strip(), ""]
+    return "\n".join(lines)
+
+
+class Transcriptions:
+    """aiohttp handler for POST /v1/audio/transcriptions
+
+    Delay = overhead (latency distribution) + ms_per_audio_second * duration.
+    """
+
+    def __init__(self, latency: LatencyModel, ms_per_audio_second: float = 50.0):
+        self.latency = latency
+        self.ms_per_audio_second = ms_per_audio_second
+        self.requests = 0
+        self.rejected = 0
+        self.audio_seconds = 0.0
+        self.bytes_received = 0
+        self.delay_total = 0.0
+
+    async def handle(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        form = await request.post()
+        upload = form.get("file")
+        if upload is None or not hasattr(upload, "file"):
+            return web.json_response({"error": {"message": "file is required"}}, status=400)
+        data = upload.file.read()
+        if len(data) > MAX_UPLOAD_BYTES:
+            self.rejected += 1
+            return web.json_response({"error": {
+                "message": f"Maximum content size limit ({MAX_UPLOAD_BYTES}) exceeded ({len(data)} bytes read)",
+                "type": "server_error",
+            }}, status=413)
+
+        duration = audio_duration(data, upload.filename or "")
+        delay = self.latency.sample() + self.ms_per_audio_second * duration / 1000
+        result = whisper_response(data, duration, form.get("language") or "en")
+        await asyncio.sleep(delay)
+
+        self.requests += 1
+        self.audio_seconds += duration
+        self.bytes_received += len(data)
+        self.delay_total += delay
+
+        response_format = form.get("response_format") or "json"
+        if response_format == "text":
+            return web.Response(text=result["text"] + "\n")
+        if response_format in ("srt", "vtt"):
+            return web.Response(text=captions(result, response_format))
+        if response_format == "verbose_json":
+            return web.json_response(result)
+        return web.json_response({"text": result["text"]})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "rejected_too_large": self.rejected,
+            "audio_seconds": self.audio_seconds,
+            "bytes_received": self.bytes_received,
+            "ms_per_audio_second": self.ms_per_audio_second,
+            "mean_delay_ms": self.delay_total / self.requests * 1000 if self.requests else 0.0,
+        }
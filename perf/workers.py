@@ -0,0 +1,199 @@
+"""
+Multi-process load workers
+Spreads virtual users (or open-loop arrival rate) across a process pool so
+client-side JSON encoding/decoding is not the bottleneck. Workers stream
+per-procedure histogram deltas back to the parent, which merges them into one
+LoadResults; merged histograms give the same percentiles as one big run.
+"""
+
+import asyncio
+import multiprocessing
+import queue
+import time
+from typing import Dict, Any, List, Optional
+
+from perf.load import Call, run_load
+from perf.results import LoadResults
+
+# Deltas are sent to the parent after this many requests (or every FLUSH_INTERVAL)
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+
+
+class SampleStream(LoadResults):
+    """LoadResults used inside a worker: ships histogram deltas to the parent
+
+    Every FLUSH_INTERVAL (or BATCH_SIZE requests) the worker sends its
+    counters and histograms via to_dict() and starts over, so the parent
+    merges a handful of sparse bucket dicts instead of every request.
+    """
+
+    def __init__(self, out_queue, worker_id: int):
+        super().__init__()
+        self.out_queue = out_queue
+        self.worker_id = worker_id
+        self.pending = 0
+        self.last_flush = time.perf_counter()
+
+    def record(self, procedure: str, latency: float, success: bool, status: int,
+               service_time: float = None, phases: Dict[str, float] = None):
+        super().record(procedure, latency, success, status, service_time, phases)
+        self.pending += 1
+        if self.pending >= BATCH_SIZE or time.perf_counter() - self.last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def record_dropped(self, procedure: str):
+        super().record_dropped(procedure)
+        self.pending += 1
+
+    def record_journey(self, name: str, duration: float, success: bool):
+        super().record_journey(name, duration, success)
+        self.pending += 1
+
+    def flush(self):
+        if self.pending:
+            self.out_queue.put(("delta", self.worker_id, self.to_dict()))
+            self.clear_samples()
+            self.pending = 0
+        self.last_flush = time.perf_counter()
+
+
+def _install_fast_event_loop():
+    """Use uvloop when it is installed; the stdlib loop otherwise"""
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
+
+async def _worker_main(stream: SampleStream, options: Dict[str, Any]):
+    from perf.arrival import build_schedule, run_open_loop
+
+    # Start all workers on the same wall-clock instant
+    delay = options["start_wall"] - time.time()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+    calls = options["calls"]
+    if options["profile"]:
+        from perf.profiles import run_profile
+        await run_profile(options["base_url"], options["profile"], calls, options["think_time"],
+                          results=stream, scenarios=options["scenarios"], seed=options["seed"],
+                          worker_id=options["worker_id"], processes=options["processes"],
+                          window=options["window"], sessions=options["sessions"])
+    elif options["arrival"] == "closed":
+        await run_load(options["base_url"], options["users"], options["duration"], calls,
+                       options["think_time"], results=stream, scenarios=options["scenarios"],
+                       seed=options["seed"], sessions=options["sessions"])
+    else:
+        schedule = build_schedule(options["arrival"], options["rate"], options["duration"],
+                                  options["steps"], options["seed"])
+        # Interleave workers' evenly spaced sends instead of firing them in lockstep
+        phase = options["phase"]
+        schedule = (offset + phase for offset in schedule)
+        await run_open_loop(options["base_url"], schedule, calls, options["users"], results=stream,
+                            sessions=options["sessions"])
+
+
+def worker_process(worker_id: int, out_queue, options: Dict[str, Any]):
+    """Process entry point: run one share of the load and stream samples back"""
+    _install_fast_event_loop()
+    stream = SampleStream(out_queue, worker_id)
+    try:
+        asyncio.run(_worker_main(stream, options))
+        stream.flush()
+        out_queue.put(("done", worker_id, None))
+    except BaseException as e:
+        stream.flush()
+        out_queue.put(("error", worker_id, f"{type(e).__name__}: {e}"))
+
+
+def split_evenly(total: int, parts: int) -> List[int]:
+    """Split an integer as evenly as possible, e.g. 10 over 3 -> [4, 3, 3]"""
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+
+def scale_steps(steps: str, factor: float) -> str:
+    """Scale every RATE in a RATE:SECONDS,... spec"""
+    from perf.arrival import parse_steps
+    return ",".join(f"{rate * factor:g}:{seconds:g}" for rate, seconds in parse_steps(steps))
+
+
+def run_multiprocess(base_url: str, processes: int, users: int, duration: float,
+                     calls: List[Call], think_time: float = 0.0, arrival: str = "closed",
+                     rate: float = 10.0, steps: str = "", seed: Optional[int] = None,
+                     startup_grace: float = 2.0,
+                     scenarios: List[Dict[str, Any]] = None,
+                     profile: List[Any] = None, window: float = 5.0,
+                     sessions: List[Dict[str, str]] = None,
+                     results: LoadResults = None) -> LoadResults:
+    """Run the load across `processes` workers and merge their samples
+
+    With a load `profile` (perf.profiles stages) every worker follows the
+    whole profile with its share of the users, on the shared start time.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    out_queue = ctx.Queue()
+    start_wall = time.time() + startup_grace
+
+    workers = []
+    user_shares = split_evenly(max(users, processes), processes)
+    for worker_id in range(processes):
+        options = {
+            "base_url": base_url,
+            "calls": calls,
+            "users": user_shares[worker_id],
+            "duration": duration,
+            "think_time": think_time,
+            "arrival": arrival,
+            "rate": rate / processes,
+            "steps": scale_steps(steps, 1.0 / processes) if steps else "",
+            "seed": None if seed is None else seed + worker_id * 100003,
+            "scenarios": scenarios,
+            "profile": profile,
+            "window": window,
+            "worker_id": worker_id,
+            "processes": processes,
+            # Each worker gets its own slice of the logged-in users
+            "sessions": sessions[worker_id::processes] if sessions else None,
+            "start_wall": start_wall,
+            "phase": worker_id / rate if arrival == "constant" and rate > 0 else 0.0,
+        }
+        process = ctx.Process(target=worker_process, args=(worker_id, out_queue, options), daemon=True)
+        process.start()
+        workers.append(process)
+
+    results = results if results is not None else LoadResults()
+    if profile:
+        from perf.profiles import stage_bounds
+        results.slice_by(stage_bounds(profile), window)
+    # Map the shared wall-clock start onto this process's perf_counter
+    results.started_at = time.perf_counter() + (start_wall - time.time())
+    pending = set(range(processes))
+    failures = {}
+    while pending:
+        try:
+            kind, worker_id, payload = out_queue.get(timeout=1.0)
+        except queue.Empty:
+            # Keep progress records coming while no worker is reporting
+            results.maybe_report_progress()
+            for worker_id in list(pending):
+                if not workers[worker_id].is_alive():
+                    failures[worker_id] = f"exited with code {workers[worker_id].exitcode}"
+                    pending.discard(worker_id)
+            continue
+        if kind == "delta":
+            results.merge_dict(payload)
+        elif kind == "done":
+            pending.discard(worker_id)
+        elif kind == "error":
+            failures[worker_id] = payload
+            pending.discard(worker_id)
+    results.finished_at = time.perf_counter()
+
+    for process in workers:
+        process.join(timeout=5)
+    for worker_id, reason in sorted(failures.items()):
+        print(f"⚠️  Load worker {worker_id} failed: {reason}")
+    return results
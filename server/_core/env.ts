@@ -11,4 +11,7 @@ export const ENV = {
   SUPABASE_SERVICE_KEY: process.env.SUPABASE_SERVICE_KEY ?? "",
   RESEND_API_KEY: process.env.RESEND_API_KEY ?? "",
   OPENAI_API_KEY: process.env.OPENAI_API_KEY ?? "",
+  OPENAI_API_URL: (process.env.OPENAI_API_URL ?? "https://api.openai.com").replace(/\/$/, ""),
+  INSTAGRAM_OEMBED_URL: (process.env.INSTAGRAM_OEMBED_URL ?? "https://api.instagram.com/oembed").replace(/\/$/, ""),
+  TIKTOK_OEMBED_URL: (process.env.TIKTOK_OEMBED_URL ?? "https://www.tiktok.com/oembed").replace(/\/$/, ""),
 };
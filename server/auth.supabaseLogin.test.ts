@@ -0,0 +1,90 @@
+import { describe, expect, it, vi } from "vitest";
+import { decodeJwt } from "jose";
+import { COOKIE_NAME, ONE_YEAR_MS } from "../shared/const";
+import type { TrpcContext } from "./_core/context";
+
+// ENV is read at import time; sessions need a signing secret and an app id
+vi.hoisted(() => {
+  process.env.JWT_SECRET = "test-session-secret";
+  process.env.VITE_APP_ID = "test-app";
+});
+
+vi.mock("./_core/supabase-auth", () => ({
+  verifySupabaseToken: vi.fn(async (token: string) =>
+    token === "valid-token" ? { id: "3f1c", email: "supa@example.com", name: "Supa User" } : null
+  ),
+  getOrCreateSupabaseUser: vi.fn().mockResolvedValue({
+    id: 7,
+    openId: "supabase:3f1c",
+    email: "supa@example.com",
+    name: "Supa User",
+    loginMethod: "supabase",
+    role: "user",
+    createdAt: new Date(),
+    updatedAt: new Date(),
+    lastSignedIn: new Date(),
+  }),
+}));
+
+import { appRouter } from "./routers";
+import { sdk } from "./_core/sdk";
+
+type CookieCall = {
+  name: string;
+  value: string;
+  options: Record<string, unknown>;
+};
+
+function createUnauthContext(): { ctx: TrpcContext; setCookies: CookieCall[] } {
+  const setCookies: CookieCall[] = [];
+
+  const ctx: TrpcContext = {
+    user: null,
+    req: {
+      protocol: "https",
+      headers: {},
+    } as TrpcContext["req"],
+    res: {
+      cookie: (name: string, value: string, options: Record<string, unknown>) => {
+        setCookies.push({ name, value, options });
+      },
+    } as unknown as TrpcContext["res"],
+  };
+
+  return { ctx, setCookies };
+}
+
+describe("auth.supabaseLogin", () => {
+  it("sets a one-year session cookie that sdk.verifySession accepts", async () => {
+    const { ctx, setCookies } = createUnauthContext();
+    const caller = appRouter.createCaller(ctx);
+
+    const result = await caller.auth.supabaseLogin({ token: "valid-token" });
+
+    expect(result.success).toBe(true);
+    expect(result.user.openId).toBe("supabase:3f1c");
+    expect(setCookies).toHaveLength(1);
+    expect(setCookies[0]?.name).toBe(COOKIE_NAME);
+    expect(setCookies[0]?.options).toMatchObject({
+      maxAge: ONE_YEAR_MS,
+      secure: true,
+      sameSite: "none",
+      httpOnly: true,
+      path: "/",
+    });
+
+    const session = await sdk.verifySession(setCookies[0]!.value);
+    expect(session).toEqual({ openId: "supabase:3f1c", appId: "test-app", name: "Supa User" });
+
+    const expiresAt = decodeJwt(setCookies[0]!.value).exp! * 1000;
+    expect(Math.abs(expiresAt - (Date.now() + ONE_YEAR_MS))).toBeLessThan(60_000);
+  });
+
+  it("rejects an invalid Supabase token without setting a cookie", async () => {
+    const { ctx, setCookies } = createUnauthContext();
+    const caller = appRouter.createCaller(ctx);
+
+    await expect(caller.auth.supabaseLogin({ token: "bad-token" })).rejects.toThrow("Invalid Supabase token");
+    expect(setCookies).toHaveLength(0);
+  });
+});
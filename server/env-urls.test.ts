@@ -0,0 +1,96 @@
+import { afterEach, describe, expect, it, vi } from "vitest";
+
+// ENV is read once at import time, so every test sets the variables first
+// and then imports a fresh copy of the module under test.
+const URL_VARIABLES = ["OPENAI_API_URL", "OPENAI_API_KEY", "INSTAGRAM_OEMBED_URL", "TIKTOK_OEMBED_URL"];
+const original = Object.fromEntries(URL_VARIABLES.map(name => [name, process.env[name]]));
+
+function setEnv(values: Record<string, string | undefined>) {
+  vi.resetModules();
+  for (const [name, value] of Object.entries(values)) {
+    if (value === undefined) {
+      delete process.env[name];
+    } else {
+      process.env[name] = value;
+    }
+  }
+}
+
+function mockFetch(body: unknown = {}) {
+  const fetchMock = vi.fn().mockResolvedValue({
+    ok: true,
+    status: 200,
+    json: async () => body,
+    text: async () => JSON.stringify(body),
+  });
+  vi.stubGlobal("fetch", fetchMock);
+  return fetchMock;
+}
+
+afterEach(() => {
+  setEnv(original);
+  vi.unstubAllGlobals();
+});
+
+describe("ENV.OPENAI_API_URL", () => {
+  it("defaults to the public OpenAI API", async () => {
+    setEnv({ OPENAI_API_URL: undefined });
+    const { ENV } = await import("./_core/env");
+
+    expect(ENV.OPENAI_API_URL).toBe("https://api.openai.com");
+  });
+
+  it("uses the override without a trailing slash", async () => {
+    setEnv({ OPENAI_API_URL: "http://127.0.0.1:3999/" });
+    const { ENV } = await import("./_core/env");
+
+    expect(ENV.OPENAI_API_URL).toBe("http://127.0.0.1:3999");
+  });
+
+  it("sends the GPT fallback to the configured URL", async () => {
+    setEnv({ OPENAI_API_URL: "http://127.0.0.1:3999", OPENAI_API_KEY: "sk-test" });
+    const fetchMock = mockFetch({ choices: [] });
+    const { callOpenAIFallback } = await import("./videoTranscription");
+
+    await callOpenAIFallback({ messages: [{ role: "user", content: "Hi" }] });
+
+    expect(fetchMock).toHaveBeenCalledWith(
+      "http://127.0.0.1:3999/v1/chat/completions",
+      expect.objectContaining({ method: "POST" })
+    );
+  });
+});
+
+describe("ENV oEmbed URLs", () => {
+  it("default to the Instagram and TikTok endpoints", async () => {
+    setEnv({ INSTAGRAM_OEMBED_URL: undefined, TIKTOK_OEMBED_URL: undefined });
+    const { ENV } = await import("./_core/env");
+
+    expect(ENV.INSTAGRAM_OEMBED_URL).toBe("https://api.instagram.com/oembed");
+    expect(ENV.TIKTOK_OEMBED_URL).toBe("https://www.tiktok.com/oembed");
+  });
+
+  it("use the overrides without a trailing slash", async () => {
+    setEnv({
+      INSTAGRAM_OEMBED_URL: "http://127.0.0.1:3999/instagram/oembed/",
+      TIKTOK_OEMBED_URL: "http://127.0.0.1:3999/tiktok/oembed",
+    });
+    const { ENV } = await import("./_core/env");
+
+    expect(ENV.INSTAGRAM_OEMBED_URL).toBe("http://127.0.0.1:3999/instagram/oembed");
+    expect(ENV.TIKTOK_OEMBED_URL).toBe("http://127.0.0.1:3999/tiktok/oembed");
+  });
+
+  it("sends the Instagram profile lookup to the configured URL", async () => {
+    setEnv({ INSTAGRAM_OEMBED_URL: "http://127.0.0.1:3999/instagram/oembed" });
+    const fetchMock = mockFetch({ author_name: "creator_1", title: "Coaching reels" });
+    const { scrapeInstagramProfile } = await import("./webScraper");
+
+    const profile = await scrapeInstagramProfile("https://www.instagram.com/creator_1/");
+
+    expect(fetchMock).toHaveBeenCalledWith(
+      `http://127.0.0.1:3999/instagram/oembed/?url=${encodeURIComponent("https://www.instagram.com/creator_1/")}`
+    );
+    expect(profile?.name).toBe("creator_1");
+  });
+});
@@ -278,6 +278,16 @@ describe("prospect", () => {
     expect(result.conversionRate).toBe(62.5);
   });
 
+  it("passes the user id before the workspace id to getProspectStats", async () => {
+    const ctx = createAuthContext();
+    const caller = appRouter.createCaller(ctx);
+    const db = await import("./db");
+
+    await caller.analytics.getStats({ workspaceId: 42 });
+
+    expect(db.getProspectStats).toHaveBeenCalledWith(1, 42);
+  });
+
   it("updates prospect outcome", async () => {
     const ctx = createAuthContext();
     const caller = appRouter.createCaller(ctx);
@@ -1,5 +1,6 @@
-import { COOKIE_NAME } from "@shared/const";
+import { COOKIE_NAME, ONE_YEAR_MS } from "@shared/const";
 import { getSessionCookieOptions } from "./_core/cookies";
+import { sdk } from "./_core/sdk";
 import { systemRouter } from "./_core/systemRouter";
 import { publicProcedure, protectedProcedure, router } from "./_core/trpc";
 import { z } from "zod";
@@ -7,7 +8,6 @@ import { invokeLLM } from "./_core/llm";
 import { storagePut } from "./storage";
 import { nanoid } from "nanoid";
 import * as db from "./db";
-import jwt from "jsonwebtoken";
 import { ENV } from "./_core/env";
 import { callDataApi } from "./_core/dataApi";
 
@@ -575,11 +575,13 @@ export const appRouter = router({
 
         const user = await getOrCreateSupabaseUser(supabaseUser);
         
-        // Create session cookie
-        const sessionData = { userId: user.id, openId: user.openId };
-        const token = jwt.sign(sessionData, ENV.cookieSecret);
+        // Create session cookie (same payload sdk.verifySession expects)
+        const token = await sdk.createSessionToken(user.openId, {
+          name: user.name || "",
+          expiresInMs: ONE_YEAR_MS,
+        });
         const cookieOptions = getSessionCookieOptions(ctx.req);
-        ctx.res.cookie(COOKIE_NAME, token, cookieOptions);
+        ctx.res.cookie(COOKIE_NAME, token, { ...cookieOptions, maxAge: ONE_YEAR_MS });
 
         return { success: true, user };
       }),
@@ -2042,7 +2044,7 @@ Provide 15-25 specific knowledge chunks in JSON format:` },
             expertMode: { total: 0, won: 0, conversionRate: 0 },
           };
         }
-        return db.getProspectStats(workspaceId, ctx.user.id);
+        return db.getProspectStats(ctx.user.id, workspaceId);
       }),
 
     // Get learning insights from knowledge chunks
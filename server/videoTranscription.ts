@@ -213,7 +213,7 @@ export async function getInstagramTranscript(url: string): Promise<{
     // Strategy 2: Fallback to oEmbed metadata
     console.log("[VideoTranscript] Falling back to Instagram oEmbed");
     try {
-      const oembedUrl = `https://api.instagram.com/oembed?url=${encodeURIComponent(url)}&omitscript=true`;
+      const oembedUrl = `${ENV.INSTAGRAM_OEMBED_URL}?url=${encodeURIComponent(url)}&omitscript=true`;
       const response = await fetch(oembedUrl, { signal: AbortSignal.timeout(10000) });
       if (response.ok) {
         const data = await response.json();
@@ -285,7 +285,7 @@ export async function getTikTokTranscript(url: string): Promise<{
 
     // Fallback to oEmbed
     try {
-      const oembedUrl = `https://www.tiktok.com/oembed?url=${encodeURIComponent(url)}`;
+      const oembedUrl = `${ENV.TIKTOK_OEMBED_URL}?url=${encodeURIComponent(url)}`;
       const response = await fetch(oembedUrl, { signal: AbortSignal.timeout(10000) });
       if (response.ok) {
         const data = await response.json();
@@ -329,7 +329,7 @@ async function transcribeWithOpenAIWhisper(audioFilePath: string): Promise<strin
 
     console.log(`[VideoTranscript] Sending ${(audioBuffer.length / (1024 * 1024)).toFixed(1)}MB to Whisper API...`);
 
-    const response = await fetch("https://api.openai.com/v1/audio/transcriptions", {
+    const response = await fetch(`${ENV.OPENAI_API_URL}/v1/audio/transcriptions`, {
       method: "POST",
       headers: {
         "Authorization": `Bearer ${apiKey}`,
@@ -413,7 +413,7 @@ export async function callOpenAIFallback(params: {
     payload.response_format = params.response_format;
   }
 
-  const response = await fetch("https://api.openai.com/v1/chat/completions", {
+  const response = await fetch(`${ENV.OPENAI_API_URL}/v1/chat/completions`, {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
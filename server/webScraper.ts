@@ -30,7 +30,7 @@ export async function scrapeInstagramProfile(url: string): Promise<ScrapedProfil
     if (!username) return null;
 
     // Use Instagram oEmbed to get basic info
-    const oEmbedUrl = `https://api.instagram.com/oembed/?url=${encodeURIComponent(url)}`;
+    const oEmbedUrl = `${ENV.INSTAGRAM_OEMBED_URL}/?url=${encodeURIComponent(url)}`;
     
     try {
       const response = await fetch(oEmbedUrl);
@@ -141,7 +141,7 @@ export async function scrapeStore(url: string): Promise<{ products: string[]; de
  */
 export async function extractTextFromScreenshot(imageBase64: string): Promise<string> {
   try {
-    const response = await fetch("https://api.openai.com/v1/chat/completions", {
+    const response = await fetch(`${ENV.OPENAI_API_URL}/v1/chat/completions`, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
@@ -0,0 +1,110 @@
+"""
+perf.compare: the regression gate behind --baseline
+Run with: python -m unittest discover -s tests -t .
+"""
+
+import unittest
+
+from perf.compare import (DEFAULT_THRESHOLDS, change_percent, compare_reports, gate_failed,
+                          parse_threshold)
+
+
+def make_report(procedures):
+    """A --mode load report with {procedure: (rps, error_rate, p95_ms)}"""
+    return {"load": {"procedures": {
+        name: {"throughput_rps": rps, "error_rate": errors, "latency_ms": {"p95": p95, "p99": p95 * 2}}
+        for name, (rps, errors, p95) in procedures.items()
+    }}}
+
+
+def thresholds(*specs):
+    return [parse_threshold(spec) for spec in specs]
+
+
+class ParseThresholdTest(unittest.TestCase):
+    def test_global_and_scoped(self):
+        threshold = parse_threshold("p95=20")
+        self.assertEqual((threshold.metric, threshold.limit, threshold.procedure), ("p95", 20.0, None))
+        threshold = parse_threshold("brain.getStats:p99.9=50")
+        self.assertEqual((threshold.metric, threshold.limit, threshold.procedure),
+                         ("p99.9", 50.0, "brain.getStats"))
+        self.assertTrue(threshold.applies_to("brain.getStats"))
+        self.assertFalse(threshold.applies_to("auth.me"))
+        self.assertEqual(str(threshold), "brain.getStats:p99.9=50")
+
+    def test_rejects_unknown_metrics_and_missing_limit(self):
+        for spec in ("p59=20", "P95=20", "latency=5", "p95", "p95="):
+            with self.assertRaises(ValueError, msg=spec):
+                parse_threshold(spec)
+
+
+class ChangePercentTest(unittest.TestCase):
+    def test_latency_rising_is_worse(self):
+        self.assertAlmostEqual(change_percent("p95", 100.0, 125.0), 25.0)
+        self.assertAlmostEqual(change_percent("p95", 100.0, 80.0), -20.0)
+
+    def test_throughput_falling_is_worse(self):
+        self.assertAlmostEqual(change_percent("throughput", 100.0, 80.0), 20.0)
+        self.assertAlmostEqual(change_percent("throughput", 100.0, 150.0), -50.0)
+
+    def test_error_rate_is_in_points(self):
+        self.assertAlmostEqual(change_percent("error_rate", 1.0, 3.5), 2.5)
+
+    def test_zero_baseline(self):
+        self.assertEqual(change_percent("p95", 0.0, 0.0), 0.0)
+        self.assertEqual(change_percent("p95", 0.0, 5.0), float("inf"))
+
+
+class CompareReportsTest(unittest.TestCase):
+    def test_flags_regression_over_limit(self):
+        comparison = compare_reports(make_report({"a": (100, 0, 50)}), make_report({"a": (100, 0, 70)}),
+                                     thresholds("p95=20"))
+        self.assertEqual([c["procedure"] for c in comparison["regressions"]], ["a"])
+        self.assertTrue(gate_failed(comparison))
+
+    def test_min_delta_suppresses_small_latency_changes(self):
+        baseline, current = make_report({"a": (100, 0, 0.5)}), make_report({"a": (100, 0, 0.9)})
+        comparison = compare_reports(baseline, current, thresholds("p95=20"), min_delta_ms=1.0)
+        self.assertEqual(comparison["regressions"], [])
+        self.assertEqual(comparison["checks"][0]["change_pct"], 80.0)
+        comparison = compare_reports(baseline, current, thresholds("p95=20"), min_delta_ms=0.1)
+        self.assertEqual(len(comparison["regressions"]), 1)
+
+    def test_unmatched_thresholds_fail_the_gate(self):
+        report = make_report({"a": (100, 0, 50)})
+        comparison = compare_reports(report, report, thresholds("p95=20", "missing.proc:p95=20"))
+        self.assertEqual(comparison["unmatched_thresholds"], ["missing.proc:p95=20"])
+        self.assertTrue(gate_failed(comparison))
+
+    def test_require_all_off_only_fails_when_nothing_was_checked(self):
+        functional = {"latency": {"a": {"latency_ms": {"p95": 50}, "error_rate": 0.0}}}
+        comparison = compare_reports(functional, functional, thresholds(*DEFAULT_THRESHOLDS), require_all=False)
+        self.assertEqual(comparison["unmatched_thresholds"], [])
+        self.assertFalse(gate_failed(comparison))
+        comparison = compare_reports(functional, {}, thresholds(*DEFAULT_THRESHOLDS), require_all=False)
+        self.assertEqual(len(comparison["unmatched_thresholds"]), len(DEFAULT_THRESHOLDS))
+        self.assertTrue(gate_failed(comparison))
+
+    def test_defaults_catch_fast_failures(self):
+        # Every call now errors quickly: p95 and throughput both "improve"
+        comparison = compare_reports(make_report({"brain.getStats": (100, 0.0, 50)}),
+                                     make_report({"brain.getStats": (400, 1.0, 2)}),
+                                     thresholds(*DEFAULT_THRESHOLDS), require_all=False)
+        self.assertEqual([c["metric"] for c in comparison["regressions"]], ["error_rate"])
+        self.assertTrue(gate_failed(comparison))
+
+    def test_missing_procedure_fails_the_gate(self):
+        comparison = compare_reports(make_report({"a": (100, 0, 50), "b": (100, 0, 50)}),
+                                     make_report({"a": (100, 0, 50)}), thresholds("p95=20"))
+        self.assertEqual(comparison["missing_procedures"], ["b"])
+        self.assertEqual(comparison["regressions"], [])
+        self.assertTrue(gate_failed(comparison))
+
+    def test_unchanged_run_passes(self):
+        report = make_report({"a": (100, 0.0, 50)})
+        comparison = compare_reports(report, report, thresholds(*DEFAULT_THRESHOLDS))
+        self.assertFalse(gate_failed(comparison))
+
+
+if __name__ == "__main__":
+    unittest.main()
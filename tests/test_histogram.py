@@ -0,0 +1,83 @@
+"""
+perf.histogram: the buckets every reported percentile is read from
+Run with: python -m unittest discover -s tests -t .
+"""
+
+import math
+import random
+import unittest
+
+from perf.histogram import (SUB_BUCKET_BITS, LatencyHistogram, bucket_bounds, bucket_index)
+
+# Values above 2**SUB_BUCKET_BITS keep SUB_BUCKET_BITS significant bits
+MAX_RELATIVE_ERROR = 1.0 / (1 << (SUB_BUCKET_BITS - 1))
+
+
+class BucketTest(unittest.TestCase):
+    def test_round_trip_and_relative_error(self):
+        rng = random.Random(1)
+        values = list(range(0, 5000)) + [int(10 ** rng.uniform(3, 9)) for _ in range(20000)]
+        for value in values:
+            low, high = bucket_bounds(bucket_index(value))
+            self.assertLessEqual(low, value)
+            self.assertLessEqual(value, high)
+            self.assertLessEqual(high - low, value * MAX_RELATIVE_ERROR, value)
+
+    def test_small_values_are_exact(self):
+        for value in range(1 << SUB_BUCKET_BITS):
+            self.assertEqual(bucket_bounds(bucket_index(value)), (value, value))
+
+    def test_buckets_are_contiguous(self):
+        previous_high = -1
+        for index in range(bucket_index(10 ** 9)):
+            low, high = bucket_bounds(index)
+            self.assertEqual(low, previous_high + 1, index)
+            previous_high = high
+
+
+class PercentileTest(unittest.TestCase):
+    def test_known_data(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000.0)
+        for pct in (50, 90, 95, 99, 99.9):
+            exact = math.ceil(pct / 100.0 * 1000)
+            value = histogram.value_at_percentile(pct)
+            self.assertGreaterEqual(value, exact, pct)
+            self.assertLessEqual(value, exact * (1 + MAX_RELATIVE_ERROR), pct)
+        stats = histogram.stats()
+        self.assertEqual((stats["min"], stats["max"]), (1.0, 1000.0))
+        self.assertAlmostEqual(stats["mean"], 500.5)
+
+    def test_never_above_max(self):
+        histogram = LatencyHistogram()
+        histogram.record(0.123457)
+        self.assertEqual(histogram.value_at_percentile(99.9), 123.457)
+
+    def test_empty(self):
+        self.assertEqual(LatencyHistogram().value_at_percentile(99), 0.0)
+
+
+class MergeTest(unittest.TestCase):
+    def test_merged_exports_match_one_histogram(self):
+        rng = random.Random(2)
+        samples = [rng.lognormvariate(-3, 1.2) for _ in range(30000)]
+        single = LatencyHistogram()
+        for seconds in samples:
+            single.record(seconds)
+
+        # Three workers, shipped to the parent the way perf.workers does
+        merged = LatencyHistogram()
+        for worker in range(3):
+            part = LatencyHistogram()
+            for seconds in samples[worker::3]:
+                part.record(seconds)
+            merged.merge(LatencyHistogram.from_dict(part.to_dict()))
+
+        self.assertEqual(merged.to_dict(), single.to_dict())
+        self.assertEqual(merged.stats(), single.stats())
+        self.assertEqual(merged.buckets(), single.buckets())
+
+
+if __name__ == "__main__":
+    unittest.main()